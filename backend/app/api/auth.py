@@ -7,6 +7,8 @@ from ..models import User
 from ..schemas import UserCreate, UserLogin, UserResponse, Token
 from ..auth import verify_password, get_password_hash, create_access_token, get_current_active_user, ACCESS_TOKEN_EXPIRE_MINUTES
 from .logs import log_activity
+from ..utils.event_codes import EventCode
+from ..utils.dashboard_stats import record_new_user
 
 router = APIRouter()
 
@@ -39,6 +41,7 @@ def register_user(user_data: UserCreate, request: Request, db: Session = Depends
         role=user_data.role or "user"
     )
     db.add(db_user)
+    record_new_user(db)
     db.commit()
     db.refresh(db_user)
     
@@ -51,7 +54,9 @@ def register_user(user_data: UserCreate, request: Request, db: Session = Depends
         log_level="info",
         user_id=db_user.id,
         username=db_user.username,
-        ip_address=request.client.host if request.client else None
+        ip_address=request.client.host if request.client else None,
+        event_code=EventCode.USER_REGISTERED,
+        attributes={"role": user_data.role}
     )
     
     return db_user
@@ -85,7 +90,9 @@ def login_user(user_credentials: UserLogin, request: Request, db: Session = Depe
         log_level="success",
         user_id=user.id,
         username=user.username,
-        ip_address=request.client.host if request.client else None
+        ip_address=request.client.host if request.client else None,
+        event_code=EventCode.USER_LOGIN,
+        attributes={"role": user.role}
     )
     
     return {
@@ -0,0 +1,71 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from ..database import get_db
+from ..models import User
+from ..auth import get_current_active_user
+from ..utils.leaderboard import leaderboard, rebuild_leaderboard, parse_cursor, LEADERBOARD_METRICS
+
+router = APIRouter()
+
+MAX_PAGE_SIZE = 100
+
+def _validate_metric(metric: str) -> str:
+    if metric not in LEADERBOARD_METRICS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid metric. Use one of: {', '.join(LEADERBOARD_METRICS)}"
+        )
+    return metric
+
+@router.get("/")
+def get_leaderboard(
+    metric: str = 'total_learned',
+    page_size: int = 20,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """지표별 상위 학습자 순위를 페이지 단위로 조회합니다.
+    
+    cursor: 이전 응답의 next_cursor. 생략하면 1위부터 조회합니다.
+    """
+    _validate_metric(metric)
+    page_size = min(max(page_size, 1), MAX_PAGE_SIZE)
+    after = None
+    if cursor:
+        try:
+            after = parse_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    return leaderboard.get_top(db, metric, page_size, after)
+
+@router.get("/rank/{session_id}")
+def get_session_rank(session_id: str, metric: str = 'total_learned', db: Session = Depends(get_db)):
+    """세션의 지표별 순위를 조회합니다."""
+    _validate_metric(metric)
+    rank = leaderboard.get_rank(db, session_id, metric)
+    if rank is None:
+        raise HTTPException(status_code=404, detail="Session not found in leaderboard")
+    return rank
+
+@router.post("/rebuild")
+def rebuild(
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """user_progress 전체로부터 리더보드를 다시 만듭니다. (관리자만)"""
+    
+    if current_user.role != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    try:
+        rebuilt = rebuild_leaderboard(db)
+        return {"message": "Leaderboard rebuilt successfully", "sessions": rebuilt}
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to rebuild leaderboard: {str(e)}")
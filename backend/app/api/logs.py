@@ -1,16 +1,142 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, tuple_, or_
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
+import asyncio
 import json
+import os
+import pytz
 
-from ..database import get_db
+from ..database import get_db, SessionLocal
 from ..models import ActivityLog, User
 from ..auth import get_current_active_user
-from ..utils.kst_utils import get_kst_now, get_kst_date_string
+from ..utils.kst_utils import get_kst_now, get_kst_date_string, parse_kst_date
+from ..utils.log_writer import activity_log_writer
+from ..utils.log_broadcast import log_broadcaster, make_log_matcher
+from ..utils.event_codes import EventCode, event_code_for_action
+from ..utils.log_rollup import apply_log_rollup, get_rollup_stats, rebuild_log_rollups, LOG_LEVELS
+from ..utils.dashboard_stats import rebuild_daily_stats
+from ..utils.data_lifecycle import LOG_TABLES, truncate_tables
+from ..utils.table_stats import get_table_stats, invalidate_table_stats
+from ..utils.rate_limit import TokenBucketLimiter, client_address
+from ..utils.log_partitions import is_partitioned, list_partitions, maintain_partitions, LOG_RETENTION_MONTHS
+from ..utils.log_export import EXPORT_FORMATS, log_to_dict, iter_ndjson, iter_csv, iter_parquet, parquet_available, gzip_stream
+from ..utils.pagination import encode_cursor, decode_cursor, estimate_query_count, estimate_table_rows
 
 router = APIRouter()
 
+# 로그 목록 한 페이지의 최대 크기
+MAX_LOG_PAGE_SIZE = 500
+
+# 전체 개수 계산 방식: 'estimate' (플래너 추정), 'exact' (COUNT), 'none' (생략)
+LOG_TOTAL_MODES = ('estimate', 'exact', 'none')
+
+# 실시간 로그 스트림의 연결 유지(heartbeat) 주기 (초)
+LOG_STREAM_HEARTBEAT_SECONDS = 15
+
+# 클라이언트 로그 일괄 수집 제한
+LOG_BATCH_MAX_BYTES = int(os.getenv("LOG_BATCH_MAX_BYTES", str(256 * 1024)))
+LOG_BATCH_MAX_EVENTS = int(os.getenv("LOG_BATCH_MAX_EVENTS", "500"))
+LOG_INGEST_RATE = float(os.getenv("LOG_INGEST_RATE", "20"))  # 클라이언트(IP, 프록시 뒤에서는 X-Forwarded-For)별 초당 이벤트 수
+LOG_INGEST_BURST = float(os.getenv("LOG_INGEST_BURST", str(LOG_BATCH_MAX_EVENTS)))
+# 클라이언트가 보낼 수 있는 로그 타입 (system/security는 서버만 기록)
+CLIENT_LOG_TYPES = ('user', 'error')
+MAX_CLIENT_ACTION_LENGTH = 100
+MAX_CLIENT_DETAILS_LENGTH = 2000
+MAX_CLIENT_ATTRIBUTES_BYTES = 4096
+# 클라이언트가 보낸 timestamp를 믿는 범위 (버퍼링된 이벤트 허용, 범위 밖이면 서버 시각 사용)
+CLIENT_TIMESTAMP_MAX_AGE = timedelta(hours=24)
+CLIENT_TIMESTAMP_MAX_SKEW = timedelta(minutes=5)
+
+log_ingest_limiter = TokenBucketLimiter(LOG_INGEST_RATE, LOG_INGEST_BURST)
+
+def _log_row(log: ActivityLog) -> dict:
+    """브로드캐스트용 로그 행"""
+    return {
+        "id": log.id,
+        "created_at": log.created_at,
+        "log_type": log.log_type,
+        "log_level": log.log_level,
+        "username": log.username,
+        "action": log.action,
+        "details": log.details,
+        "ip_address": log.ip_address,
+        "user_agent": log.user_agent,
+        "event_count": log.event_count,
+        "event_code": log.event_code.value if log.event_code else None,
+        "attributes": log.attributes
+    }
+
+def _contains(column, value: str):
+    """부분 문자열 검색 (LIKE 특수문자 이스케이프, 트라이그램 인덱스로 처리됨)"""
+    escaped = value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return column.ilike(f"%{escaped}%", escape='\\')
+
+def apply_log_filters(
+    query,
+    log_type: Optional[str] = None,
+    log_level: Optional[str] = None,
+    username: Optional[str] = None,
+    action: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    q: Optional[str] = None,
+    event_code: Optional[EventCode] = None
+):
+    """로그 조회 필터를 적용합니다. (목록/내보내기/실시간 스트림 공통)
+    
+    - log_type/log_level: 등호 비교 → (created_at, log_type, log_level) 인덱스
+    - event_code: 등호 비교 → (event_code, created_at) 인덱스
+    - username/action/q: ILIKE 부분 검색 → pg_trgm GIN 인덱스
+    - start_date/end_date: KST 날짜 범위 → 파티션 프루닝
+    """
+    if log_type:
+        query = query.filter(ActivityLog.log_type == log_type)
+    if log_level:
+        query = query.filter(ActivityLog.log_level == log_level)
+    if event_code:
+        query = query.filter(ActivityLog.event_code == event_code)
+    if username:
+        query = query.filter(_contains(ActivityLog.username, username))
+    if action:
+        query = query.filter(_contains(ActivityLog.action, action))
+    if q:
+        query = query.filter(or_(
+            _contains(ActivityLog.username, q),
+            _contains(ActivityLog.action, q),
+            _contains(ActivityLog.details, q)
+        ))
+    
+    # 날짜 범위 필터링 (잘못된 형식은 무시)
+    if start_date:
+        try:
+            query = query.filter(ActivityLog.created_at >= parse_kst_date(start_date))
+        except ValueError:
+            pass
+    
+    if end_date:
+        try:
+            query = query.filter(ActivityLog.created_at < parse_kst_date(end_date) + timedelta(days=1))
+        except ValueError:
+            pass
+    
+    return query
+
+def log_page_query(query, limit: int, position: Optional[Tuple[datetime, int]] = None, skip: int = 0):
+    """로그 목록 한 페이지 쿼리 (최신순, 다음 페이지 확인용으로 limit + 1행)
+    
+    position(이전 페이지 마지막 행의 created_at, id)이 있으면 키셋 페이징, 없으면 skip 행을 건너뜁니다.
+    """
+    if position is not None:
+        query = query.filter(tuple_(ActivityLog.created_at, ActivityLog.id) < position)
+    query = query.order_by(ActivityLog.created_at.desc(), ActivityLog.id.desc())
+    if skip:
+        query = query.offset(skip)
+    return query.limit(limit + 1)
+
 @router.post("/")
 def create_log(
     request: Request,
@@ -23,6 +149,13 @@ def create_log(
         client_ip = request.client.host if request.client else None
         user_agent = request.headers.get("user-agent", "")
         
+        # 이벤트 코드 (지정하지 않았거나 알 수 없는 코드면 action으로 결정)
+        try:
+            event_code = EventCode(log_data['event_code'])
+        except (KeyError, ValueError):
+            event_code = event_code_for_action(log_data.get('action'))
+        attributes = log_data.get('attributes')
+        
         # 로그 생성
         activity_log = ActivityLog(
             user_id=log_data.get('user_id'),
@@ -33,12 +166,24 @@ def create_log(
             log_level=log_data.get('log_level', 'info'),
             ip_address=client_ip,
             user_agent=user_agent,
-            session_id=log_data.get('session_id')
+            session_id=log_data.get('session_id'),
+            event_code=event_code,
+            attributes=attributes if isinstance(attributes, dict) else None,
+            created_at=get_kst_now()
         )
         
         db.add(activity_log)
+        apply_log_rollup(db, [{
+            "created_at": activity_log.created_at,
+            "log_type": activity_log.log_type,
+            "log_level": activity_log.log_level,
+            "action": activity_log.action,
+            "session_id": activity_log.session_id,
+            "event_code": activity_log.event_code
+        }])
         db.commit()
         db.refresh(activity_log)
+        log_broadcaster.publish([_log_row(activity_log)])
         
         return {"message": "Log created successfully", "log_id": activity_log.id}
     
@@ -46,6 +191,198 @@ def create_log(
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to create log: {str(e)}")
 
+async def _read_limited_body(request: Request, max_bytes: int) -> bytes:
+    """요청 본문을 max_bytes까지만 읽습니다. 넘으면 413을 반환합니다."""
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Batch body exceeds {max_bytes} bytes"
+    )
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > max_bytes:
+        raise too_large
+    
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > max_bytes:
+            raise too_large
+        chunks.append(chunk)
+    return b''.join(chunks)
+
+def _parse_batch_body(body: bytes, content_type: str) -> List[Any]:
+    """JSON 배열({"events": [...]} 포함) 또는 NDJSON 본문을 이벤트 목록으로 파싱합니다.
+    
+    NDJSON에서 파싱할 수 없는 줄은 None으로 남겨 해당 이벤트만 거부합니다.
+    """
+    if 'ndjson' in content_type or 'jsonl' in content_type:
+        events = []
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                events.append(None)
+        return events
+    
+    try:
+        data = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    if isinstance(data, dict) and isinstance(data.get('events'), list):
+        data = data['events']
+    if not isinstance(data, list):
+        raise HTTPException(status_code=400, detail="Body must be a JSON array of events or NDJSON")
+    return data
+
+def _client_timestamp(value: Any, now: datetime) -> datetime:
+    if isinstance(value, str):
+        try:
+            timestamp = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return now
+        if timestamp.tzinfo is None:
+            # 시간대가 없으면 KST로 간주
+            timestamp = pytz.timezone('Asia/Seoul').localize(timestamp)
+        if now - CLIENT_TIMESTAMP_MAX_AGE <= timestamp <= now + CLIENT_TIMESTAMP_MAX_SKEW:
+            return timestamp
+    return now
+
+def _validate_client_event(
+    event: Any,
+    now: datetime,
+    client_ip: Optional[str],
+    user_agent: Optional[str]
+) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """클라이언트 이벤트 하나를 검사해 (INSERT할 행, 오류 메시지)를 반환합니다."""
+    if not isinstance(event, dict):
+        return None, "event must be a JSON object"
+    
+    action = event.get('action')
+    if not isinstance(action, str) or not action.strip():
+        return None, "action is required"
+    if len(action) > MAX_CLIENT_ACTION_LENGTH:
+        return None, f"action exceeds {MAX_CLIENT_ACTION_LENGTH} characters"
+    
+    details = event.get('details') or ''
+    if not isinstance(details, str):
+        return None, "details must be a string"
+    if len(details) > MAX_CLIENT_DETAILS_LENGTH:
+        return None, f"details exceeds {MAX_CLIENT_DETAILS_LENGTH} characters"
+    
+    log_type = event.get('log_type') or 'user'
+    if log_type not in CLIENT_LOG_TYPES:
+        return None, f"log_type must be one of: {', '.join(CLIENT_LOG_TYPES)}"
+    log_level = event.get('log_level') or 'info'
+    if log_level not in LOG_LEVELS:
+        return None, f"log_level must be one of: {', '.join(LOG_LEVELS)}"
+    
+    attributes = event.get('attributes')
+    if attributes is not None:
+        if not isinstance(attributes, dict):
+            return None, "attributes must be an object"
+        if len(json.dumps(attributes, ensure_ascii=False).encode('utf-8')) > MAX_CLIENT_ATTRIBUTES_BYTES:
+            return None, f"attributes exceeds {MAX_CLIENT_ATTRIBUTES_BYTES} bytes"
+    
+    try:
+        event_code = EventCode(event['event_code'])
+    except (KeyError, ValueError):
+        event_code = event_code_for_action(action)
+    
+    # 클라이언트가 주장하는 사용자명은 확인할 수 없으므로 username 컬럼이 아닌 attributes에 표시해 둠
+    username = event.get('username')
+    if isinstance(username, str) and username:
+        attributes = {**(attributes or {}), "client_username": username[:MAX_CLIENT_ACTION_LENGTH]}
+    
+    session_id = event.get('session_id')
+    return {
+        "user_id": None,
+        "username": None,
+        "action": action,
+        "details": details,
+        "log_type": log_type,
+        "log_level": log_level,
+        "ip_address": client_ip,
+        "user_agent": user_agent,
+        "session_id": session_id if isinstance(session_id, str) else None,
+        "event_count": 1,
+        "event_code": event_code.value,
+        "attributes": attributes,
+        "created_at": _client_timestamp(event.get('timestamp'), now)
+    }, None
+
+def _insert_client_logs(rows: List[Dict[str, Any]]) -> List[int]:
+    """검증된 행들을 다중 행 INSERT 한 번으로 기록합니다."""
+    db = SessionLocal()
+    try:
+        ids = db.execute(
+            insert(ActivityLog).returning(ActivityLog.id, sort_by_parameter_order=True), rows
+        ).scalars().all()
+        apply_log_rollup(db, rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    
+    log_broadcaster.publish({**row, "id": log_id} for row, log_id in zip(rows, ids))
+    return ids
+
+@router.post("/batch")
+async def create_logs_batch(request: Request):
+    """클라이언트 활동 로그를 한 번에 여러 개 기록합니다.
+    
+    본문은 이벤트 JSON 배열 또는 NDJSON(Content-Type: application/x-ndjson)입니다.
+    잘못된 이벤트만 거부하고 나머지는 기록하며, 클라이언트(IP)별 초당 이벤트 수와
+    요청 크기를 제한합니다. 프록시 뒤에서는 TRUSTED_PROXY_HOPS로 X-Forwarded-For의 클라이언트 주소를 씁니다.
+    timestamp는 최근 24시간 이내일 때만 사용합니다.
+    인증 없는 엔드포인트이므로 이벤트의 username은 사용자 컬럼에 넣지 않고 attributes.client_username에 기록합니다.
+    """
+    client_ip = client_address(request)
+    body = await _read_limited_body(request, LOG_BATCH_MAX_BYTES)
+    events = _parse_batch_body(body, request.headers.get("content-type", ""))
+    
+    if not events:
+        return {"accepted": 0, "rejected": 0, "errors": []}
+    if len(events) > LOG_BATCH_MAX_EVENTS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch exceeds {LOG_BATCH_MAX_EVENTS} events"
+        )
+    
+    allowed, retry_after = log_ingest_limiter.acquire(client_ip or 'unknown', len(events))
+    if not allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Log ingestion rate limit exceeded",
+            headers={"Retry-After": str(max(int(retry_after + 0.999), 1))}
+        )
+    
+    now = get_kst_now()
+    user_agent = request.headers.get("user-agent", "")
+    rows = []
+    errors = []
+    for index, event in enumerate(events):
+        row, error = _validate_client_event(event, now, client_ip, user_agent)
+        if error:
+            errors.append({"index": index, "error": error})
+        else:
+            rows.append(row)
+    
+    if rows:
+        try:
+            await run_in_threadpool(_insert_client_logs, rows)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to create logs: {str(e)}")
+    
+    return {
+        "accepted": len(rows),
+        "rejected": len(errors),
+        "errors": errors[:50]
+    }
+
 @router.get("/")
 def get_logs(
     skip: int = 0,
@@ -56,10 +393,19 @@ def get_logs(
     action: Optional[str] = None,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
+    q: Optional[str] = None,
+    event_code: Optional[EventCode] = None,
+    cursor: Optional[str] = None,
+    total: str = 'estimate',
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """활동 로그 목록을 조회합니다. (관리자만)"""
+    """활동 로그 목록을 조회합니다. (관리자만)
+    
+    q: 사용자명/액션/상세 내용 부분 문자열 검색 (pg_trgm GIN 인덱스 사용)
+    cursor: 이전 응답의 next_cursor를 넘기면 (created_at, id) 키셋 페이징으로 다음 페이지를 조회합니다.
+    total: 전체 개수 계산 방식 ('estimate', 'exact', 'none')
+    """
     
     try:
         print(f"🔍 로그 조회 요청 시작")
@@ -93,36 +439,43 @@ def get_logs(
                 detail=f"Internal error during log access: {str(e)}"
             )
     
-    query = db.query(ActivityLog)
+    query = apply_log_filters(
+        db.query(ActivityLog),
+        log_type=log_type,
+        log_level=log_level,
+        username=username,
+        action=action,
+        start_date=start_date,
+        end_date=end_date,
+        q=q,
+        event_code=event_code
+    )
     
-    # 필터링
-    if log_type:
-        query = query.filter(ActivityLog.log_type == log_type)
-    if log_level:
-        query = query.filter(ActivityLog.log_level == log_level)
-    if username:
-        query = query.filter(ActivityLog.username.ilike(f"%{username}%"))
-    if action:
-        query = query.filter(ActivityLog.action.ilike(f"%{action}%"))
+    if total not in LOG_TOTAL_MODES:
+        raise HTTPException(status_code=400, detail=f"Invalid total mode. Use one of: {', '.join(LOG_TOTAL_MODES)}")
+    limit = min(max(limit, 1), MAX_LOG_PAGE_SIZE)
     
-    # 날짜 범위 필터링
-    if start_date:
-        try:
-            start_dt = datetime.strptime(start_date, "%Y-%m-%d")
-            query = query.filter(ActivityLog.created_at >= start_dt)
-        except ValueError:
-            pass
+    # 전체 개수 (필터 적용, 페이지 위치와 무관)
+    total_count = None
+    if total == 'exact':
+        total_count = query.count()
+    elif total == 'estimate':
+        has_filters = any([log_type, log_level, username, action, start_date, end_date, q, event_code])
+        total_count = estimate_query_count(db, query) if has_filters else estimate_table_rows(db, ActivityLog.__tablename__)
     
-    if end_date:
-        try:
-            end_dt = datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1)
-            query = query.filter(ActivityLog.created_at < end_dt)
-        except ValueError:
-            pass
+    # 정렬 및 페이징 - 커서가 있으면 키셋, 없으면 기존 offset 방식
+    position = None
+    if cursor:
+        position = decode_cursor(cursor)
+        if position is None:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        skip = 0
+    
+    logs = log_page_query(query, limit, position, skip).all()
     
-    # 정렬 및 페이징
-    logs = query.order_by(ActivityLog.created_at.desc()).offset(skip).limit(limit).all()
-    total_count = query.count()
+    has_more = len(logs) > limit
+    logs = logs[:limit]
+    next_cursor = encode_cursor(logs[-1].created_at, logs[-1].id) if has_more and logs else None
     
     # 응답 데이터 구성
     logs_data = []
@@ -136,16 +489,175 @@ def get_logs(
             "action": log.action,
             "details": log.details,
             "ip": log.ip_address,
-            "user_agent": log.user_agent
+            "user_agent": log.user_agent,
+            "event_code": log.event_code.value if log.event_code else None,
+            "attributes": log.attributes
         })
     
     return {
         "logs": logs_data,
         "total": total_count,
+        "total_is_estimate": total == 'estimate',
         "skip": skip,
-        "limit": limit
+        "limit": limit,
+        "next_cursor": next_cursor,
+        "has_more": has_more
     }
 
+@router.get("/export")
+def export_logs(
+    format: str = 'ndjson',
+    gzip: bool = False,
+    log_type: Optional[str] = None,
+    log_level: Optional[str] = None,
+    username: Optional[str] = None,
+    action: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    q: Optional[str] = None,
+    event_code: Optional[EventCode] = None,
+    current_user: User = Depends(get_current_active_user)
+):
+    """활동 로그를 NDJSON/CSV/Parquet 파일로 스트리밍 내보내기 합니다. (관리자만)
+    
+    서버측 커서(yield_per)로 읽으므로 행 수와 관계없이 메모리 사용량이 일정합니다.
+    필터는 목록 조회(GET /api/logs)와 같습니다. gzip=true면 NDJSON/CSV를 즉석 압축합니다.
+    """
+    
+    if current_user.role != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Invalid format. Use one of: {', '.join(EXPORT_FORMATS)}")
+    if format == 'parquet' and not parquet_available():
+        raise HTTPException(status_code=501, detail="Parquet export requires pyarrow to be installed")
+    
+    filters = dict(
+        log_type=log_type, log_level=log_level, username=username, action=action,
+        start_date=start_date, end_date=end_date, q=q, event_code=event_code
+    )
+    
+    def rows():
+        # 스트리밍이 끝날 때까지 유지되는 전용 세션
+        db = SessionLocal()
+        try:
+            query = apply_log_filters(db.query(ActivityLog), **filters)
+            query = query.order_by(ActivityLog.created_at, ActivityLog.id).yield_per(1000)
+            for log in query:
+                yield log_to_dict(log)
+        finally:
+            db.close()
+    
+    if format == 'ndjson':
+        body = iter_ndjson(rows())
+    elif format == 'csv':
+        body = iter_csv(rows())
+    else:
+        body = iter_parquet(rows())
+    
+    media_type, extension = EXPORT_FORMATS[format]
+    filename = f"activity_logs_{get_kst_now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+    if gzip and format != 'parquet':
+        body = gzip_stream(body)
+        media_type = 'application/gzip'
+        filename += '.gz'
+    
+    active_filters = {k: v for k, v in filters.items() if v}
+    log_activity(
+        db=None,
+        action="로그 내보내기",
+        details=f"활동 로그를 {format} 형식으로 내보냈습니다. 필터: {json.dumps(active_filters, ensure_ascii=False)}",
+        log_type="system",
+        log_level="info",
+        user_id=current_user.id,
+        username=current_user.username,
+        event_code=EventCode.LOGS_EXPORTED,
+        attributes={"format": format, "gzip": gzip, "filters": active_filters}
+    )
+    
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+@router.get("/stream")
+async def stream_logs(
+    request: Request,
+    log_type: Optional[str] = None,
+    log_level: Optional[str] = None,
+    username: Optional[str] = None,
+    action: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    q: Optional[str] = None,
+    event_code: Optional[EventCode] = None,
+    current_user: User = Depends(get_current_active_user)
+):
+    """새로 기록되는 활동 로그를 Server-Sent Events로 실시간 전송합니다. (관리자만)
+    
+    필터는 목록 조회(GET /api/logs)와 같습니다. 로그 기록기가 커밋한 행을 바로 전달하므로
+    DB를 다시 조회하지 않습니다. 클라이언트가 느리면 버퍼가 가득 찰 때 오래된 이벤트부터
+    버리고, 버린 개수를 dropped 이벤트로 알려 줍니다.
+    """
+    
+    if current_user.role != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    # 날짜 범위 (잘못된 형식은 무시)
+    start = end = None
+    try:
+        start = parse_kst_date(start_date) if start_date else None
+    except ValueError:
+        pass
+    try:
+        end = parse_kst_date(end_date) + timedelta(days=1) if end_date else None
+    except ValueError:
+        pass
+    
+    matcher = make_log_matcher(
+        log_type=log_type, log_level=log_level, username=username, action=action,
+        start=start, end=end, q=q, event_code=event_code
+    )
+    subscription = log_broadcaster.subscribe(matcher)
+    
+    async def events():
+        reported_dropped = 0
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                if await request.is_disconnected():
+                    break
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=LOG_STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                
+                if subscription.dropped > reported_dropped:
+                    yield f"event: dropped\ndata: {json.dumps({'dropped': subscription.dropped - reported_dropped})}\n\n"
+                    reported_dropped = subscription.dropped
+                
+                event_id = f"id: {event['id']}\n" if event.get("id") else ""
+                yield f"{event_id}event: log\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+        finally:
+            log_broadcaster.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
 @router.get("/test")
 def test_logs_api():
     """로그 API 테스트 엔드포인트 (인증 없음)"""
@@ -212,10 +724,16 @@ def get_logs_simple(
 
 @router.get("/stats")
 def get_log_stats(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """로그 통계를 조회합니다. (관리자만)"""
+    """로그 통계를 조회합니다. (관리자만)
+    
+    시간별 집계 테이블(activity_log_rollups)에서 한 번의 쿼리로 계산합니다.
+    start_date/end_date (YYYY-MM-DD, KST)로 기간을 제한할 수 있습니다.
+    """
     
     if current_user.role != 'admin':
         raise HTTPException(
@@ -223,46 +741,123 @@ def get_log_stats(
             detail="Not enough permissions"
         )
     
-    # 전체 로그 수
-    total_logs = db.query(ActivityLog).count()
-    
-    # 레벨별 통계
-    error_logs = db.query(ActivityLog).filter(ActivityLog.log_level == 'error').count()
-    warning_logs = db.query(ActivityLog).filter(ActivityLog.log_level == 'warning').count()
-    info_logs = db.query(ActivityLog).filter(ActivityLog.log_level == 'info').count()
-    success_logs = db.query(ActivityLog).filter(ActivityLog.log_level == 'success').count()
-    
-    # 타입별 통계
-    user_logs = db.query(ActivityLog).filter(ActivityLog.log_type == 'user').count()
-    system_logs = db.query(ActivityLog).filter(ActivityLog.log_type == 'system').count()
-    security_logs = db.query(ActivityLog).filter(ActivityLog.log_type == 'security').count()
+    try:
+        start_dt = parse_kst_date(start_date) if start_date else None
+        end_dt = parse_kst_date(end_date) + timedelta(days=1) if end_date else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
     
     # 오늘 로그 수 (KST)
     today = get_kst_now().replace(hour=0, minute=0, second=0, microsecond=0)
-    today_logs = db.query(ActivityLog).filter(ActivityLog.created_at >= today).count()
+    
+    return get_rollup_stats(db, today_start=today, start=start_dt, end=end_dt)
+
+@router.post("/stats/rebuild")
+def rebuild_log_stats(
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """activity_logs 전체로부터 로그 통계 집계를 다시 만듭니다. (관리자만)"""
+    
+    if current_user.role != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    try:
+        buckets = rebuild_log_rollups(db)
+        return {"message": "Log stats rebuilt successfully", "rollup_rows": buckets}
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to rebuild log stats: {str(e)}")
+
+@router.get("/pipeline")
+def get_log_pipeline_stats(
+    current_user: User = Depends(get_current_active_user)
+):
+    """로그 기록 큐의 상태와 처리/버림 카운터를 조회합니다. (관리자만)"""
+    
+    if current_user.role != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
     
     return {
-        "total_logs": total_logs,
-        "today_logs": today_logs,
-        "by_level": {
-            "error": error_logs,
-            "warning": warning_logs,
-            "info": info_logs,
-            "success": success_logs
-        },
-        "by_type": {
-            "user": user_logs,
-            "system": system_logs,
-            "security": security_logs
-        }
+        **activity_log_writer.get_stats(),
+        "stream": log_broadcaster.get_stats(),
+        "ingest": log_ingest_limiter.get_stats()
     }
 
+@router.get("/partitions")
+def get_log_partitions(
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """activity_logs 월별 파티션 목록과 보존 정책을 조회합니다. (관리자만)"""
+    
+    if current_user.role != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    partitioned = is_partitioned(db)
+    return {
+        "partitioned": partitioned,
+        "retention_months": LOG_RETENTION_MONTHS,
+        "partitions": list_partitions(db) if partitioned else []
+    }
+
+@router.post("/partitions/maintain")
+def run_log_partition_maintenance(
+    retention_months: Optional[int] = None,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """미래 파티션 생성과 보존 기간이 지난 파티션 삭제를 즉시 실행합니다. (관리자만)"""
+    
+    if current_user.role != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    try:
+        result = maintain_partitions(
+            db,
+            retention_months=LOG_RETENTION_MONTHS if retention_months is None else retention_months
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to maintain log partitions: {str(e)}")
+    
+    if result.get("dropped"):
+        log_activity(
+            db=db,
+            action="로그 파티션 삭제",
+            details=f"보존 기간이 지난 로그 파티션이 삭제되었습니다: {', '.join(result['dropped'])}",
+            log_type="system",
+            log_level="warning",
+            user_id=current_user.id,
+            username=current_user.username,
+            event_code=EventCode.LOG_PARTITIONS_DROPPED,
+            attributes={"partitions": result["dropped"], "retention_months": result["retention_months"]}
+        )
+    
+    return result
+
 @router.delete("/")
 def clear_logs(
+    reset_dashboard_stats: bool = False,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """모든 로그를 삭제합니다. (관리자만)"""
+    """모든 로그와 시간별 로그 집계를 TRUNCATE로 비웁니다. (관리자만)
+    
+    관리자 대시보드의 일별 통계(daily_stats, 세션 스케치)는 로그와 별도로 보관되므로 그대로 유지됩니다.
+    reset_dashboard_stats=true면 일별 통계도 남은 로그 기준으로 다시 만들어 지난 기록이 사라집니다.
+    """
     
     if current_user.role != 'admin':
         raise HTTPException(
@@ -271,22 +866,39 @@ def clear_logs(
         )
     
     try:
-        deleted_count = db.query(ActivityLog).delete()
+        # 삭제 건수는 전체를 세지 않고 플래너 통계로 추정
+        invalidate_table_stats()
+        deleted_count = get_table_stats(db, ('activity_logs',)).get('activity_logs', {}).get('rows', 0)
+        truncate_tables(db, LOG_TABLES)
         db.commit()
+        invalidate_table_stats()
+        if reset_dashboard_stats:
+            rebuild_daily_stats(db)
         
         # 로그 삭제 기록
         clear_log = ActivityLog(
             user_id=current_user.id,
             username=current_user.username,
             action="시스템 로그 삭제",
-            details=f"총 {deleted_count}개의 로그가 삭제되었습니다.",
+            details=f"총 {deleted_count}개의 로그가 삭제되었습니다. (추정치)",
             log_type="system",
-            log_level="warning"
+            log_level="warning",
+            event_code=EventCode.LOGS_CLEARED,
+            attributes={"deleted": deleted_count, "dashboard_stats_reset": reset_dashboard_stats},
+            created_at=get_kst_now()
         )
         db.add(clear_log)
+        apply_log_rollup(db, [{
+            "created_at": clear_log.created_at,
+            "log_type": clear_log.log_type,
+            "log_level": clear_log.log_level,
+            "action": clear_log.action
+        }])
         db.commit()
+        db.refresh(clear_log)
+        log_broadcaster.publish([_log_row(clear_log)])
         
-        return {"message": f"Successfully deleted {deleted_count} logs"}
+        return {"message": f"Successfully deleted approximately {deleted_count} logs", "deleted": deleted_count}
     
     except Exception as e:
         db.rollback()
@@ -302,26 +914,27 @@ def log_activity(
     user_id: Optional[int] = None,
     username: Optional[str] = None,
     session_id: Optional[str] = None,
-    ip_address: Optional[str] = None
+    ip_address: Optional[str] = None,
+    event_code: Optional[EventCode] = None,
+    attributes: Optional[dict] = None
 ):
-    """활동 로그를 생성하는 헬퍼 함수"""
-    try:
-        activity_log = ActivityLog(
-            user_id=user_id,
-            username=username,
-            action=action,
-            details=details,
-            log_type=log_type,
-            log_level=log_level,
-            session_id=session_id,
-            ip_address=ip_address
-        )
-        
-        db.add(activity_log)
-        db.commit()
-        return activity_log
+    """활동 로그를 기록 큐에 넣는 헬퍼 함수
     
-    except Exception as e:
-        db.rollback()
-        print(f"Failed to create log: {str(e)}")
-        return None 
\ No newline at end of file
+    실제 INSERT는 백그라운드 기록기가 배치로 수행하므로 호출자의 세션(db)은 사용하지 않습니다.
+    event_code를 생략하면 action 문자열로 정합니다. 집계/통계 쿼리는 event_code와 attributes를 사용합니다.
+    큐에 넣었으면 True, 큐가 가득 차 버려졌으면 False를 반환합니다.
+    """
+    return activity_log_writer.enqueue({
+        "user_id": user_id,
+        "username": username,
+        "action": action,
+        "details": details,
+        "log_type": log_type,
+        "log_level": log_level,
+        "session_id": session_id,
+        "ip_address": ip_address,
+        "user_agent": None,
+        "event_code": (event_code or event_code_for_action(action)).value,
+        "attributes": attributes,
+        "created_at": get_kst_now()
+    })
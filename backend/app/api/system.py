@@ -1,15 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+from typing import List, Dict, Any, Iterable, Iterator, Optional
 import json
-import io
 import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta
 from ..utils.kst_utils import get_kst_now, get_kst_date_string
+from ..utils.progress_cache import progress_cache
+from ..utils.leaderboard import rebuild_leaderboard
+from ..utils.log_rollup import rebuild_log_rollups
+from ..utils.data_lifecycle import CLEAR_ALL_TABLES, PURGE_BATCH_ROWS, PURGE_TARGETS, run_purge, truncate_tables
+from ..utils.table_stats import SYSTEM_TABLES, get_table_stats, invalidate_table_stats
+from ..utils.dashboard_stats import DASHBOARD_PERIODS, get_dashboard_stats, rebuild_daily_stats
+from ..utils.event_codes import EventCode
+from ..utils.backup_engine import (
+    BACKUP_FILE_EXTENSIONS, BACKUP_SPOOL_DIR, BACKUP_TABLE_MODELS, DEFAULT_BACKUP_TABLES,
+    backup_filename, iter_consistent_backup, iter_file_chunks
+)
+from ..utils.backup_store import (
+    CODEC_MEDIA_TYPES, find_incremental_parent, iter_file_range, parse_range, record_backup_history,
+    remove_stored, resolve_codec, save_backup, store_path, stored_filename, verify_backup
+)
+from ..utils.restore_engine import RestoreInProgress, restore_chain, restore_from_chunks
+from ..utils.backup_jobs import JobContext, backup_jobs, estimate_table_rows, job_to_dict
+from ..utils.backup_scheduler import backup_scheduler, prune_backups
 
-from ..database import get_db
-from ..models import User, AIInfo, UserProgress, ActivityLog, BackupHistory, Quiz, Prompt, BaseContent, Term
+from ..database import get_db, SessionLocal
+from ..models import User, ActivityLog, BackupHistory, BackupJob
 from ..auth import get_current_active_user
 from .logs import log_activity
 
@@ -19,10 +39,27 @@ router = APIRouter()
 async def create_backup(
     include_tables: Optional[List[str]] = None,
     description: Optional[str] = None,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    compress: bool = True,
+    save_to_server: bool = False,
+    mode: str = "full",
+    compression: Optional[str] = None,
+    background: bool = False,
+    current_user: User = Depends(get_current_active_user)
 ):
-    """전체 시스템 데이터를 백업합니다. (관리자만)"""
+    """전체 시스템 데이터를 백업합니다. (관리자만)
+    
+    테이블마다 서버측 커서로 BACKUP_CHUNK_ROWS 행씩 읽어 NDJSON 섹션으로 만들고 즉석에서 gzip 압축해
+    바로 응답으로 스트리밍합니다. 메모리 사용량은 테이블 크기가 아니라 청크 크기에 비례합니다.
+    모든 테이블은 하나의 내보낸 스냅샷을 공유하는 연결들로 병렬 덤프되므로 한 시점의 일관된 백업이 됩니다.
+    save_to_server=true면 응답 대신 서버 저장소(BACKUP_DIR)에 compression(zstd/gzip/none, 기본 BACKUP_STORE_CODEC)으로
+    압축해 저장하고 sha256 체크섬과 크기를 히스토리에 기록합니다. 저장된 백업은 다시 내려받거나 바로 복원할 수 있습니다.
+    
+    mode=incremental이면 직전 백업의 워터마크 이후 추가/변경된 activity_logs, user_progress 행만 담고
+    나머지 테이블은 전체를 담습니다. 삭제된 행은 반영되지 않으므로 주기적으로 전체 백업을 만들어야 합니다.
+    
+    background=true면 서버 저장소에 저장하는 백업을 백그라운드 작업으로 실행하고 작업 ID를 바로 반환합니다(202).
+    진행 상황은 GET /jobs/{job_id}로 확인하고 POST /jobs/{job_id}/cancel로 취소합니다.
+    """
     
     if current_user.role != 'admin':
         raise HTTPException(
@@ -30,106 +67,506 @@ async def create_backup(
             detail="Not enough permissions"
         )
     
-    try:
-        # 기본적으로 모든 테이블 백업
-        if not include_tables:
-            include_tables = ['users', 'ai_info', 'user_progress', 'activity_logs', 'quiz', 'prompt', 'base_content', 'term']
-        
-        backup_data = {
-            "backup_info": {
-                "created_at": get_kst_now().isoformat(),
-                "created_by": current_user.username,
-                "description": description or "Manual backup",
-                "tables_included": include_tables,
-                "version": "1.0.0"
-            },
-            "data": {}
-        }
-        
-        # 각 테이블 데이터 수집
-        table_models = {
-            'users': User,
-            'ai_info': AIInfo,
-            'user_progress': UserProgress,
-            'activity_logs': ActivityLog,
-            'quiz': Quiz,
-            'prompt': Prompt,
-            'base_content': BaseContent,
-            'term': Term,
-            'backup_history': BackupHistory
-        }
-        
-        for table_name in include_tables:
-            if table_name in table_models:
-                model = table_models[table_name]
-                records = db.query(model).all()
-                
-                # 모델 데이터를 딕셔너리로 변환
-                table_data = []
-                for record in records:
-                    record_dict = {}
-                    for column in record.__table__.columns:
-                        value = getattr(record, column.name)
-                        if isinstance(value, datetime):
-                            value = value.isoformat()
-                        record_dict[column.name] = value
-                    table_data.append(record_dict)
-                
-                backup_data["data"][table_name] = table_data
-        
-        # 백업 파일명 생성
-        timestamp = get_kst_now().strftime("%Y%m%d_%H%M%S")
-        filename = f"ai_mastery_backup_{timestamp}.json"
-        
-        # JSON 문자열 생성
-        json_str = json.dumps(backup_data, indent=2, ensure_ascii=False)
-        file_size = len(json_str.encode('utf-8'))
-        
+    # 기본적으로 모든 테이블 백업
+    if not include_tables:
+        include_tables = list(DEFAULT_BACKUP_TABLES)
+    unknown_tables = [table for table in include_tables if table not in BACKUP_TABLE_MODELS]
+    if unknown_tables:
+        raise HTTPException(status_code=400, detail=f"Unknown tables: {', '.join(unknown_tables)}")
+    
+    if mode not in ("full", "incremental"):
+        raise HTTPException(status_code=400, detail="mode must be 'full' or 'incremental'")
+    
+    # 증분 백업은 워터마크가 기록된 가장 최근 백업을 부모로 삼음
+    parent = None
+    if mode == "incremental":
+        parent = await run_in_threadpool(find_incremental_parent)
+        if not parent:
+            raise HTTPException(status_code=400, detail="No previous backup with a watermark; create a full backup first")
+    since = json.loads(parent.watermark) if parent else None
+    watermarks: Dict[str, Any] = dict(since or {})
+    
+    codec = None
+    if background:
+        save_to_server = True
+    if save_to_server:
+        try:
+            codec = resolve_codec(compression)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    timestamp = get_kst_now().strftime("%Y%m%d_%H%M%S")
+    filename = stored_filename(timestamp, codec, mode) if codec else backup_filename(timestamp, compress, mode)
+    backup_info = {
+        "created_at": get_kst_now().isoformat(),
+        "created_by": current_user.username,
+        "description": description or "Manual backup",
+        "mode": mode,
+        "filename": filename,
+        "parent_filename": parent.filename if parent else None
+    }
+    
+    def record_backup(file_size: int, stored: Optional[Dict[str, Any]] = None) -> int:
         # 백업 히스토리 저장
-        backup_history = BackupHistory(
+        backup_id = record_backup_history(
             filename=filename,
             file_size=file_size,
             backup_type='manual',
+            backup_mode=mode,
+            parent_id=parent.id if parent else None,
+            watermark=json.dumps(watermarks),
+            raw_size=stored["raw_size"] if stored else None,
+            storage_path=stored["path"] if stored else None,
+            compression=stored["compression"] if stored else ('gzip' if compress else 'none'),
+            checksum=stored["checksum"] if stored else None,
             tables_included=json.dumps(include_tables),
             description=description,
             created_by=current_user.id,
             created_by_username=current_user.username
         )
-        db.add(backup_history)
-        db.commit()
         
         # 백업 생성 로그 기록
         log_activity(
-            db=db,
+            db=None,
             action="시스템 백업 생성",
             details=f"백업 파일이 생성되었습니다. 파일명: {filename}, 크기: {file_size} bytes",
             log_type="system",
             log_level="success",
             user_id=current_user.id,
-            username=current_user.username
+            username=current_user.username,
+            event_code=EventCode.BACKUP_CREATED,
+            attributes={"filename": filename, "size_bytes": file_size, "mode": mode}
         )
+        return backup_id
+    
+    if save_to_server:
+        def write_to_store(ctx: Optional[JobContext] = None) -> Dict[str, Any]:
+            # 저장소 압축 방식으로 한 번만 압축하도록 압축하지 않은 NDJSON을 받음
+            chunks = iter_consistent_backup(
+                include_tables, backup_info, False, since=since, watermarks=watermarks,
+                on_rows=ctx.add_rows if ctx else None,
+                on_table_done=ctx.table_done if ctx else None
+            )
+            return save_backup(filename, _track_job_chunks(chunks, ctx) if ctx else chunks, codec)
         
-        # 파일 스트림으로 반환
-        def generate():
-            yield json_str
+        if background:
+            def run_job(ctx: JobContext) -> Dict[str, Any]:
+                stored = write_to_store(ctx)
+                backup_id = record_backup(stored["file_size"], stored)
+                return {
+                    "backup_id": backup_id,
+                    "filename": filename,
+                    "file_size": stored["file_size"],
+                    "raw_size": stored["raw_size"],
+                    "compression": stored["compression"],
+                    "checksum": stored["checksum"]
+                }
+            
+            job_id = await run_in_threadpool(
+                backup_jobs.submit,
+                'backup',
+                run_job,
+                {"tables": include_tables, "mode": mode, "compression": codec, "filename": filename},
+                current_user.id,
+                current_user.username,
+                lambda job_id: JobContext(job_id, len(include_tables), total_rows=estimate_table_rows(include_tables))
+            )
+            return JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED,
+                content={"message": "Backup job started", "job_id": job_id, "filename": filename}
+            )
         
-        return StreamingResponse(
-            io.StringIO(json_str),
-            media_type="application/json",
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
-        )
+        try:
+            stored = await run_in_threadpool(write_to_store)
+            record_backup(stored["file_size"], stored)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to create backup: {str(e)}")
+        return {
+            "message": "Backup saved on server",
+            "filename": filename,
+            "file_size": stored["file_size"],
+            "raw_size": stored["raw_size"],
+            "compression": stored["compression"],
+            "checksum": stored["checksum"],
+            "mode": mode
+        }
+    
+    def generate():
+        file_size = 0
+        for chunk in iter_consistent_backup(include_tables, backup_info, compress, since=since, watermarks=watermarks):
+            file_size += len(chunk)
+            yield chunk
+        # 끝까지 전송된 경우에만 히스토리 기록
+        record_backup(file_size)
+    
+    return StreamingResponse(
+        generate(),
+        media_type="application/gzip" if compress else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+def _current_user_data(current_user: User) -> Dict[str, Any]:
+    """복원 후 로그인 유지를 위해 현재 사용자 정보를 보관합니다."""
+    return {
+        'username': current_user.username,
+        'email': current_user.email,
+        'hashed_password': current_user.hashed_password,
+        'role': current_user.role
+    }
+
+def _finalize_restore(current_user: User, current_user_data: Dict[str, Any], restored_tables: List[str], source: str) -> None:
+    """복원 후 관리자 계정, 캐시, 리더보드, 로그/대시보드 집계를 정리하고 복원 로그를 남깁니다."""
+    db = SessionLocal()
+    try:
+        # 현재 관리자 사용자가 백업에 없으면 추가
+        if 'users' in restored_tables and not db.query(User).filter(User.username == current_user.username).first():
+            db.add(User(**current_user_data))
+            db.commit()
+        
+        progress_cache.clear()
+        invalidate_table_stats()
+        
+        # 복원된 학습 기록으로 리더보드 재구성
+        if 'user_progress' in restored_tables:
+            rebuild_leaderboard(db)
+        
+        # 복원된 활동 로그로 로그 통계 집계 재구성
+        if 'activity_logs' in restored_tables:
+            rebuild_log_rollups(db)
         
+        # 복원된 로그/사용자로 대시보드 일별 집계 재구성
+        if 'activity_logs' in restored_tables or 'users' in restored_tables:
+            rebuild_daily_stats(db)
     except Exception as e:
         db.rollback()
-        raise HTTPException(status_code=500, detail=f"Failed to create backup: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to finalize restore: {str(e)}")
+    finally:
+        db.close()
+    
+    # 복원 완료 로그 기록
+    log_activity(
+        db=None,
+        action="시스템 복원 완료",
+        details=f"백업 파일에서 시스템이 복원되었습니다. 파일: {source}, 복원된 테이블: {', '.join(restored_tables)}",
+        log_type="system",
+        log_level="success",
+        user_id=current_user.id,
+        username=current_user.username,
+        event_code=EventCode.RESTORE_COMPLETED,
+        attributes={"filename": source, "tables": restored_tables}
+    )
+
+def _reject_incremental(backup_info: Dict[str, Any]) -> None:
+    if backup_info.get("mode") == "incremental":
+        raise ValueError("Incremental backups must be restored together with their chain")
+
+def _parse_tables(tables: Optional[str]) -> Optional[List[str]]:
+    return [table.strip() for table in tables.split(',') if table.strip()] if tables else None
+
+def _track_job_chunks(chunks: Iterable[bytes], ctx: JobContext) -> Iterator[bytes]:
+    """작업 진행 바이트를 기록하고 청크마다 취소 요청을 확인합니다."""
+    for chunk in chunks:
+        ctx.check_cancelled()
+        ctx.add_bytes(len(chunk))
+        yield chunk
+
+def _start_restore_job(
+    paths: List[str],
+    selected_tables: Optional[List[str]],
+    current_user: User,
+    source: str,
+    chain: bool,
+    remove_files: bool = False
+) -> str:
+    """백업 파일(들)을 읽는 복원 작업을 시작합니다. chain=false면 단일 전체 백업 파일만 허용합니다."""
+    current_user_data = _current_user_data(current_user)
+    
+    def run_job(ctx: JobContext) -> Dict[str, Any]:
+        handles = [open(path, 'rb') for path in paths]
+        try:
+            chunk_iters = [_track_job_chunks(iter_file_chunks(handle), ctx) for handle in handles]
+            on_progress = lambda table_name, n: ctx.add_rows(n, table_name)
+            if chain:
+                result = restore_chain(
+                    chunk_iters, selected_tables, on_progress=on_progress,
+                    should_cancel=ctx.should_cancel, on_table_done=ctx.table_done
+                )
+            else:
+                result = restore_from_chunks(
+                    chunk_iters[0], selected_tables, on_progress=on_progress,
+                    should_cancel=ctx.should_cancel, check_info=_reject_incremental, on_table_done=ctx.table_done
+                )
+        finally:
+            for handle in handles:
+                handle.close()
+            if remove_files:
+                for path in paths:
+                    os.remove(path)
+        
+        restored_tables = list(result["tables"].keys())
+        _finalize_restore(current_user, current_user_data, restored_tables, source)
+        return {
+            "restored_tables": restored_tables,
+            "tables": result["tables"],
+            "backup_info": result["backup_info"],
+            "backup_chain": result.get("backup_chain")
+        }
+    
+    total_bytes = sum(os.path.getsize(path) for path in paths)
+    return backup_jobs.submit(
+        'restore',
+        run_job,
+        {"source": source, "tables": selected_tables},
+        current_user.id,
+        current_user.username,
+        lambda job_id: JobContext(job_id, len(selected_tables or []), total_bytes=total_bytes)
+    )
+
+def _spool_upload(file: UploadFile) -> str:
+    """요청이 끝나면 업로드 파일이 닫히므로 백그라운드 복원용으로 임시 파일에 복사합니다."""
+    fd, path = tempfile.mkstemp(prefix="restore_upload_", suffix=".part", dir=BACKUP_SPOOL_DIR)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            file.file.seek(0)
+            shutil.copyfileobj(file.file, f, 1024 * 1024)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
 
 @router.post("/restore")
 async def restore_backup(
     file: UploadFile = File(...),
+    tables: Optional[str] = None,
+    background: bool = False,
+    current_user: User = Depends(get_current_active_user)
+):
+    """백업 파일을 업로드하여 시스템을 복원합니다. (관리자만)
+    
+    업로드를 읽는 동안 점진적으로 파싱하면서 테이블마다 COPY로 RESTORE_CHUNK_ROWS 행씩 적재합니다.
+    보조 인덱스는 적재 후 한 번에 다시 만들고 id 시퀀스를 맞춥니다.
+    RESTORE_SWAP(기본)이면 섀도 테이블에 적재·검증한 뒤 이름 바꾸기로 교체하므로 복원 중에도 기존 데이터가 조회됩니다.
+    tables(쉼표 구분)를 주면 해당 테이블만 복원합니다.
+    증분 백업 파일은 단독으로 복원할 수 없으며 /restore-chain을 사용합니다.
+    background=true면 업로드를 임시 파일로 받은 뒤 백그라운드 작업으로 복원하고 작업 ID를 바로 반환합니다(202).
+    """
+    
+    if current_user.role != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    if not file.filename.endswith(BACKUP_FILE_EXTENSIONS):
+        raise HTTPException(status_code=400, detail="Only backup files (.json, .ndjson, .ndjson.gz, .ndjson.zst) are allowed")
+    
+    selected_tables = _parse_tables(tables)
+    current_user_data = _current_user_data(current_user)
+    
+    if background:
+        path = await run_in_threadpool(_spool_upload, file)
+        try:
+            job_id = await run_in_threadpool(
+                _start_restore_job, [path], selected_tables, current_user, file.filename, False, True
+            )
+        except Exception:
+            os.remove(path)
+            raise
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={"message": "Restore job started", "job_id": job_id}
+        )
+    
+    try:
+        result = await run_in_threadpool(
+            restore_from_chunks, iter_file_chunks(file.file), selected_tables, check_info=_reject_incremental
+        )
+    except RestoreInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid backup file: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to restore data: {str(e)}")
+    
+    restored_tables = list(result["tables"].keys())
+    _finalize_restore(current_user, current_user_data, restored_tables, file.filename)
+    
+    return {
+        "message": "System restored successfully",
+        "restored_tables": restored_tables,
+        "tables": result["tables"],
+        "backup_info": result["backup_info"]
+    }
+
+@router.post("/restore-chain")
+async def restore_backup_chain(
+    files: List[UploadFile] = File(...),
+    tables: Optional[str] = None,
+    current_user: User = Depends(get_current_active_user)
+):
+    """전체 백업 파일과 이후의 증분 백업 파일들을 업로드 순서대로 적용합니다. (관리자만)"""
+    
+    if current_user.role != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    if any(not file.filename.endswith(BACKUP_FILE_EXTENSIONS) for file in files):
+        raise HTTPException(status_code=400, detail="Only backup files (.json, .ndjson, .ndjson.gz, .ndjson.zst) are allowed")
+    
+    selected_tables = _parse_tables(tables)
+    current_user_data = _current_user_data(current_user)
+    
+    try:
+        result = await run_in_threadpool(
+            restore_chain, [iter_file_chunks(file.file) for file in files], selected_tables
+        )
+    except RestoreInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid backup chain: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to restore data: {str(e)}")
+    
+    restored_tables = list(result["tables"].keys())
+    _finalize_restore(current_user, current_user_data, restored_tables, ', '.join(file.filename for file in files))
+    
+    return {
+        "message": "System restored successfully",
+        "restored_tables": restored_tables,
+        "tables": result["tables"],
+        "backup_chain": result["backup_chain"]
+    }
+
+@router.post("/backup-history/{backup_id}/restore")
+async def restore_backup_from_history(
+    backup_id: int,
+    tables: Optional[str] = None,
+    background: bool = False,
+    current_user: User = Depends(get_current_active_user)
+):
+    """서버에 저장된 백업으로 복원합니다. 증분 백업이면 부모를 따라 전체 백업까지 체인을 찾아 적용합니다. (관리자만)
+    
+    업로드 없이 저장소의 파일을 바로 읽으며, 적용 전에 기록된 sha256 체크섬으로 파일을 검증합니다.
+    background=true면 체크섬 확인 후 백그라운드 작업으로 복원하고 작업 ID를 바로 반환합니다(202).
+    """
+    
+    if current_user.role != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    # 부모를 따라가며 체인 구성 (전체 백업 → ... → 요청한 백업)
+    history_db = SessionLocal()
+    try:
+        chain: List[BackupHistory] = []
+        backup = history_db.query(BackupHistory).filter(BackupHistory.id == backup_id).first()
+        if not backup:
+            raise HTTPException(status_code=404, detail="Backup not found")
+        while backup:
+            chain.insert(0, backup)
+            if backup.backup_mode != 'incremental':
+                break
+            backup = history_db.query(BackupHistory).filter(BackupHistory.id == backup.parent_id).first() if backup.parent_id else None
+        if chain[0].backup_mode == 'incremental':
+            raise HTTPException(status_code=409, detail="Backup chain is broken: parent backup not found")
+        filenames = [item.filename for item in chain]
+        paths = [_stored_backup_path(item) for item in chain]
+        checksums = [item.checksum for item in chain]
+    finally:
+        history_db.close()
+    
+    missing = [filename for filename, path in zip(filenames, paths) if not path or not os.path.exists(path)]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Backup files not found on server: {', '.join(missing)}")
+    
+    # 손상된 파일을 적용하기 전에 체크섬 확인
+    for filename, path, checksum in zip(filenames, paths, checksums):
+        if not await run_in_threadpool(verify_backup, path, checksum):
+            raise HTTPException(status_code=409, detail=f"Checksum mismatch for stored backup: {filename}")
+    
+    selected_tables = _parse_tables(tables)
+    current_user_data = _current_user_data(current_user)
+    
+    if background:
+        job_id = await run_in_threadpool(
+            _start_restore_job, paths, selected_tables, current_user, ', '.join(filenames), True
+        )
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={"message": "Restore job started", "job_id": job_id}
+        )
+    
+    def run() -> Dict[str, Any]:
+        handles = [open(path, 'rb') for path in paths]
+        try:
+            return restore_chain([iter_file_chunks(handle) for handle in handles], selected_tables)
+        finally:
+            for handle in handles:
+                handle.close()
+    
+    try:
+        result = await run_in_threadpool(run)
+    except RestoreInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid backup chain: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to restore data: {str(e)}")
+    
+    restored_tables = list(result["tables"].keys())
+    _finalize_restore(current_user, current_user_data, restored_tables, ', '.join(filenames))
+    
+    return {
+        "message": "System restored successfully",
+        "restored_tables": restored_tables,
+        "tables": result["tables"],
+        "backup_chain": result["backup_chain"]
+    }
+
+@router.get("/backup-schedule")
+def get_backup_schedule(
+    current_user: User = Depends(get_current_active_user)
+):
+    """자동 백업 일정(KST cron), 다음 실행 시각, 마지막 결과와 보존 정책을 조회합니다. (관리자만)
+    
+    일정은 이 요청을 처리한 워커 기준이며, 실제 백업은 advisory lock을 잡은 한 워커만 실행합니다.
+    """
+    
+    if current_user.role != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    return backup_scheduler.get_status()
+
+@router.post("/backup-schedule/prune")
+def prune_auto_backups(
+    current_user: User = Depends(get_current_active_user)
+):
+    """보존 정책(BACKUP_RETENTION_COUNT/DAYS)을 지금 적용해 오래된 자동 백업 체인을 삭제합니다. (관리자만)"""
+    
+    if current_user.role != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    try:
+        return prune_backups()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to prune backups: {str(e)}")
+
+@router.get("/jobs")
+def list_backup_jobs(
+    limit: int = 20,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """백업 파일을 업로드하여 시스템을 복원합니다. (관리자만)"""
+    """최근 백업/복원 작업 목록을 조회합니다. (관리자만)"""
     
     if current_user.role != 'admin':
         raise HTTPException(
@@ -137,118 +574,117 @@ async def restore_backup(
             detail="Not enough permissions"
         )
     
-    if not file.filename.endswith('.json'):
-        raise HTTPException(status_code=400, detail="Only JSON files are allowed")
+    backup_jobs.mark_stale_jobs()
+    jobs = db.query(BackupJob).order_by(BackupJob.created_at.desc()).limit(min(max(limit, 1), 100)).all()
+    return {"jobs": [job_to_dict(job) for job in jobs], "runner": backup_jobs.get_stats()}
+
+@router.get("/jobs/{job_id}")
+def get_backup_job(
+    job_id: str,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """백업/복원 작업의 상태와 진행 상황(완료 테이블, 행, 바이트, 예상 남은 시간)을 조회합니다. (관리자만)"""
     
+    if current_user.role != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    backup_jobs.mark_stale_jobs()
+    job = db.query(BackupJob).filter(BackupJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_to_dict(job)
+
+@router.post("/jobs/{job_id}/cancel")
+def cancel_backup_job(
+    job_id: str,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """대기 중이거나 실행 중인 작업의 취소를 요청합니다. (관리자만)
+    
+    RESTORE_SWAP(기본값)이면 복원은 섀도 테이블에 적재되므로 취소 시 섀도 테이블이 버려지고 기존 데이터는 그대로 유지됩니다.
+    RESTORE_SWAP=false면 청크 단위로 커밋되므로 취소 시점까지 적재된 데이터가 남습니다.
+    """
+    
+    if current_user.role != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    if not db.query(BackupJob).filter(BackupJob.id == job_id).first():
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not backup_jobs.request_cancel(job_id):
+        raise HTTPException(status_code=409, detail="Job is not running")
+    return {"message": "Cancellation requested", "job_id": job_id}
+
+def _stored_backup_path(backup: BackupHistory) -> Optional[str]:
+    """히스토리 항목의 저장 파일 경로. 저장 경로가 기록되기 전의 백업은 파일명으로 찾습니다."""
+    if backup.storage_path:
+        return backup.storage_path
     try:
-        # 파일 내용 읽기
-        content = await file.read()
-        backup_data = json.loads(content.decode('utf-8'))
-        
-        # 백업 파일 검증
-        if "backup_info" not in backup_data or "data" not in backup_data:
-            raise HTTPException(status_code=400, detail="Invalid backup file format")
-        
-        backup_info = backup_data["backup_info"]
-        data = backup_data["data"]
-        
-        # 트랜잭션 시작
+        return store_path(backup.filename)
+    except ValueError:
+        return None
+
+@router.get("/backup-history/{backup_id}/download")
+def download_backup(
+    backup_id: int,
+    request: Request,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """서버에 저장된 백업 파일을 내려받습니다. 단일 Range 요청(206)으로 이어받기를 지원합니다. (관리자만)"""
+    
+    if current_user.role != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    backup = db.query(BackupHistory).filter(BackupHistory.id == backup_id).first()
+    if not backup:
+        raise HTTPException(status_code=404, detail="Backup history not found")
+    path = _stored_backup_path(backup)
+    if not path or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Backup file not found on server")
+    
+    size = os.path.getsize(path)
+    media_type = CODEC_MEDIA_TYPES.get(backup.compression or '', 'application/octet-stream')
+    headers = {"Accept-Ranges": "bytes"}
+    if backup.checksum:
+        headers["ETag"] = f'"{backup.checksum}"'
+    
+    # If-Range가 다른 버전을 가리키면 전체 파일을 보냄
+    if_range = request.headers.get("if-range")
+    if not if_range or if_range == headers.get("ETag"):
         try:
-            # 테이블 모델 매핑
-            table_models = {
-                'users': User,
-                'ai_info': AIInfo,
-                'user_progress': UserProgress,
-                'activity_logs': ActivityLog,
-                'quiz': Quiz,
-                'prompt': Prompt,
-                'base_content': BaseContent,
-                'term': Term,
-                'backup_history': BackupHistory
-            }
-            
-            restored_tables = []
-            
-            # 현재 사용자 정보 백업 (복원 후 로그인 유지용)
-            current_user_data = {
-                'id': current_user.id,
-                'username': current_user.username,
-                'hashed_password': current_user.hashed_password
-            }
-            
-            # 각 테이블 데이터 복원
-            for table_name, table_data in data.items():
-                if table_name in table_models and table_data:
-                    model = table_models[table_name]
-                    
-                    # 기존 데이터 삭제 (사용자는 제외하고 나중에 처리)
-                    if table_name != 'users':
-                        db.query(model).delete()
-                    
-                    # 새 데이터 삽입
-                    for record_data in table_data:
-                        # 날짜 필드 변환
-                        for key, value in record_data.items():
-                            if key.endswith('_at') and isinstance(value, str):
-                                try:
-                                    record_data[key] = datetime.fromisoformat(value.replace('Z', '+00:00'))
-                                except:
-                                    pass
-                        
-                        new_record = model(**record_data)
-                        db.add(new_record)
-                    
-                    restored_tables.append(table_name)
-            
-            # 사용자 테이블 특별 처리 (현재 사용자 보존)
-            if 'users' in data:
-                db.query(User).delete()
-                
-                # 백업된 사용자들 복원
-                for user_data in data['users']:
-                    for key, value in user_data.items():
-                        if key.endswith('_at') and isinstance(value, str):
-                            try:
-                                user_data[key] = datetime.fromisoformat(value.replace('Z', '+00:00'))
-                            except:
-                                pass
-                    
-                    new_user = User(**user_data)
-                    db.add(new_user)
-                
-                # 현재 관리자 사용자가 백업에 없으면 추가
-                backup_usernames = [u['username'] for u in data['users']]
-                if current_user.username not in backup_usernames:
-                    admin_user = User(**current_user_data)
-                    db.add(admin_user)
-            
-            db.commit()
-            
-            # 복원 완료 로그 기록
-            log_activity(
-                db=db,
-                action="시스템 복원 완료",
-                details=f"백업 파일에서 시스템이 복원되었습니다. 파일: {file.filename}, 복원된 테이블: {', '.join(restored_tables)}",
-                log_type="system",
-                log_level="success",
-                user_id=current_user.id,
-                username=current_user.username
+            byte_range = parse_range(request.headers.get("range"), size)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                detail="Requested range not satisfiable",
+                headers={"Content-Range": f"bytes */{size}"}
             )
-            
-            return {
-                "message": "System restored successfully",
-                "restored_tables": restored_tables,
-                "backup_info": backup_info
-            }
-            
-        except Exception as e:
-            db.rollback()
-            raise HTTPException(status_code=500, detail=f"Failed to restore data: {str(e)}")
-        
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=400, detail="Invalid JSON file")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to process backup file: {str(e)}")
+        if byte_range:
+            start, end = byte_range
+            headers.update({
+                "Content-Range": f"bytes {start}-{end}/{size}",
+                "Content-Length": str(end - start + 1),
+                "Content-Disposition": f'attachment; filename="{backup.filename}"'
+            })
+            return StreamingResponse(
+                iter_file_range(path, start, end),
+                status_code=status.HTTP_206_PARTIAL_CONTENT,
+                media_type=media_type,
+                headers=headers
+            )
+    
+    return FileResponse(path, media_type=media_type, filename=backup.filename, headers=headers)
 
 @router.get("/backup-history")
 def get_backup_history(
@@ -272,6 +708,12 @@ def get_backup_history(
             "filename": backup.filename,
             "file_size": backup.file_size,
             "backup_type": backup.backup_type,
+            "backup_mode": backup.backup_mode or 'full',
+            "parent_id": backup.parent_id,
+            "raw_size": backup.raw_size,
+            "compression": backup.compression,
+            "checksum": backup.checksum,
+            "stored": bool(backup.storage_path),
             "tables_included": json.loads(backup.tables_included) if backup.tables_included else [],
             "description": backup.description,
             "created_by": backup.created_by_username,
@@ -283,10 +725,11 @@ def get_backup_history(
 @router.delete("/backup-history/{backup_id}")
 def delete_backup_history(
     backup_id: int,
+    delete_file: bool = True,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """백업 히스토리 항목을 삭제합니다. (관리자만)"""
+    """백업 히스토리 항목을 삭제합니다. delete_file=true면 저장소의 백업 파일도 지웁니다. (관리자만)"""
     
     if current_user.role != 'admin':
         raise HTTPException(
@@ -298,17 +741,30 @@ def delete_backup_history(
     if not backup:
         raise HTTPException(status_code=404, detail="Backup history not found")
     
+    storage_path = backup.storage_path
     db.delete(backup)
     db.commit()
     
-    return {"message": "Backup history deleted successfully"}
+    file_deleted = False
+    if delete_file:
+        try:
+            file_deleted = remove_stored(storage_path)
+        except OSError as e:
+            print(f"Failed to delete backup file {storage_path}: {str(e)}")
+    
+    return {"message": "Backup history deleted successfully", "file_deleted": file_deleted}
 
 @router.get("/system-info")
 def get_system_info(
+    exact: bool = False,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """시스템 정보를 조회합니다. (관리자만)"""
+    """시스템 정보를 조회합니다. (관리자만)
+    
+    테이블별 레코드 수는 플래너 통계로 추정하며(exact=true면 COUNT(*)), 테이블/인덱스 크기와 함께
+    TABLE_STATS_CACHE_SECONDS 동안 캐시합니다.
+    """
     
     if current_user.role != 'admin':
         raise HTTPException(
@@ -316,18 +772,9 @@ def get_system_info(
             detail="Not enough permissions"
         )
     
-    # 테이블별 레코드 수 조회
-    stats = {
-        "users": db.query(User).count(),
-        "ai_info": db.query(AIInfo).count(),
-        "user_progress": db.query(UserProgress).count(),
-        "activity_logs": db.query(ActivityLog).count(),
-        "quiz": db.query(Quiz).count(),
-        "prompt": db.query(Prompt).count(),
-        "base_content": db.query(BaseContent).count(),
-        "term": db.query(Term).count(),
-        "backup_history": db.query(BackupHistory).count()
-    }
+    # 테이블별 레코드 수와 크기 조회
+    table_info = get_table_stats(db, exact=exact)
+    stats = {table: table_info[table]["rows"] if table in table_info else 0 for table in SYSTEM_TABLES}
     
     # 최근 백업 정보
     latest_backup = db.query(BackupHistory).order_by(BackupHistory.created_at.desc()).first()
@@ -336,6 +783,12 @@ def get_system_info(
         "version": "1.0.0",
         "table_stats": stats,
         "total_records": sum(stats.values()),
+        "exact_counts": exact,
+        "table_sizes": {
+            table: {key: info[key] for key in ("table_bytes", "index_bytes", "total_bytes")}
+            for table, info in table_info.items()
+        },
+        "total_bytes": sum(info["total_bytes"] for info in table_info.values()),
         "latest_backup": {
             "filename": latest_backup.filename if latest_backup else None,
             "created_at": latest_backup.created_at.isoformat() if latest_backup else None,
@@ -349,7 +802,10 @@ def clear_all_data(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """모든 시스템 데이터를 삭제합니다. (관리자만, 매우 위험)"""
+    """모든 시스템 데이터를 삭제합니다. (관리자만, 매우 위험)
+    
+    테이블을 TRUNCATE로 한 번에 비우고 id 시퀀스를 초기화합니다.
+    """
     
     if current_user.role != 'admin':
         raise HTTPException(
@@ -371,22 +827,17 @@ def clear_all_data(
             'role': current_user.role
         }
         
-        # 모든 테이블 데이터 삭제
-        db.query(ActivityLog).delete()
-        db.query(UserProgress).delete()
-        db.query(BackupHistory).delete()
-        db.query(AIInfo).delete()
-        db.query(Quiz).delete()
-        db.query(Prompt).delete()
-        db.query(BaseContent).delete()
-        db.query(Term).delete()
-        db.query(User).delete()
+        # 모든 테이블 데이터 삭제 (TRUNCATE ... RESTART IDENTITY, 같은 트랜잭션에서 관리자 계정 복원)
+        truncate_tables(db, CLEAR_ALL_TABLES)
         
         # 관리자 계정 복원
         admin_user = User(**admin_data)
         db.add(admin_user)
         db.commit()
         db.refresh(admin_user)
+        progress_cache.clear()
+        invalidate_table_stats()
+        rebuild_daily_stats(db)
         
         # 데이터 삭제 로그 기록
         log_activity(
@@ -396,7 +847,8 @@ def clear_all_data(
             log_type="system",
             log_level="warning",
             user_id=admin_user.id,
-            username=admin_user.username
+            username=admin_user.username,
+            event_code=EventCode.DATA_CLEARED
         )
         
         return {"message": "All data cleared successfully. Admin account preserved."}
@@ -405,6 +857,85 @@ def clear_all_data(
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to clear data: {str(e)}")
 
+@router.post("/purge")
+async def purge_old_data(
+    target: str,
+    older_than_days: Optional[int] = None,
+    batch_size: int = PURGE_BATCH_ROWS,
+    resume_job: Optional[str] = None,
+    current_user: User = Depends(get_current_active_user)
+):
+    """오래된 데이터를 작은 배치로 나눠 삭제하는 백그라운드 작업을 시작합니다. (관리자만)
+    
+    target: activity_logs, anonymous_progress(활동이 끊긴 익명 세션의 학습 기록), quiz_attempts
+    배치마다 커밋하고 잠시 쉬므로 운영 중에도 실행할 수 있으며, 끝나면 ANALYZE 합니다.
+    진행 상황은 /jobs/{job_id}로 확인합니다. 중단된 정리 작업은 resume_job으로 같은 기준 시각에서 이어서 실행합니다.
+    """
+    
+    if current_user.role != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    if target not in PURGE_TARGETS:
+        raise HTTPException(status_code=400, detail=f"target must be one of {', '.join(PURGE_TARGETS)}")
+    if batch_size < 1:
+        raise HTTPException(status_code=400, detail="batch_size must be positive")
+    
+    if resume_job:
+        db = SessionLocal()
+        try:
+            previous = db.query(BackupJob).filter(BackupJob.id == resume_job, BackupJob.job_type == 'purge').first()
+        finally:
+            db.close()
+        if not previous:
+            raise HTTPException(status_code=404, detail="Purge job not found")
+        if previous.status not in ('failed', 'cancelled'):
+            raise HTTPException(status_code=400, detail=f"Only failed or cancelled purge jobs can be resumed (status: {previous.status})")
+        params = json.loads(previous.params or '{}')
+        if params.get("target") != target:
+            raise HTTPException(status_code=400, detail=f"Job {resume_job} purged {params.get('target')}, not {target}")
+        cutoff = datetime.fromisoformat(params["cutoff"])
+    else:
+        if older_than_days is None or older_than_days < 1:
+            raise HTTPException(status_code=400, detail="older_than_days must be at least 1")
+        cutoff = get_kst_now() - timedelta(days=older_than_days)
+    
+    def run_job(ctx: JobContext) -> Dict[str, Any]:
+        result = run_purge(
+            target, cutoff, batch_size,
+            on_progress=lambda table_name, n: ctx.add_rows(n, table_name),
+            should_cancel=ctx.should_cancel
+        )
+        invalidate_table_stats()
+        log_activity(
+            db=None,
+            action="오래된 데이터 정리",
+            details=f"{target}: {cutoff.isoformat()} 이전 데이터 {result['deleted']}건 삭제",
+            log_type="system",
+            log_level="info",
+            user_id=current_user.id,
+            username=current_user.username,
+            event_code=EventCode.DATA_PURGED,
+            attributes={"target": target, "cutoff": result["cutoff"], "deleted": result["deleted"]}
+        )
+        return result
+    
+    job_id = await run_in_threadpool(
+        backup_jobs.submit,
+        'purge',
+        run_job,
+        {"target": target, "cutoff": cutoff.isoformat(), "batch_size": batch_size, "resumed_from": resume_job},
+        current_user.id,
+        current_user.username,
+        lambda job_id: JobContext(job_id, 1)
+    )
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={"message": "Purge job started", "job_id": job_id, "cutoff": cutoff.isoformat()}
+    )
+
 @router.post("/init-database")
 async def init_database_tables(
     current_user: User = Depends(get_current_active_user),
@@ -483,7 +1014,9 @@ async def init_database_tables(
             log_type="system",
             log_level="info",
             user_id=current_user.id,
-            username=current_user.username
+            username=current_user.username,
+            event_code=EventCode.TABLES_INITIALIZED,
+            attributes={"existing_tables": len(created_tables), "missing_tables": len(missing_tables)}
         )
         
         return {
@@ -498,10 +1031,14 @@ async def init_database_tables(
 
 @router.get("/database-status")
 async def get_database_status(
+    exact: bool = False,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """데이터베이스 상태를 확인합니다. (관리자만)"""
+    """데이터베이스 상태를 확인합니다. (관리자만)
+    
+    행 수는 추정치이며 exact=true면 정확히 셉니다.
+    """
     
     if current_user.role != 'admin':
         raise HTTPException(
@@ -510,28 +1047,17 @@ async def get_database_status(
         )
     
     try:
-        from sqlalchemy import inspect, text
         from ..database import engine
         
-        inspector = inspect(engine)
-        existing_tables = inspector.get_table_names()
-        
-        expected_tables = [
-            'users', 'ai_info', 'user_progress', 'activity_logs', 
-            'backup_history', 'quiz', 'prompt', 'base_content', 'term'
-        ]
+        # 존재하지 않는 테이블은 통계에서 빠짐
+        table_info = await run_in_threadpool(get_table_stats, db, SYSTEM_TABLES, exact)
+        expected_tables = list(SYSTEM_TABLES)
+        existing_tables = [table for table in expected_tables if table in table_info]
         
         table_status = {}
         for table in expected_tables:
-            if table in existing_tables:
-                # 테이블 행 수 확인
-                try:
-                    with engine.connect() as conn:
-                        result = conn.execute(text(f"SELECT COUNT(*) FROM {table}"))
-                        count = result.scalar()
-                        table_status[table] = {"exists": True, "rows": count}
-                except Exception:
-                    table_status[table] = {"exists": True, "rows": "unknown"}
+            if table in table_info:
+                table_status[table] = {"exists": True, **table_info[table]}
             else:
                 table_status[table] = {"exists": False, "rows": 0}
         
@@ -547,10 +1073,15 @@ async def get_database_status(
 
 @router.get("/admin-stats")
 async def get_admin_stats(
+    days: int = 7,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """관리자 대시보드 통계 조회 (관리자만)"""
+    """관리자 대시보드 통계 조회 (관리자만)
+    
+    일별 활동(활성 세션, 퀴즈 완료, 학습, 신규 가입)은 daily_stats 집계 테이블에서 days일(7 또는 30) 분량을
+    한 번에 읽고, 최근 활동을 제외한 통계는 DASHBOARD_CACHE_SECONDS 동안 캐시합니다.
+    """
     
     if current_user.role != 'admin':
         raise HTTPException(
@@ -558,84 +1089,13 @@ async def get_admin_stats(
             detail="Not enough permissions"
         )
     
+    if days not in DASHBOARD_PERIODS:
+        raise HTTPException(status_code=400, detail=f"days must be one of {', '.join(map(str, DASHBOARD_PERIODS))}")
+    
     try:
-        from datetime import datetime, timedelta
-        from sqlalchemy import func, text
-        import json
-        from collections import defaultdict, Counter
-        
-        # 1. 총 사용자 수
-        total_users = db.query(User).count()
-        
-        # 2. 활성 사용자 수 (최근 7일간 활동)
-        seven_days_ago = datetime.now() - timedelta(days=7)
-        
-        # 세션 ID 기반으로 활성 사용자 계산
-        active_sessions_subquery = db.query(ActivityLog.session_id).filter(
-            ActivityLog.created_at >= seven_days_ago,
-            ActivityLog.session_id.isnot(None)
-        ).distinct().subquery()
-        
-        active_users = db.query(active_sessions_subquery).count()
-        
-        # 3. 총 퀴즈 수
-        total_quizzes = db.query(Quiz).count()
-        
-        # 4. 총 컨텐츠 수
-        ai_info_count = db.query(AIInfo).count()
-        prompt_count = db.query(Prompt).count()
-        base_content_count = db.query(BaseContent).count()
-        term_count = db.query(Term).count()
-        total_content = ai_info_count + prompt_count + base_content_count + term_count
-        
-        # 5. 인기 토픽 (퀴즈 주제별 통계)
-        quiz_topics = db.query(Quiz.topic).filter(
-            Quiz.topic.isnot(None),
-            Quiz.topic != ""
-        ).all()
-        
-        if quiz_topics:
-            topic_counter = Counter([topic[0] for topic in quiz_topics if topic[0]])
-            popular_topics = [
-                {"name": topic, "count": count}
-                for topic, count in topic_counter.most_common(5)
-            ]
-        else:
-            # 퀴즈 주제가 없으면 기본 주제들로 구성
-            popular_topics = [
-                {"name": "AI 기초", "count": max(total_quizzes // 3, 1)},
-                {"name": "머신러닝", "count": max(total_quizzes // 4, 1)},
-                {"name": "딥러닝", "count": max(total_quizzes // 5, 1)},
-                {"name": "자연어처리", "count": max(total_quizzes // 6, 1)},
-                {"name": "컴퓨터비전", "count": max(total_quizzes // 7, 1)}
-            ]
-        
-        # 6. 주간 활동 (최근 7일)
-        weekly_progress = []
-        day_names = ['월', '화', '수', '목', '금', '토', '일']
-        
-        for i in range(7):
-            target_date = datetime.now() - timedelta(days=6-i)
-            
-            # 해당 날짜의 활동 사용자 수 (세션 ID 기준)
-            daily_sessions = db.query(ActivityLog.session_id).filter(
-                func.date(ActivityLog.created_at) == target_date.date(),
-                ActivityLog.session_id.isnot(None)
-            ).distinct().count()
-            
-            # 해당 날짜의 퀴즈 활동 수
-            daily_quizzes = db.query(ActivityLog).filter(
-                func.date(ActivityLog.created_at) == target_date.date(),
-                ActivityLog.action.ilike('%quiz%')
-            ).count()
-            
-            weekly_progress.append({
-                "day": day_names[target_date.weekday()],
-                "users": daily_sessions,
-                "quizzes": daily_quizzes
-            })
+        stats = get_dashboard_stats(db, days)
         
-        # 7. 최근 활동 (실시간)
+        # 최근 활동 (실시간이므로 캐시하지 않음)
         recent_activities = []
         recent_logs = db.query(ActivityLog).order_by(
             ActivityLog.created_at.desc()
@@ -671,16 +1131,31 @@ async def get_admin_stats(
         return {
             "success": True,
             "stats": {
-                "totalUsers": total_users,
-                "activeUsers": active_users,
-                "totalQuizzes": total_quizzes,
-                "totalContent": total_content,
-                "popularTopics": popular_topics,
-                "weeklyProgress": weekly_progress,
+                **stats,
                 "recentActivity": recent_activities
             }
         }
         
     except Exception as e:
         print(f"Admin stats error: {e}")
-        raise HTTPException(status_code=500, detail=f"통계 조회 실패: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"통계 조회 실패: {str(e)}")
+
+@router.post("/admin-stats/rebuild")
+async def rebuild_admin_stats(
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """activity_logs와 users로부터 대시보드 일별 집계를 다시 만듭니다. (관리자만)"""
+    
+    if current_user.role != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    try:
+        days = await run_in_threadpool(rebuild_daily_stats, db)
+        return {"message": "Dashboard stats rebuilt successfully", "days": days}
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to rebuild dashboard stats: {str(e)}") 
\ No newline at end of file
@@ -1,19 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import json
 from datetime import datetime, timedelta
 
 from ..database import get_db
-from ..models import UserProgress
+from ..models import UserProgress, User
+from ..auth import get_current_active_user
 from ..schemas import UserProgressCreate, UserProgressResponse
 from .logs import log_activity
 from ..utils.kst_utils import get_kst_now, get_kst_date_string
+from ..utils.progress_cache import progress_cache
+from ..utils.leaderboard import leaderboard
+from ..utils.event_codes import EventCode
+from .ai_info import get_ai_info_by_date
 
 router = APIRouter()
 
+@router.get("/cache/stats")
+def get_progress_cache_stats(current_user: User = Depends(get_current_active_user)):
+    """진행상황/통계 캐시의 적중률과 메모리 사용량을 조회합니다. (관리자만)"""
+    
+    if current_user.role != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    return progress_cache.get_stats()
+
 @router.get("/{session_id}", response_model=Dict[str, Any])
 def get_user_progress(session_id: str, db: Session = Depends(get_db)):
+    cached = progress_cache.get(session_id, 'progress')
+    if cached is not None:
+        return cached
+    
     progress = db.query(UserProgress).filter(UserProgress.session_id == session_id).all()
     result = {}
     
@@ -55,8 +76,196 @@ def get_user_progress(session_id: str, db: Session = Depends(get_db)):
         except json.JSONDecodeError:
             pass
     
+    progress_cache.set(session_id, 'progress', result)
     return result
 
+# 대시보드 부트스트랩에서 선택 가능한 항목
+DASHBOARD_FIELDS = ('progress', 'stats', 'achievements', 'ai_info')
+
+# 성취 규칙: (성취 ID, 통계 항목, 기준값)
+ACHIEVEMENT_RULES = [
+    # AI 정보 학습 성취
+    ('first_learn', 'total_learned', 1),
+    ('beginner', 'total_learned', 3),
+    ('learner', 'total_learned', 5),
+    ('first_10', 'total_learned', 10),
+    ('knowledge_seeker', 'total_learned', 20),
+    ('first_50', 'total_learned', 50),
+    # 용어 학습 성취
+    ('first_term', 'total_terms_learned', 1),
+    ('term_collector', 'total_terms_learned', 5),
+    ('term_master', 'total_terms_learned', 10),
+    # 연속 학습 성취
+    ('three_day_streak', 'streak_days', 3),
+    ('week_streak', 'streak_days', 7),
+    ('two_week_streak', 'streak_days', 14),
+    # 퀴즈 성취
+    ('quiz_beginner', 'quiz_score', 60),
+    ('quiz_master', 'quiz_score', 80),
+    ('perfect_quiz', 'quiz_score', 100),
+]
+
+def _evaluate_achievements(stats: Dict[str, Any]):
+    """통계로부터 (현재 성취 목록, 새로 달성한 성취 목록)을 계산합니다."""
+    achievements = list(stats.get('achievements', []))
+    new_achievements = []
+    for achievement, metric, threshold in ACHIEVEMENT_RULES:
+        if (stats.get(metric) or 0) >= threshold and achievement not in achievements:
+            new_achievements.append(achievement)
+            achievements.append(achievement)
+    return achievements, new_achievements
+
+def _summarize_progress(rows, today: str) -> Dict[str, Any]:
+    """세션의 user_progress 행을 한 번만 순회하여 진행상황 맵과 통계를 함께 계산합니다."""
+    progress = {}
+    terms_by_date = {}
+    stored_stats = {}
+    stats_row = None
+    
+    total_learned = 0
+    today_ai_info = 0
+    all_terms = set()
+    today_terms = set()
+    total_quiz_correct = 0
+    total_quiz_questions = 0
+    today_quiz_correct = 0
+    today_quiz_total = 0
+    
+    for p in rows:
+        date = p.date or ''
+        try:
+            if date == '__stats__':
+                stats_row = p
+                if p.stats:
+                    stored_stats = json.loads(p.stats)
+            elif date.startswith('__terms__'):
+                if p.learned_info:
+                    # __terms__2024-01-01_0 형태에서 날짜 추출
+                    date_part = date.replace('__terms__', '').split('_')[0]
+                    terms = json.loads(p.learned_info)
+                    terms_by_date.setdefault(date_part, set()).update(terms)
+                    all_terms.update(terms)
+                    if date_part == today:
+                        today_terms.update(terms)
+            elif date.startswith('__quiz__'):
+                if p.stats:
+                    quiz_data = json.loads(p.stats)
+                    total_quiz_correct += quiz_data.get('correct', 0)
+                    total_quiz_questions += quiz_data.get('total', 0)
+                    if date.startswith(f'__quiz__{today}'):
+                        today_quiz_correct += quiz_data.get('correct', 0)
+                        today_quiz_total += quiz_data.get('total', 0)
+            elif not date.startswith('__') and p.learned_info:
+                learned = json.loads(p.learned_info)
+                progress[date] = learned
+                total_learned += len(learned)
+                if date == today:
+                    today_ai_info = len(learned)
+        except (json.JSONDecodeError, IndexError):
+            continue
+    
+    progress['terms_by_date'] = {date: list(terms) for date, terms in terms_by_date.items()}
+    progress.update(stored_stats)
+    
+    computed = {
+        'total_learned': total_learned,
+        'total_terms_learned': len(all_terms),
+        'today_ai_info': today_ai_info,
+        'today_terms': len(today_terms),
+        'today_quiz_score': int((today_quiz_correct / today_quiz_total) * 100) if today_quiz_total > 0 else 0,
+        'today_quiz_correct': today_quiz_correct,
+        'today_quiz_total': today_quiz_total,
+        'total_ai_info_available': total_learned,
+        'total_terms_available': len(all_terms),
+        'cumulative_quiz_score': int((total_quiz_correct / total_quiz_questions) * 100) if total_quiz_questions > 0 else 0,
+        'total_quiz_correct': total_quiz_correct,
+        'total_quiz_questions': total_quiz_questions
+    }
+    if stored_stats:
+        stats = dict(stored_stats)
+    else:
+        stats = {'streak_days': 0, 'last_learned_date': None, 'quiz_score': 0, 'achievements': []}
+    stats.update(computed)
+    
+    return {"progress": progress, "stats": stats, "stats_row": stats_row}
+
+@router.get("/{session_id}/dashboard")
+def get_dashboard(
+    session_id: str,
+    fields: Optional[str] = None,
+    date: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """대시보드 초기 로딩에 필요한 진행상황, 통계, 성취, 오늘의 AI 정보를 한 번에 반환합니다.
+    
+    fields: 쉼표로 구분한 항목 선택 (progress, stats, achievements, ai_info). 생략 시 전체.
+    date: ai_info 조회 날짜 (기본값: 오늘 KST)
+    """
+    if fields:
+        requested = [f.strip() for f in fields.split(',') if f.strip()]
+        invalid = [f for f in requested if f not in DASHBOARD_FIELDS]
+        if invalid:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid fields: {', '.join(invalid)}. Use any of: {', '.join(DASHBOARD_FIELDS)}"
+            )
+    else:
+        requested = list(DASHBOARD_FIELDS)
+    
+    today = get_kst_date_string()
+    payload = {}
+    
+    if any(f in requested for f in ('progress', 'stats', 'achievements')):
+        cache_kind = f'dashboard:{today}'
+        summary = progress_cache.get(session_id, cache_kind)
+        if summary is None:
+            rows = db.query(UserProgress).filter(UserProgress.session_id == session_id).all()
+            summary = _summarize_progress(rows, today)
+            
+            # 새로 달성한 성취는 /achievements 와 동일하게 저장
+            achievements, new_achievements = _evaluate_achievements(summary['stats'])
+            if new_achievements:
+                stats_row = summary['stats_row']
+                stored = json.loads(stats_row.stats) if stats_row and stats_row.stats else {}
+                stored['achievements'] = achievements
+                if stats_row:
+                    stats_row.stats = json.dumps(stored)
+                else:
+                    db.add(UserProgress(
+                        session_id=session_id,
+                        date='__stats__',
+                        learned_info=None,
+                        stats=json.dumps(stored)
+                    ))
+                db.commit()
+                progress_cache.invalidate(session_id)
+                summary['stats']['achievements'] = achievements
+                summary['progress']['achievements'] = achievements
+            
+            summary = {
+                "progress": summary['progress'],
+                "stats": summary['stats'],
+                "achievements": {
+                    "current_achievements": achievements,
+                    "new_achievements": []
+                }
+            }
+            # 새 성취는 이번 응답에서만 알리고, 캐시에는 현재 성취만 저장 (캐시 적중 시 new_achievements는 빈 목록)
+            progress_cache.set(session_id, cache_kind, summary)
+            summary = dict(summary, achievements={
+                "current_achievements": achievements,
+                "new_achievements": new_achievements
+            })
+        
+        for field in ('progress', 'stats', 'achievements'):
+            if field in requested:
+                payload[field] = summary[field]
+    
+    if 'ai_info' in requested:
+        payload['ai_info'] = get_ai_info_by_date(date or today, db)
+    
+    return payload
+
 @router.post("/{session_id}/{date}/{info_index}")
 def update_user_progress(session_id: str, date: str, info_index: int, request: Request, db: Session = Depends(get_db)):
     """사용자의 학습 진행상황을 업데이트하고 통계를 계산합니다."""
@@ -94,7 +303,9 @@ def update_user_progress(session_id: str, date: str, info_index: int, request: R
         log_level="info",
         username=session_id,
         session_id=session_id,
-        ip_address=request.client.host if request.client else None
+        ip_address=request.client.host if request.client else None,
+        event_code=EventCode.LEARN_AI_INFO,
+        attributes={"date": date, "info_number": info_index + 1}
     )
     
     return {"message": "Progress updated successfully", "achievement_gained": True}
@@ -140,7 +351,9 @@ def update_term_progress(session_id: str, term_data: dict, request: Request, db:
         log_level="info",
         username=session_id,
         session_id=session_id,
-        ip_address=request.client.host if request.client else None
+        ip_address=request.client.host if request.client else None,
+        event_code=EventCode.LEARN_TERM,
+        attributes={"term": term, "date": date, "info_number": info_index + 1}
     )
     
     return {"message": "Term progress updated successfully", "achievement_gained": True}
@@ -251,17 +464,31 @@ def update_user_statistics(session_id: str, db: Session):
         db.add(stats_progress)
     
     db.commit()
+    progress_cache.invalidate(session_id)
+    
+    # 리더보드 증분 갱신
+    leaderboard.record(
+        db, session_id,
+        total_learned=total_learned,
+        total_terms_learned=total_terms_learned,
+        streak_days=streak_days
+    )
 
 @router.get("/stats/{session_id}")
 def get_user_stats(session_id: str, db: Session = Depends(get_db)):
+    # 오늘 날짜 (KST) - 오늘 통계가 포함되므로 날짜별로 캐시
+    today = get_kst_date_string()
+    cache_kind = f'stats:{today}'
+    
+    cached = progress_cache.get(session_id, cache_kind)
+    if cached is not None:
+        return cached
+    
     progress = db.query(UserProgress).filter(
         UserProgress.session_id == session_id, 
         UserProgress.date == '__stats__'
     ).first()
     
-    # 오늘 날짜 (KST)
-    today = get_kst_date_string()
-    
     # 오늘 학습 데이터 가져오기
     today_ai_info = 0
     today_terms = 0
@@ -420,9 +647,10 @@ def get_user_stats(session_id: str, db: Session = Depends(get_db)):
             'total_quiz_correct': total_quiz_correct,
             'total_quiz_questions': total_quiz_questions
         })
+        progress_cache.set(session_id, cache_kind, stats)
         return stats
     
-    return {
+    stats = {
         'total_learned': total_learned,  # 계산된 누적 총 학습 수
         'total_terms_learned': total_terms_available,  # 계산된 용어 학습 수
         'streak_days': 0,
@@ -440,6 +668,8 @@ def get_user_stats(session_id: str, db: Session = Depends(get_db)):
         'total_quiz_correct': total_quiz_correct,
         'total_quiz_questions': total_quiz_questions
     }
+    progress_cache.set(session_id, cache_kind, stats)
+    return stats
 
 @router.post("/stats/{session_id}")
 def update_user_stats(session_id: str, stats: Dict[str, Any], db: Session = Depends(get_db)):
@@ -460,6 +690,7 @@ def update_user_stats(session_id: str, stats: Dict[str, Any], db: Session = Depe
         db.add(progress)
     
     db.commit()
+    progress_cache.invalidate(session_id)
     return {"message": "Stats updated successfully"}
 
 @router.post("/quiz-score/{session_id}")
@@ -540,6 +771,8 @@ def update_quiz_score(session_id: str, score_data: dict, request: Request, db: S
         db.add(stats_progress)
     
     db.commit()
+    progress_cache.invalidate(session_id)
+    leaderboard.record_quiz(db, session_id, score, total_questions)
     
     # 성취 확인
     check_achievements(session_id, db)
@@ -553,7 +786,9 @@ def update_quiz_score(session_id: str, score_data: dict, request: Request, db: S
         log_level="success" if quiz_score >= 80 else "info",
         username=session_id,
         session_id=session_id,
-        ip_address=request.client.host if request.client else None
+        ip_address=request.client.host if request.client else None,
+        event_code=EventCode.QUIZ_COMPLETED,
+        attributes={"score": score, "total_questions": total_questions, "percent": quiz_score}
     )
     
     return {"message": "Quiz score updated successfully", "quiz_score": quiz_score}
@@ -562,72 +797,7 @@ def update_quiz_score(session_id: str, score_data: dict, request: Request, db: S
 def check_achievements(session_id: str, db: Session = Depends(get_db)):
     """사용자의 성취를 확인하고 업데이트합니다."""
     stats = get_user_stats(session_id, db)
-    achievements = stats.get('achievements', [])
-    new_achievements = []
-    
-    # AI 정보 학습 성취
-    if stats['total_learned'] >= 1 and 'first_learn' not in achievements:
-        new_achievements.append('first_learn')
-        achievements.append('first_learn')
-    
-    if stats['total_learned'] >= 3 and 'beginner' not in achievements:
-        new_achievements.append('beginner')
-        achievements.append('beginner')
-    
-    if stats['total_learned'] >= 5 and 'learner' not in achievements:
-        new_achievements.append('learner')
-        achievements.append('learner')
-    
-    if stats['total_learned'] >= 10 and 'first_10' not in achievements:
-        new_achievements.append('first_10')
-        achievements.append('first_10')
-    
-    if stats['total_learned'] >= 20 and 'knowledge_seeker' not in achievements:
-        new_achievements.append('knowledge_seeker')
-        achievements.append('knowledge_seeker')
-    
-    if stats['total_learned'] >= 50 and 'first_50' not in achievements:
-        new_achievements.append('first_50')
-        achievements.append('first_50')
-    
-    # 용어 학습 성취
-    if stats.get('total_terms_learned', 0) >= 1 and 'first_term' not in achievements:
-        new_achievements.append('first_term')
-        achievements.append('first_term')
-    
-    if stats.get('total_terms_learned', 0) >= 5 and 'term_collector' not in achievements:
-        new_achievements.append('term_collector')
-        achievements.append('term_collector')
-    
-    if stats.get('total_terms_learned', 0) >= 10 and 'term_master' not in achievements:
-        new_achievements.append('term_master')
-        achievements.append('term_master')
-    
-    # 연속 학습 성취
-    if stats['streak_days'] >= 3 and 'three_day_streak' not in achievements:
-        new_achievements.append('three_day_streak')
-        achievements.append('three_day_streak')
-    
-    if stats['streak_days'] >= 7 and 'week_streak' not in achievements:
-        new_achievements.append('week_streak')
-        achievements.append('week_streak')
-    
-    if stats['streak_days'] >= 14 and 'two_week_streak' not in achievements:
-        new_achievements.append('two_week_streak')
-        achievements.append('two_week_streak')
-    
-    # 퀴즈 성취
-    if stats['quiz_score'] >= 60 and 'quiz_beginner' not in achievements:
-        new_achievements.append('quiz_beginner')
-        achievements.append('quiz_beginner')
-    
-    if stats['quiz_score'] >= 80 and 'quiz_master' not in achievements:
-        new_achievements.append('quiz_master')
-        achievements.append('quiz_master')
-    
-    if stats['quiz_score'] >= 100 and 'perfect_quiz' not in achievements:
-        new_achievements.append('perfect_quiz')
-        achievements.append('perfect_quiz')
+    achievements, new_achievements = _evaluate_achievements(stats)
     
     # 새로운 성취가 있으면 업데이트
     if new_achievements:
@@ -1,6 +1,8 @@
-from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, Boolean
+from sqlalchemy import Column, Integer, BigInteger, String, Text, Date, DateTime, Boolean, LargeBinary, Enum, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from .database import Base
+from .utils.event_codes import EventCode
 
 # 사용자 모델 추가 (실제 Supabase 스키마에 맞춤)
 class User(Base):
@@ -16,8 +18,10 @@ class User(Base):
 # 활동 로그 모델 추가
 class ActivityLog(Base):
     __tablename__ = "activity_logs"
+    # created_at 기준 월별 RANGE 파티션 (파티션 관리: app/utils/log_partitions.py)
+    __table_args__ = {'postgresql_partition_by': 'RANGE (created_at)'}
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     user_id = Column(Integer, nullable=True)  # 사용자 ID (로그인한 경우)
     username = Column(String, nullable=True)  # 사용자명 (빠른 조회용)
     action = Column(String, nullable=False)  # 액션 (로그인, 학습, 퀴즈 등)
@@ -27,7 +31,51 @@ class ActivityLog(Base):
     ip_address = Column(String, nullable=True)  # IP 주소
     user_agent = Column(Text, nullable=True)  # 사용자 에이전트
     session_id = Column(String, nullable=True)  # 세션 ID
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    event_count = Column(Integer, server_default='1')  # 집계된 이벤트 수 (분 단위 집계 행은 2 이상)
+    # 이벤트 코드 (값 추가가 쉽도록 DB에는 VARCHAR로 저장)
+    event_code = Column(
+        Enum(EventCode, native_enum=False, length=64, values_callable=lambda codes: [code.value for code in codes]),
+        nullable=True
+    )
+    attributes = Column(JSONB, nullable=True)  # 구조화된 이벤트 속성 (점수, 날짜 등)
+    created_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())  # 파티션 키는 PK에 포함되어야 함
+
+# 관리자 로그 조회용 인덱스 (pg_trgm GIN 인덱스는 create_log_indexes.py에서 생성)
+Index('ix_activity_logs_created_type_level', ActivityLog.created_at, ActivityLog.log_type, ActivityLog.log_level)
+Index('ix_activity_logs_session_created', ActivityLog.session_id, ActivityLog.created_at)
+Index('ix_activity_logs_event_code_created', ActivityLog.event_code, ActivityLog.created_at)
+Index('ix_activity_logs_attributes', ActivityLog.attributes, postgresql_using='gin', postgresql_ops={'attributes': 'jsonb_path_ops'})
+
+# 활동 로그 시간별 집계 모델 (로그 통계 조회용)
+class ActivityLogRollup(Base):
+    __tablename__ = "activity_log_rollups"
+    __table_args__ = (
+        UniqueConstraint('bucket', 'log_type', 'log_level', 'action', name='uq_activity_log_rollups_key'),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    bucket = Column(DateTime(timezone=True), nullable=False, index=True)  # 시간 단위로 자른 시각
+    log_type = Column(String, nullable=False, default='')
+    log_level = Column(String, nullable=False, default='')
+    action = Column(String, nullable=False, default='')
+    count = Column(BigInteger, nullable=False, default=0)
+
+# 관리자 대시보드용 KST 일별 집계 (로그 기록/회원가입 시 app/utils/dashboard_stats.py에서 갱신)
+class DailyStat(Base):
+    __tablename__ = "daily_stats"
+    
+    day = Column(Date, primary_key=True)  # KST 날짜
+    active_sessions = Column(Integer, nullable=False, server_default='0')  # 활동한 서로 다른 세션 수 (HLL 추정치)
+    quiz_completions = Column(BigInteger, nullable=False, server_default='0')
+    learn_events = Column(BigInteger, nullable=False, server_default='0')  # AI 정보/용어 학습 이벤트 수
+    new_users = Column(Integer, nullable=False, server_default='0')
+
+# 일별 활동 세션의 HyperLogLog 스케치 (daily_stats.active_sessions와 기간별 활성 세션 추정용)
+class DailySessionSketch(Base):
+    __tablename__ = "daily_session_sketches"
+    
+    day = Column(Date, primary_key=True)  # KST 날짜
+    registers = Column(LargeBinary, nullable=False)  # zlib 압축된 레지스터 (app/utils/hyperloglog.py)
 
 # 백업 히스토리 모델 추가
 class BackupHistory(Base):
@@ -35,14 +83,41 @@ class BackupHistory(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     filename = Column(String, nullable=False)
-    file_size = Column(Integer, nullable=True)  # 파일 크기 (bytes)
+    file_size = Column(BigInteger, nullable=True)  # 파일 크기 (bytes, 압축 후)
+    raw_size = Column(BigInteger, nullable=True)  # 압축 전 크기 (bytes)
+    storage_path = Column(String, nullable=True)  # 서버 저장소에 보관된 경우 파일 경로
+    compression = Column(String, nullable=True)  # 'zstd', 'gzip', 'none'
+    checksum = Column(String(64), nullable=True)  # 저장된 파일의 sha256
     backup_type = Column(String, default='manual')  # 'manual', 'auto'
+    backup_mode = Column(String, default='full')  # 'full', 'incremental'
+    parent_id = Column(Integer, nullable=True)  # 증분 백업의 직전 백업 ID (체인)
+    watermark = Column(Text, nullable=True)  # JSON {테이블: 마지막으로 포함된 id/updated_at}
     tables_included = Column(Text, nullable=True)  # JSON 배열로 포함된 테이블 목록
     description = Column(Text, nullable=True)
     created_by = Column(Integer, nullable=True)  # 백업을 생성한 사용자 ID
     created_by_username = Column(String, nullable=True)  # 사용자명 (빠른 조회용)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+# 백업/복원 백그라운드 작업 (여러 워커에서 상태 조회와 취소가 가능하도록 DB에 기록)
+class BackupJob(Base):
+    __tablename__ = "backup_jobs"
+    
+    id = Column(String(32), primary_key=True)  # uuid4 hex
+    job_type = Column(String, nullable=False)  # 'backup', 'restore'
+    status = Column(String, nullable=False, default='queued', index=True)  # 'queued', 'running', 'succeeded', 'failed', 'cancelled'
+    params = Column(Text, nullable=True)  # JSON 요청 파라미터
+    progress = Column(Text, nullable=True)  # JSON {tables_total, tables_done, rows, bytes, eta_seconds, ...}
+    result = Column(Text, nullable=True)  # JSON 결과
+    error = Column(Text, nullable=True)
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    backup_id = Column(Integer, nullable=True)  # 생성/복원한 BackupHistory ID
+    created_by = Column(Integer, nullable=True)
+    created_by_username = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)  # 진행 상황을 마지막으로 기록한 시각
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
 class AIInfo(Base):
     __tablename__ = "ai_info"
     
@@ -82,6 +157,7 @@ class UserProgress(Base):
     learned_info = Column(Text)  # JSON 직렬화 문자열
     stats = Column(Text)         # JSON 직렬화 문자열
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)  # 증분 백업 워터마크
 
 class Prompt(Base):
     __tablename__ = "prompt"
@@ -106,4 +182,32 @@ class Term(Base):
     id = Column(Integer, primary_key=True, index=True)
     term = Column(String, unique=True, index=True)
     description = Column(Text)
-    created_at = Column(DateTime(timezone=True), server_default=func.now()) 
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now()) 
+
+# 리더보드 모델 (세션별 학습 지표, 진행상황 이벤트마다 증분 갱신)
+class LeaderboardEntry(Base):
+    __tablename__ = "leaderboard"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(String, unique=True, index=True, nullable=False)
+    total_learned = Column(Integer, default=0, nullable=False)  # 누적 AI 정보 학습 수
+    total_terms_learned = Column(Integer, default=0, nullable=False)  # 고유 용어 학습 수
+    streak_days = Column(Integer, default=0, nullable=False)  # 연속 학습일
+    quiz_correct = Column(Integer, default=0, nullable=False)  # 누적 정답 수
+    quiz_total = Column(Integer, default=0, nullable=False)  # 누적 문항 수
+    cumulative_quiz_score = Column(Integer, default=0, nullable=False)  # 누적 퀴즈 점수 (%)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+# 지표별 상위 N 조회용 인덱스 (동점은 session_id 순)
+Index('ix_leaderboard_total_learned_rank', LeaderboardEntry.total_learned.desc(), LeaderboardEntry.session_id)
+Index('ix_leaderboard_terms_rank', LeaderboardEntry.total_terms_learned.desc(), LeaderboardEntry.session_id)
+Index('ix_leaderboard_streak_rank', LeaderboardEntry.streak_days.desc(), LeaderboardEntry.session_id)
+Index('ix_leaderboard_quiz_rank', LeaderboardEntry.cumulative_quiz_score.desc(), LeaderboardEntry.session_id)
+
+# 지표 값별 세션 수 (순위 = 더 큰 값들의 세션 수 합 + 1). metric '__sessions__', value 0 행은 전체 세션 수
+class LeaderboardValueCount(Base):
+    __tablename__ = "leaderboard_value_counts"
+    
+    metric = Column(String(32), primary_key=True)
+    value = Column(Integer, primary_key=True)
+    sessions = Column(Integer, nullable=False, server_default='0')
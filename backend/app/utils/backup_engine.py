@@ -0,0 +1,452 @@
+import base64
+import itertools
+import json
+import os
+import re
+import tempfile
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import select, text
+
+from ..database import engine
+from ..models import User, AIInfo, UserProgress, ActivityLog, BackupHistory, Quiz, Prompt, BaseContent, Term
+from .log_export import gzip_stream
+
+# 백업 파일 형식 버전 (1.0: 단일 JSON 문서, 2.0: 테이블별 NDJSON 섹션)
+BACKUP_FORMAT_VERSION = "2.0"
+
+# 한 번에 읽어 직렬화하는 행 수 (메모리 사용량의 상한)
+BACKUP_CHUNK_ROWS = int(os.getenv("BACKUP_CHUNK_ROWS", "1000"))
+
+# 증분 백업이 가능한 테이블과 워터마크 컬럼 (그 외 테이블은 증분 백업에서도 전체를 담음)
+# activity_logs는 추가만 되므로 id, user_progress는 제자리 갱신되므로 updated_at 기준
+INCREMENTAL_COLUMNS = {'activity_logs': 'id', 'user_progress': 'updated_at'}
+
+# 워터마크 직전에 시작해 늦게 커밋된 행을 놓치지 않도록 겹쳐 읽는 범위 (복원 시 병합되므로 중복은 무해)
+BACKUP_WATERMARK_OVERLAP_IDS = int(os.getenv("BACKUP_WATERMARK_OVERLAP_IDS", "10000"))
+BACKUP_WATERMARK_OVERLAP_MINUTES = int(os.getenv("BACKUP_WATERMARK_OVERLAP_MINUTES", "10"))
+
+# 동시에 덤프하는 테이블 수 (테이블마다 DB 연결 하나 사용)
+BACKUP_PARALLELISM = int(os.getenv("BACKUP_PARALLELISM", "4"))
+
+# 병렬 덤프한 테이블 섹션을 순서대로 내보내기 전까지 보관하는 임시 디렉토리
+BACKUP_SPOOL_DIR = os.getenv("BACKUP_SPOOL_DIR", tempfile.gettempdir())
+
+_SNAPSHOT_ID = re.compile(r"^[0-9A-Fa-f]+-[0-9A-Fa-f]+(-[0-9A-Fa-f]+)?$")
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+# 서버에 백업 파일을 저장하는 디렉토리
+BACKUP_DIR = os.getenv("BACKUP_DIR", "backups")
+
+# 복원할 수 있는 백업 파일 확장자
+BACKUP_FILE_EXTENSIONS = ('.json', '.ndjson', '.ndjson.gz', '.gz', '.ndjson.zst', '.zst')
+
+# 기본 백업 대상 테이블
+DEFAULT_BACKUP_TABLES = ['users', 'ai_info', 'user_progress', 'activity_logs', 'quiz', 'prompt', 'base_content', 'term']
+
+BACKUP_TABLE_MODELS = {
+    'users': User,
+    'ai_info': AIInfo,
+    'user_progress': UserProgress,
+    'activity_logs': ActivityLog,
+    'quiz': Quiz,
+    'prompt': Prompt,
+    'base_content': BaseContent,
+    'term': Term,
+    'backup_history': BackupHistory
+}
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (bytes, memoryview)):
+        return base64.b64encode(bytes(value)).decode('ascii')
+    return value
+
+
+def _line(obj: Any) -> bytes:
+    return (json.dumps(obj, ensure_ascii=False) + '\n').encode('utf-8')
+
+
+def _watermark_value(watermark: Any) -> Any:
+    """JSON에 기록된 워터마크(정수 또는 ISO 시각 문자열)를 비교 가능한 값으로 바꿉니다."""
+    return datetime.fromisoformat(watermark) if isinstance(watermark, str) else watermark
+
+
+def _watermark_condition(column, watermark: Any):
+    """직전 백업 워터마크 이후(겹침 범위 포함)의 행을 고르는 조건"""
+    value = _watermark_value(watermark)
+    if isinstance(value, datetime):
+        return column > value - timedelta(minutes=BACKUP_WATERMARK_OVERLAP_MINUTES)
+    return column > value - BACKUP_WATERMARK_OVERLAP_IDS
+
+
+def iter_table_section(
+    db,
+    table_name: str,
+    chunk_rows: int = BACKUP_CHUNK_ROWS,
+    on_rows: Optional[Callable[[int], None]] = None,
+    since: Optional[Dict[str, Any]] = None,
+    watermarks: Optional[Dict[str, Any]] = None
+) -> Iterator[bytes]:
+    """테이블 하나를 NDJSON 섹션으로 내보냅니다.
+
+    {"table": 이름, "columns": [...], "mode": ...} 줄, 행마다 값 배열 한 줄, {"table_end": 이름, "rows": N} 줄 순서입니다.
+    서버측 커서(yield_per)로 chunk_rows씩 읽으므로 테이블 크기와 관계없이 메모리 사용량이 일정합니다.
+    db는 Session 또는 Connection입니다.
+
+    since에 이 테이블의 워터마크가 있으면 그 이후 행만 담고 mode는 "merge"(복원 시 병합),
+    없으면 전체 행을 담고 mode는 "replace"(복원 시 교체)입니다.
+    watermarks를 주면 담은 행의 워터마크 컬럼 최댓값으로 갱신합니다.
+    """
+    table = BACKUP_TABLE_MODELS[table_name].__table__
+    columns = [column.name for column in table.columns]
+    watermark_column = INCREMENTAL_COLUMNS.get(table_name)
+    query = select(table)
+    mode = "replace"
+    if since and watermark_column and since.get(table_name) is not None:
+        query = query.where(_watermark_condition(table.c[watermark_column], since[table_name]))
+        mode = "merge"
+    yield _line({"table": table_name, "columns": columns, "mode": mode})
+
+    rows = 0
+    latest = None
+    watermark_index = columns.index(watermark_column) if watermark_column else None
+    result = db.execute(query.execution_options(yield_per=chunk_rows))
+    for partition in result.partitions():
+        chunk = b''.join(_line([_json_value(value) for value in row]) for row in partition)
+        if watermark_index is not None:
+            values = [row[watermark_index] for row in partition if row[watermark_index] is not None]
+            if values:
+                latest = max(values) if latest is None else max(latest, *values)
+        rows += len(partition)
+        if on_rows:
+            on_rows(len(partition))
+        yield chunk
+
+    if watermarks is not None and latest is not None:
+        previous = watermarks.get(table_name)
+        # 겹침 범위 때문에 직전 워터마크보다 작은 값만 읽혔을 수 있음
+        if previous is None or latest > _watermark_value(previous):
+            watermarks[table_name] = _json_value(latest)
+
+    yield _line({"table_end": table_name, "rows": rows})
+
+
+def iter_backup(
+    db,
+    tables: List[str],
+    backup_info: Dict[str, Any],
+    chunk_rows: int = BACKUP_CHUNK_ROWS,
+    on_rows: Optional[Callable[[int], None]] = None,
+    since: Optional[Dict[str, Any]] = None,
+    watermarks: Optional[Dict[str, Any]] = None,
+    on_table_done: Optional[Callable[[str, int], None]] = None
+) -> Iterator[bytes]:
+    """백업 정보, 테이블 섹션들, 테이블별 행 수 요약 순으로 NDJSON 백업을 만듭니다."""
+    yield _line({"backup_info": {**backup_info, "version": BACKUP_FORMAT_VERSION, "tables_included": tables}})
+
+    counts: Dict[str, int] = {}
+    for table_name in tables:
+        def count_rows(n: int, table_name=table_name) -> None:
+            counts[table_name] = counts.get(table_name, 0) + n
+            if on_rows:
+                on_rows(n)
+        counts[table_name] = 0
+        yield from iter_table_section(db, table_name, chunk_rows, count_rows, since, watermarks)
+        if on_table_done:
+            on_table_done(table_name, counts[table_name])
+
+    yield _line({"backup_end": {"tables": counts, "watermarks": watermarks}})
+
+
+def compress_backup(chunks: Iterable[bytes], compress: bool = True) -> Iterator[bytes]:
+    return gzip_stream(chunks) if compress else iter(chunks)
+
+
+def backup_filename(timestamp: str, compress: bool = True, mode: str = "full") -> str:
+    prefix = "ai_mastery_backup" if mode == "full" else f"ai_mastery_backup_{mode}"
+    return f"{prefix}_{timestamp}.ndjson" + (".gz" if compress else "")
+
+
+def write_backup_file(path: str, chunks: Iterable[bytes]) -> int:
+    """백업 청크를 디스크에 씁니다. 임시 파일에 쓴 뒤 이름을 바꾸므로 중간 상태의 파일이 남지 않습니다."""
+    tmp_path = f"{path}.partial"
+    size = 0
+    try:
+        with open(tmp_path, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+                size += len(chunk)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return size
+
+
+def _iter_zstd_decompressed(first: bytes, chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """서버 저장소의 zstd 백업을 즉석에서 풉니다. zstandard 패키지가 필요합니다."""
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError("zstd backups require the zstandard package")
+    decompressor = zstandard.ZstdDecompressor().decompressobj()
+    for chunk in itertools.chain([first], chunks):
+        data = decompressor.decompress(chunk)
+        if data:
+            yield data
+
+
+def iter_decompressed(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """gzip/zstd면 즉석에서 풀고, 아니면 그대로 돌려줍니다. 이어 붙인 gzip 멤버도 처리합니다."""
+    chunks = iter(chunks)
+    decompressor = None
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if decompressor is None:
+            if chunk.startswith(ZSTD_MAGIC):
+                yield from _iter_zstd_decompressed(chunk, chunks)
+                return
+            if not chunk.startswith(GZIP_MAGIC):
+                yield chunk
+                yield from chunks
+                return
+            decompressor = zlib.decompressobj(31)
+        data = decompressor.decompress(chunk)
+        # 한 멤버가 끝나면 다음 멤버를 새 압축 해제기로 이어서 처리
+        while decompressor.eof and decompressor.unused_data:
+            rest = decompressor.unused_data
+            decompressor = zlib.decompressobj(31)
+            data += decompressor.decompress(rest)
+        if data:
+            yield data
+
+
+def iter_backup_lines(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """NDJSON 백업을 한 줄씩 파싱합니다. 읽는 크기만큼만 메모리를 사용합니다."""
+    pending = b''
+    for data in iter_decompressed(chunks):
+        pending += data
+        lines = pending.split(b'\n')
+        pending = lines.pop()
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+    if pending.strip():
+        yield json.loads(pending)
+
+
+def iter_file_chunks(fileobj, chunk_size: int = 1024 * 1024) -> Iterator[bytes]:
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_backup_events(chunks: Iterable[bytes], chunk_rows: int = BACKUP_CHUNK_ROWS) -> Iterator[Tuple]:
+    """백업 파일을 순서대로 읽어 이벤트로 돌려줍니다.
+
+    ("info", backup_info), ("table", 이름, 컬럼 목록, 모드), ("rows", 값 배열 목록), ("end", 이름, 행 수)
+    2.0(NDJSON, gzip 가능)은 chunk_rows 행씩 점진적으로 파싱합니다.
+    1.0(단일 JSON 문서)은 구조상 문서 전체를 한 번에 읽어야 합니다.
+    """
+    chunks = iter_decompressed(chunks)
+    head = b''
+    for chunk in chunks:
+        head += chunk
+        if b'\n' in head:
+            break
+
+    # 2.0 형식은 첫 줄이 {"backup_info": ...} 하나의 JSON 객체
+    try:
+        first = json.loads(head.split(b'\n', 1)[0])
+    except ValueError:
+        first = None
+
+    if not isinstance(first, dict) or "data" in first or "backup_info" not in first:
+        # 1.0 형식: 하나의 JSON 문서
+        document = json.loads(head + b''.join(chunks))
+        if not isinstance(document, dict) or "backup_info" not in document or "data" not in document:
+            raise ValueError("Invalid backup file format")
+        yield ("info", document["backup_info"])
+        for table_name, records in document["data"].items():
+            columns = list(records[0].keys()) if records else []
+            yield ("table", table_name, columns, "replace")
+            for start in range(0, len(records), chunk_rows):
+                yield ("rows", [[record.get(column) for column in columns] for record in records[start:start + chunk_rows]])
+            yield ("end", table_name, len(records))
+        return
+
+    table_name = None
+    rows: List[list] = []
+    for record in iter_backup_lines(itertools.chain([head], chunks)):
+        if isinstance(record, list):
+            if table_name is None:
+                raise ValueError("Row found outside of a table section")
+            rows.append(record)
+            if len(rows) >= chunk_rows:
+                yield ("rows", rows)
+                rows = []
+        elif "table" in record:
+            table_name = record["table"]
+            yield ("table", table_name, record["columns"], record.get("mode", "replace"))
+        elif "table_end" in record:
+            if rows:
+                yield ("rows", rows)
+                rows = []
+            yield ("end", record["table_end"], record.get("rows"))
+            table_name = None
+        elif "backup_info" in record:
+            yield ("info", record["backup_info"])
+    if table_name is not None:
+        raise ValueError(f"Backup file is truncated (table {table_name} has no end marker)")
+
+
+def _repeatable_read_connection():
+    return engine.connect().execution_options(isolation_level="REPEATABLE READ")
+
+
+def _spool_table(
+    table_name: str,
+    snapshot_id: str,
+    compress: bool,
+    chunk_rows: int,
+    stop: threading.Event,
+    on_rows: Optional[Callable[[int], None]],
+    since: Optional[Dict[str, Any]],
+    watermarks: Optional[Dict[str, Any]]
+) -> str:
+    """내보낸 스냅샷을 가져온 별도 연결로 테이블 하나를 임시 파일에 덤프합니다.
+
+    압축하는 경우 섹션마다 독립된 gzip 멤버가 되므로 이어 붙이기만 하면 유효한 gzip 파일이 됩니다.
+    """
+    fd, path = tempfile.mkstemp(prefix=f"backup_{table_name}_", suffix=".part", dir=BACKUP_SPOOL_DIR)
+    try:
+        with os.fdopen(fd, 'wb') as f, _repeatable_read_connection() as conn:
+            with conn.begin():
+                conn.execute(text(f"SET TRANSACTION SNAPSHOT '{snapshot_id}'"))
+                section = iter_table_section(conn, table_name, chunk_rows, on_rows, since, watermarks)
+                for chunk in compress_backup(section, compress):
+                    if stop.is_set():
+                        raise RuntimeError("Backup cancelled")
+                    f.write(chunk)
+        return path
+    except BaseException:
+        os.remove(path)
+        raise
+
+
+def _iter_spooled(path: str, chunk_size: int = 1024 * 1024) -> Iterator[bytes]:
+    try:
+        with open(path, 'rb') as f:
+            yield from iter_file_chunks(f, chunk_size)
+    finally:
+        os.remove(path)
+
+
+def iter_consistent_backup(
+    tables: List[str],
+    backup_info: Dict[str, Any],
+    compress: bool = True,
+    parallelism: int = BACKUP_PARALLELISM,
+    chunk_rows: int = BACKUP_CHUNK_ROWS,
+    on_rows: Optional[Callable[[int], None]] = None,
+    since: Optional[Dict[str, Any]] = None,
+    watermarks: Optional[Dict[str, Any]] = None,
+    on_table_done: Optional[Callable[[str, int], None]] = None
+) -> Iterator[bytes]:
+    """모든 테이블이 같은 시점을 보도록 스냅샷 하나를 기준으로 병렬 백업합니다.
+
+    REPEATABLE READ 트랜잭션에서 pg_export_snapshot()으로 스냅샷을 내보내고, 테이블마다 별도 연결이
+    SET TRANSACTION SNAPSHOT으로 같은 스냅샷을 가져와 동시에 덤프합니다. 결과는 테이블 순서대로
+    이어 붙이므로 전체 소요 시간은 가장 큰 테이블의 덤프 시간에 가깝습니다.
+    스냅샷을 내보낼 수 없으면 (예: 읽기 전용 복제본) 한 연결의 REPEATABLE READ 트랜잭션에서 순서대로 덤프합니다.
+    on_rows와 on_table_done(테이블 이름, 행 수)은 여러 덤프 스레드에서 동시에 호출될 수 있습니다.
+
+    증분 백업은 since에 직전 백업의 워터마크를 넘깁니다. watermarks는 since로 초기화한 dict를 넘기면
+    이번 백업까지의 워터마크로 갱신되며, 백업이 끝까지 만들어진 뒤 BackupHistory에 기록합니다.
+    """
+    counts: Dict[str, int] = {table_name: 0 for table_name in tables}
+    counts_lock = threading.Lock()
+
+    def counter(table_name: str) -> Callable[[int], None]:
+        def count_rows(n: int) -> None:
+            with counts_lock:
+                counts[table_name] += n
+            if on_rows:
+                on_rows(n)
+        return count_rows
+
+    header = _line({"backup_info": {**backup_info, "version": BACKUP_FORMAT_VERSION, "tables_included": tables}})
+
+    with _repeatable_read_connection() as snapshot_conn:
+        transaction = snapshot_conn.begin()
+        try:
+            snapshot_id = snapshot_conn.execute(text("SELECT pg_export_snapshot()")).scalar()
+        except Exception as e:
+            print(f"Snapshot export unavailable, dumping tables sequentially: {str(e)}")
+            transaction.rollback()
+            transaction = snapshot_conn.begin()
+            snapshot_id = None
+
+        try:
+            if snapshot_id is None or not _SNAPSHOT_ID.match(snapshot_id) or parallelism <= 1 or len(tables) <= 1:
+                # 이 트랜잭션 하나에서 순서대로 덤프 (역시 한 시점의 일관된 데이터)
+                sections = iter_backup(
+                    snapshot_conn, tables, backup_info, chunk_rows, on_rows, since, watermarks, on_table_done
+                )
+                yield from compress_backup(sections, compress)
+                return
+
+            stop = threading.Event()
+            executor = ThreadPoolExecutor(max_workers=min(parallelism, len(tables)), thread_name_prefix="backup-dump")
+            futures = [
+                executor.submit(
+                    _spool_table, table_name, snapshot_id, compress, chunk_rows, stop, counter(table_name),
+                    since, watermarks
+                )
+                for table_name in tables
+            ]
+            if on_table_done:
+                for table_name, future in zip(tables, futures):
+                    future.add_done_callback(
+                        lambda f, table_name=table_name: None if f.cancelled() or f.exception()
+                        else on_table_done(table_name, counts[table_name])
+                    )
+            try:
+                yield from compress_backup([header], compress)
+                # 내보낸 스냅샷은 이 트랜잭션이 열려 있는 동안만 가져올 수 있으므로 모든 덤프가 끝날 때까지 유지
+                for future in futures:
+                    yield from _iter_spooled(future.result())
+                yield from compress_backup([_line({"backup_end": {"tables": counts, "watermarks": watermarks}})], compress)
+            finally:
+                stop.set()
+                for future in futures:
+                    future.cancel()
+                executor.shutdown(wait=True)
+                # 전송되지 않은 임시 파일 정리
+                for future in futures:
+                    if future.done() and not future.cancelled() and future.exception() is None:
+                        path = future.result()
+                        if os.path.exists(path):
+                            os.remove(path)
+        finally:
+            # 읽기만 했으므로 롤백으로 트랜잭션 종료
+            transaction.rollback()
@@ -0,0 +1,342 @@
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import func, text
+
+from ..database import SessionLocal
+from ..models import BackupJob
+from .kst_utils import get_kst_now
+from .restore_engine import RestoreCancelled
+
+# 백업/복원 작업 전용 스레드 수. 요청 처리 스레드풀과 분리되어 큰 작업이 요청 처리를 막지 않음
+BACKUP_JOB_WORKERS = int(os.getenv("BACKUP_JOB_WORKERS", "1"))
+# 진행 상황을 DB에 기록하고 취소 요청을 확인하는 최소 간격 (초)
+BACKUP_JOB_PROGRESS_INTERVAL = float(os.getenv("BACKUP_JOB_PROGRESS_INTERVAL", "1.0"))
+# 이 시간 동안 하트비트가 없는 running 작업은 워커가 종료된 것으로 보고 실패 처리
+BACKUP_JOB_STALE_SECONDS = int(os.getenv("BACKUP_JOB_STALE_SECONDS", "300"))
+# 실행 중인 작업의 하트비트 간격 (초). 진행 상황 기록이 없는 긴 단계(인덱스 재생성, 테이블 교체 등)에도 계속 기록됨
+BACKUP_JOB_HEARTBEAT_INTERVAL = float(os.getenv("BACKUP_JOB_HEARTBEAT_INTERVAL", "30"))
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def estimate_table_rows(tables: List[str]) -> int:
+    """pg_class 통계로 테이블(파티션 포함) 행 수를 추정합니다. ETA 계산용이므로 정확하지 않아도 됨"""
+    db = SessionLocal()
+    try:
+        total = 0
+        for table_name in tables:
+            total += db.execute(text("""
+                SELECT COALESCE(SUM(GREATEST(c.reltuples, 0)), 0)
+                FROM pg_class c
+                WHERE c.oid = to_regclass(:table)
+                   OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = to_regclass(:table))
+            """), {"table": table_name}).scalar() or 0
+        return int(total)
+    except Exception as e:
+        print(f"Failed to estimate table rows: {str(e)}")
+        return 0
+    finally:
+        db.close()
+
+
+class JobContext:
+    """작업 함수에 넘겨지는 진행 상황 기록기. 여러 덤프 스레드에서 동시에 호출될 수 있습니다.
+
+    total_rows 또는 total_bytes를 알면 처리 속도로 ETA를 계산합니다.
+    """
+
+    def __init__(self, job_id: str, tables_total: int = 0, total_rows: int = 0, total_bytes: int = 0):
+        self.job_id = job_id
+        self.tables_total = tables_total
+        self.total_rows = total_rows
+        self.total_bytes = total_bytes
+        self.tables_done = 0
+        self.rows = 0
+        self.bytes = 0
+        self.current_table: Optional[str] = None
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+        self._cancelled = False
+
+    def add_rows(self, n: int, table_name: Optional[str] = None) -> None:
+        with self._lock:
+            self.rows += n
+            if table_name:
+                self.current_table = table_name
+        self.flush()
+
+    def add_bytes(self, n: int) -> None:
+        with self._lock:
+            self.bytes += n
+        self.flush()
+
+    def table_done(self, table_name: str, *_: Any) -> None:
+        with self._lock:
+            self.tables_done += 1
+            self.current_table = table_name
+        self.flush()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            elapsed = max(time.time() - self.started, 0.001)
+            eta = None
+            if self.total_rows and self.rows:
+                eta = max(self.total_rows - self.rows, 0) * elapsed / self.rows
+            elif self.total_bytes and self.bytes:
+                eta = max(self.total_bytes - self.bytes, 0) * elapsed / self.bytes
+            return {
+                "tables_total": self.tables_total,
+                "tables_done": self.tables_done,
+                "current_table": self.current_table,
+                "rows": self.rows,
+                "rows_estimated": self.total_rows or None,
+                "bytes": self.bytes,
+                "bytes_total": self.total_bytes or None,
+                "rows_per_sec": round(self.rows / elapsed),
+                "elapsed_seconds": round(elapsed, 1),
+                "eta_seconds": round(eta) if eta is not None else None
+            }
+
+    def flush(self, force: bool = False) -> None:
+        """진행 상황을 기록하고 취소 요청을 확인합니다. 간격보다 자주 호출되면 건너뜁니다."""
+        now = time.time()
+        with self._lock:
+            if not force and now - self._last_flush < BACKUP_JOB_PROGRESS_INTERVAL:
+                return
+            self._last_flush = now
+        db = SessionLocal()
+        try:
+            job = db.query(BackupJob).filter(BackupJob.id == self.job_id).first()
+            if job:
+                job.progress = json.dumps(self.snapshot())
+                job.heartbeat_at = func.now()
+                if job.cancel_requested:
+                    self._cancelled = True
+                db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"Failed to record progress for job {self.job_id}: {str(e)}")
+        finally:
+            db.close()
+
+    def should_cancel(self) -> bool:
+        self.flush()
+        return self._cancelled
+
+    def check_cancelled(self) -> None:
+        if self.should_cancel():
+            raise JobCancelled("Job cancelled")
+
+
+class BackupJobRunner:
+    """백업/복원 작업을 전용 스레드풀에서 실행하고 상태를 backup_jobs 테이블에 기록합니다.
+
+    실행은 작업을 받은 워커 프로세스에서 이루어지지만 상태 조회와 취소 요청은 DB를 거치므로
+    어느 워커로 요청이 가도 동작합니다.
+    """
+
+    def __init__(self, max_workers: int = BACKUP_JOB_WORKERS):
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.running = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="backup-job")
+            return self._executor
+
+    def submit(
+        self,
+        job_type: str,
+        work: Callable[[JobContext], Dict[str, Any]],
+        params: Dict[str, Any],
+        user_id: Optional[int] = None,
+        username: Optional[str] = None,
+        context: Optional[Callable[[str], JobContext]] = None
+    ) -> str:
+        """작업을 기록하고 실행 대기열에 넣습니다. 작업 ID를 바로 반환합니다.
+
+        context는 작업 시작 시 JobContext를 만드는 함수로, 전체 행/바이트 수 추정 등에 사용합니다.
+        work의 반환값은 결과로 기록되며 "backup_id"가 있으면 작업에도 연결합니다.
+        """
+        job_id = uuid.uuid4().hex
+        db = SessionLocal()
+        try:
+            db.add(BackupJob(
+                id=job_id,
+                job_type=job_type,
+                status='queued',
+                params=json.dumps(params, ensure_ascii=False),
+                created_by=user_id,
+                created_by_username=username
+            ))
+            db.commit()
+        finally:
+            db.close()
+
+        self.submitted += 1
+        self._get_executor().submit(self._run, job_id, work, context or JobContext)
+        return job_id
+
+    def _set(self, job_id: str, **values: Any) -> bool:
+        """대기/실행 중인 작업의 상태를 바꿉니다. 이미 끝난 작업(실패 처리 등)은 덮어쓰지 않습니다."""
+        db = SessionLocal()
+        try:
+            updated = db.query(BackupJob).filter(
+                BackupJob.id == job_id,
+                BackupJob.status.in_(ACTIVE_STATUSES)
+            ).update(values, synchronize_session=False)
+            db.commit()
+            return updated > 0
+        finally:
+            db.close()
+
+    def _heartbeat(self, job_id: str, stop: threading.Event) -> None:
+        """작업이 실행되는 동안 BACKUP_JOB_HEARTBEAT_INTERVAL마다 heartbeat_at을 갱신합니다."""
+        while not stop.wait(BACKUP_JOB_HEARTBEAT_INTERVAL):
+            db = SessionLocal()
+            try:
+                db.query(BackupJob).filter(
+                    BackupJob.id == job_id,
+                    BackupJob.status == 'running'
+                ).update({"heartbeat_at": func.now()}, synchronize_session=False)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                print(f"Failed to record heartbeat for job {job_id}: {str(e)}")
+            finally:
+                db.close()
+
+    def _run(self, job_id: str, work: Callable[[JobContext], Dict[str, Any]], context: Callable[[str], JobContext]) -> None:
+        with self._lock:
+            self.running += 1
+        ctx: Optional[JobContext] = None
+        try:
+            db = SessionLocal()
+            try:
+                job = db.query(BackupJob).filter(BackupJob.id == job_id).first()
+                cancelled = job is None or job.cancel_requested
+            finally:
+                db.close()
+            if cancelled:
+                self._set(job_id, status='cancelled', finished_at=func.now())
+                return
+
+            if not self._set(job_id, status='running', started_at=func.now(), heartbeat_at=func.now()):
+                return
+            stop = threading.Event()
+            heartbeat = threading.Thread(
+                target=self._heartbeat, args=(job_id, stop), name=f"backup-job-heartbeat-{job_id[:8]}", daemon=True
+            )
+            heartbeat.start()
+            try:
+                ctx = context(job_id)
+                result = work(ctx)
+            except (JobCancelled, RestoreCancelled):
+                progress = json.dumps(ctx.snapshot()) if ctx else None
+                self._set(job_id, status='cancelled', progress=progress, finished_at=func.now())
+                print(f"Backup job {job_id} cancelled")
+                return
+            except Exception as e:
+                progress = json.dumps(ctx.snapshot()) if ctx else None
+                self._set(job_id, status='failed', error=str(e), progress=progress, finished_at=func.now())
+                print(f"Backup job {job_id} failed: {str(e)}")
+                return
+            finally:
+                stop.set()
+                heartbeat.join()
+
+            self._set(
+                job_id,
+                status='succeeded',
+                result=json.dumps(result, ensure_ascii=False, default=str),
+                backup_id=(result or {}).get("backup_id"),
+                progress=json.dumps(ctx.snapshot()),
+                finished_at=func.now()
+            )
+        except Exception as e:
+            print(f"Failed to record backup job {job_id}: {str(e)}")
+        finally:
+            with self._lock:
+                self.running -= 1
+
+    def request_cancel(self, job_id: str) -> bool:
+        """취소를 요청합니다. 실행 중인 작업은 다음 진행 상황 기록 시점에 중단됩니다."""
+        db = SessionLocal()
+        try:
+            updated = db.query(BackupJob).filter(
+                BackupJob.id == job_id,
+                BackupJob.status.in_(ACTIVE_STATUSES)
+            ).update({"cancel_requested": True}, synchronize_session=False)
+            db.commit()
+            return updated > 0
+        finally:
+            db.close()
+
+    def mark_stale_jobs(self) -> int:
+        """하트비트가 끊긴 running 작업(워커 재시작 등)을 실패로 표시합니다."""
+        cutoff = get_kst_now() - timedelta(seconds=BACKUP_JOB_STALE_SECONDS)
+        db = SessionLocal()
+        try:
+            updated = db.query(BackupJob).filter(
+                BackupJob.status == 'running',
+                BackupJob.heartbeat_at < cutoff
+            ).update({
+                "status": 'failed',
+                "error": "Job stopped reporting progress (worker exited?)",
+                "finished_at": func.now()
+            }, synchronize_session=False)
+            db.commit()
+            return updated
+        finally:
+            db.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "submitted": self.submitted,
+                "running": self.running
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def job_to_dict(job: BackupJob) -> Dict[str, Any]:
+    return {
+        "id": job.id,
+        "job_type": job.job_type,
+        "status": job.status,
+        "params": json.loads(job.params) if job.params else {},
+        "progress": json.loads(job.progress) if job.progress else None,
+        "result": json.loads(job.result) if job.result else None,
+        "error": job.error,
+        "cancel_requested": job.cancel_requested,
+        "backup_id": job.backup_id,
+        "created_by": job.created_by_username,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None
+    }
+
+
+backup_jobs = BackupJobRunner()
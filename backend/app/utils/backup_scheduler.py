@@ -0,0 +1,353 @@
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import text
+
+from ..database import SessionLocal, engine
+from ..models import BackupHistory
+from .backup_engine import DEFAULT_BACKUP_TABLES, iter_consistent_backup
+from .backup_store import find_incremental_parent, record_backup_history, remove_stored, resolve_codec, save_backup, stored_filename
+from .event_codes import EventCode
+from .kst_utils import get_kst_now
+
+# 자동 백업 일정 (KST 기준 cron 형식: 분 시 일 월 요일, 예: "0 4 * * *"). 기본값은 사용하지 않음
+# 백업 파일이 남아 있어야 하므로 영구 저장소를 가리키는 BACKUP_DIR도 함께 지정해야 동작함
+BACKUP_SCHEDULE = os.getenv("BACKUP_SCHEDULE", "off")
+# 증분 자동 백업 일정 (같은 시각에 전체 백업이 잡혀 있으면 전체 백업만 실행)
+BACKUP_INCREMENTAL_SCHEDULE = os.getenv("BACKUP_INCREMENTAL_SCHEDULE", "")
+# 보존 정책: 최근 N개 자동 백업 체인(전체 백업 + 그 증분 백업들)만 유지. 0이면 개수 제한 없음
+BACKUP_RETENTION_COUNT = int(os.getenv("BACKUP_RETENTION_COUNT", "7"))
+# 보존 정책: 마지막 백업이 N일보다 오래된 자동 백업 체인 삭제. 0이면 기간 제한 없음
+BACKUP_RETENTION_DAYS = int(os.getenv("BACKUP_RETENTION_DAYS", "30"))
+
+# 여러 워커 중 하나만 예약 백업을 실행하도록 하는 advisory lock 키
+BACKUP_SCHEDULE_LOCK_KEY = 7320002
+
+# 요일은 0과 7 모두 일요일이므로 7까지 받고, 범위를 펼친 뒤 7을 0으로 바꿈
+_FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+
+def _parse_field(field: str, low: int, high: int) -> Set[int]:
+    values: Set[int] = set()
+    for part in field.split(','):
+        step = 1
+        if '/' in part:
+            part, step_text = part.split('/', 1)
+            step = int(step_text)
+            if step <= 0:
+                raise ValueError(f"Invalid cron step: {field}")
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start, end = (int(value) for value in part.split('-', 1))
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+        if start < low or end > high or start > end:
+            raise ValueError(f"Cron field out of range: {field}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    """분 시 일 월 요일 5개 필드의 cron 표현식 (*, 목록, 범위, /간격 지원, 요일 0=일요일, 7도 일요일)
+
+    일과 요일이 모두 지정되면 cron과 같이 둘 중 하나만 맞아도 실행합니다.
+    """
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression}")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            _parse_field(field, low, high) for field, (low, high) in zip(fields, _FIELD_RANGES)
+        )
+        self.weekdays = {0 if weekday == 7 else weekday for weekday in weekdays}
+        self._any_day = fields[2] == '*'
+        self._any_weekday = fields[4] == '*'
+
+    def _day_matches(self, dt: datetime) -> bool:
+        day_ok = dt.day in self.days
+        weekday_ok = (dt.weekday() + 1) % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def matches(self, dt: datetime) -> bool:
+        return (
+            dt.minute in self.minutes and dt.hour in self.hours
+            and dt.month in self.months and self._day_matches(dt)
+        )
+
+    def next_after(self, dt: datetime) -> datetime:
+        """dt 이후 처음으로 일정에 맞는 분 (dt와 같은 시간대)"""
+        candidate = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if candidate.month not in self.months or not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+            elif candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Cron expression never matches: {self.expression}")
+
+
+def parse_schedule(expression: Optional[str]) -> Optional[CronSchedule]:
+    if not expression or expression.strip().lower() in ('off', 'none', 'disabled'):
+        return None
+    return CronSchedule(expression.strip())
+
+
+def _backup_chains(backups: List[BackupHistory]) -> List[List[BackupHistory]]:
+    """백업을 parent_id로 묶어 체인(루트 전체 백업 + 증분 백업들) 목록으로 만듭니다. 최신 체인이 먼저"""
+    by_id = {backup.id: backup for backup in backups}
+    chains: Dict[int, List[BackupHistory]] = {}
+    for backup in backups:
+        root = backup
+        seen = set()
+        while root.parent_id and root.parent_id in by_id and root.id not in seen:
+            seen.add(root.id)
+            root = by_id[root.parent_id]
+        chains.setdefault(root.id, []).append(backup)
+    return sorted(chains.values(), key=lambda chain: max(b.created_at for b in chain), reverse=True)
+
+
+def prune_backups(
+    retention_count: int = BACKUP_RETENTION_COUNT,
+    retention_days: int = BACKUP_RETENTION_DAYS
+) -> Dict[str, Any]:
+    """보존 정책에 따라 자동 백업을 체인 단위로 삭제합니다.
+
+    체인 전체가 자동 백업일 때만 삭제하므로 남아 있는 증분 백업의 부모가 사라지지 않습니다.
+    가장 최근 체인은 항상 남깁니다.
+    """
+    db = SessionLocal()
+    try:
+        chains = _backup_chains(db.query(BackupHistory).all())
+        cutoff = get_kst_now() - timedelta(days=retention_days) if retention_days > 0 else None
+
+        auto_chains = [chain for chain in chains if all(b.backup_type == 'auto' for b in chain)]
+        expired = []
+        for index, chain in enumerate(auto_chains):
+            if index == 0:
+                continue
+            newest = max(b.created_at for b in chain)
+            if (retention_count > 0 and index >= retention_count) or (cutoff and newest < cutoff):
+                expired.append(chain)
+
+        deleted = []
+        for chain in expired:
+            for backup in chain:
+                try:
+                    remove_stored(backup.storage_path)
+                except OSError as e:
+                    print(f"Failed to delete backup file {backup.storage_path}: {str(e)}")
+                deleted.append(backup.filename)
+                db.delete(backup)
+        db.commit()
+        return {"deleted": deleted, "kept_chains": len(auto_chains) - len(expired)}
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def run_scheduled_backup(mode: str, slot: datetime) -> Optional[Dict[str, Any]]:
+    """예약된 백업 하나를 실행합니다. 다른 워커가 이미 실행했거나 실행 중이면 None을 반환합니다.
+
+    advisory lock을 잡은 연결을 백업이 끝날 때까지 유지하고, 같은 예약 시각의 자동 백업이 이미
+    기록되어 있으면 건너뜁니다.
+    """
+    with engine.connect() as lock_conn:
+        acquired = lock_conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": BACKUP_SCHEDULE_LOCK_KEY}).scalar()
+        # 세션 단위 잠금이므로 트랜잭션은 바로 끝내 백업 동안 idle in transaction으로 남지 않게 함
+        lock_conn.commit()
+        if not acquired:
+            return None
+        try:
+            db = SessionLocal()
+            try:
+                already_done = db.query(BackupHistory).filter(
+                    BackupHistory.backup_type == 'auto',
+                    BackupHistory.created_at >= slot
+                ).first() is not None
+            finally:
+                db.close()
+            if already_done:
+                return None
+            return _create_auto_backup(mode)
+        finally:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": BACKUP_SCHEDULE_LOCK_KEY})
+            lock_conn.commit()
+
+
+def _create_auto_backup(mode: str) -> Dict[str, Any]:
+    from ..api.logs import log_activity
+
+    # 증분 백업의 부모는 저장소에 파일이 있는 백업이어야 체인으로 복원할 수 있음
+    parent = find_incremental_parent(stored_only=True) if mode == "incremental" else None
+    if mode == "incremental" and not parent:
+        mode = "full"
+    since = json.loads(parent.watermark) if parent else None
+    watermarks: Dict[str, Any] = dict(since or {})
+
+    codec = resolve_codec()
+    filename = stored_filename(get_kst_now().strftime("%Y%m%d_%H%M%S"), codec, mode)
+    tables = list(DEFAULT_BACKUP_TABLES)
+    backup_info = {
+        "created_at": get_kst_now().isoformat(),
+        "created_by": "scheduler",
+        "description": "Scheduled backup",
+        "mode": mode,
+        "filename": filename,
+        "parent_filename": parent.filename if parent else None
+    }
+
+    try:
+        chunks = iter_consistent_backup(tables, backup_info, False, since=since, watermarks=watermarks)
+        stored = save_backup(filename, chunks, codec)
+    except Exception as e:
+        log_activity(
+            db=None,
+            action="자동 백업 실패",
+            details=f"예약된 백업에 실패했습니다. 파일명: {filename}, 오류: {str(e)}",
+            log_type="system",
+            log_level="error",
+            event_code=EventCode.BACKUP_FAILED,
+            attributes={"filename": filename, "mode": mode, "error": str(e)}
+        )
+        raise
+
+    backup_id = record_backup_history(
+        filename=filename,
+        file_size=stored["file_size"],
+        raw_size=stored["raw_size"],
+        storage_path=stored["path"],
+        compression=stored["compression"],
+        checksum=stored["checksum"],
+        backup_type='auto',
+        backup_mode=mode,
+        parent_id=parent.id if parent else None,
+        watermark=json.dumps(watermarks),
+        tables_included=json.dumps(tables),
+        description="Scheduled backup"
+    )
+    log_activity(
+        db=None,
+        action="시스템 백업 생성",
+        details=f"백업 파일이 생성되었습니다. 파일명: {filename}, 크기: {stored['file_size']} bytes",
+        log_type="system",
+        log_level="success",
+        event_code=EventCode.BACKUP_CREATED,
+        attributes={"filename": filename, "size_bytes": stored["file_size"], "mode": mode, "backup_type": "auto"}
+    )
+    return {"backup_id": backup_id, "filename": filename, "mode": mode, "file_size": stored["file_size"]}
+
+
+class BackupScheduler:
+    """KST 기준 cron 일정에 따라 자동 백업과 보존 정책을 실행하는 백그라운드 스레드
+
+    모든 워커에서 실행되지만 advisory lock과 예약 시각 확인으로 한 워커만 백업합니다.
+    """
+
+    def __init__(
+        self,
+        schedule: Optional[str] = BACKUP_SCHEDULE,
+        incremental_schedule: Optional[str] = BACKUP_INCREMENTAL_SCHEDULE
+    ):
+        self.full = self._parse(schedule)
+        self.incremental = self._parse(incremental_schedule)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.next_run: Optional[datetime] = None
+        self.next_mode: Optional[str] = None
+        self.last_result: Optional[Dict[str, Any]] = None
+        self.last_error: Optional[str] = None
+        self.last_run_at: Optional[datetime] = None
+
+    @staticmethod
+    def _parse(expression: Optional[str]) -> Optional[CronSchedule]:
+        # 잘못된 일정 때문에 앱 시작이 실패하지 않도록 해당 일정만 끔
+        try:
+            return parse_schedule(expression)
+        except ValueError as e:
+            print(f"Invalid backup schedule '{expression}', disabled: {str(e)}")
+            return None
+
+    def _next(self, now: datetime):
+        candidates = []
+        if self.full:
+            candidates.append((self.full.next_after(now), "full"))
+        if self.incremental:
+            candidates.append((self.incremental.next_after(now), "incremental"))
+        if not candidates:
+            return None, None
+        # 같은 시각이면 전체 백업 우선 ("full" < "incremental")
+        return min(candidates)
+
+    def _run(self) -> None:
+        self.next_run, self.next_mode = self._next(get_kst_now())
+        while not self._stop.is_set() and self.next_run:
+            remaining = (self.next_run - get_kst_now()).total_seconds()
+            if remaining > 0:
+                # 시계 변경에 대비해 최대 1분씩 기다리며 다시 확인
+                self._stop.wait(min(remaining, 60))
+                continue
+
+            slot, mode = self.next_run, self.next_mode
+            try:
+                result = run_scheduled_backup(mode, slot)
+                if result is not None:
+                    result["pruned"] = prune_backups()
+                    self.last_result = result
+                    self.last_error = None
+                    self.last_run_at = get_kst_now()
+                    print(f"Scheduled {result['mode']} backup created: {result['filename']}")
+            except Exception as e:
+                self.last_error = str(e)
+                self.last_run_at = get_kst_now()
+                print(f"Scheduled backup failed: {str(e)}")
+            self.next_run, self.next_mode = self._next(max(get_kst_now(), slot))
+
+    def start(self) -> None:
+        if not self.full and not self.incremental:
+            return
+        if not os.getenv("BACKUP_DIR"):
+            # 기본 디렉토리(상대 경로 backups)는 재배포 시 사라질 수 있는 디스크일 수 있으므로 자동 백업을 시작하지 않음
+            print("Backup schedule is set but BACKUP_DIR is not; scheduled backups disabled")
+            return
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="backup-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "enabled": bool(self.full or self.incremental) and bool(os.getenv("BACKUP_DIR")),
+            "schedule": self.full.expression if self.full else None,
+            "incremental_schedule": self.incremental.expression if self.incremental else None,
+            "timezone": "Asia/Seoul",
+            "next_run": self.next_run.isoformat() if self.next_run else None,
+            "next_mode": self.next_mode,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_result": self.last_result,
+            "last_error": self.last_error,
+            "retention_count": BACKUP_RETENTION_COUNT,
+            "retention_days": BACKUP_RETENTION_DAYS
+        }
+
+
+# 프로세스 전역 자동 백업 스케줄러
+backup_scheduler = BackupScheduler()
@@ -0,0 +1,178 @@
+import hashlib
+import importlib.util
+import os
+import re
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from ..database import SessionLocal
+from ..models import BackupHistory
+from .backup_engine import BACKUP_DIR, backup_filename, iter_file_chunks, write_backup_file
+from .log_export import gzip_stream
+
+# 서버에 저장하는 백업의 압축 방식 ('zstd', 'gzip', 'none'). zstandard 패키지가 없는 환경에서는 zstd 대신 gzip 사용
+BACKUP_STORE_CODEC = os.getenv("BACKUP_STORE_CODEC", "zstd")
+BACKUP_ZSTD_LEVEL = int(os.getenv("BACKUP_ZSTD_LEVEL", "3"))
+
+CODEC_EXTENSIONS = {'zstd': '.zst', 'gzip': '.gz', 'none': ''}
+CODEC_MEDIA_TYPES = {'zstd': 'application/zstd', 'gzip': 'application/gzip', 'none': 'application/x-ndjson'}
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def zstd_available() -> bool:
+    return importlib.util.find_spec("zstandard") is not None
+
+
+def resolve_codec(codec: Optional[str] = None) -> str:
+    """요청한 압축 방식을 확인합니다. zstandard가 없으면 gzip으로 대신합니다."""
+    codec = (codec or BACKUP_STORE_CODEC).lower()
+    if codec not in CODEC_EXTENSIONS:
+        raise ValueError(f"Unknown compression: {codec}")
+    if codec == 'zstd' and not zstd_available():
+        print("zstandard package not installed, storing backup with gzip")
+        return 'gzip'
+    return codec
+
+
+def zstd_stream(chunks: Iterable[bytes], level: int = BACKUP_ZSTD_LEVEL) -> Iterator[bytes]:
+    """바이트 청크를 zstd 프레임 하나로 즉석 압축합니다."""
+    import zstandard
+    compressor = zstandard.ZstdCompressor(level=level).compressobj()
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def encode_stream(chunks: Iterable[bytes], codec: str) -> Iterator[bytes]:
+    if codec == 'zstd':
+        return zstd_stream(chunks)
+    if codec == 'gzip':
+        return gzip_stream(chunks)
+    return iter(chunks)
+
+
+def stored_filename(timestamp: str, codec: str, mode: str = "full") -> str:
+    return backup_filename(timestamp, False, mode) + CODEC_EXTENSIONS[codec]
+
+
+def store_path(filename: str) -> str:
+    """저장소 안의 파일 경로. 디렉토리를 벗어나는 이름은 거부합니다."""
+    name = os.path.basename(filename or '')
+    if not name or name != filename:
+        raise ValueError(f"Invalid backup filename: {filename}")
+    return os.path.join(BACKUP_DIR, name)
+
+
+def save_backup(filename: str, chunks: Iterable[bytes], codec: str) -> Dict[str, Any]:
+    """압축하지 않은 NDJSON 백업 청크를 압축해 저장소에 씁니다.
+
+    쓰는 동안 압축 전 크기와 저장된 바이트의 sha256을 함께 계산하므로 파일을 다시 읽지 않습니다.
+    반환값: {"path", "file_size", "raw_size", "checksum", "compression"}
+    """
+    os.makedirs(BACKUP_DIR, exist_ok=True)
+    path = store_path(filename)
+    digest = hashlib.sha256()
+    raw_size = 0
+
+    def counted() -> Iterator[bytes]:
+        nonlocal raw_size
+        for chunk in chunks:
+            raw_size += len(chunk)
+            yield chunk
+
+    def hashed() -> Iterator[bytes]:
+        for chunk in encode_stream(counted(), codec):
+            digest.update(chunk)
+            yield chunk
+
+    file_size = write_backup_file(path, hashed())
+    return {
+        "path": path,
+        "file_size": file_size,
+        "raw_size": raw_size,
+        "checksum": digest.hexdigest(),
+        "compression": codec
+    }
+
+
+def file_checksum(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter_file_chunks(f):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def verify_backup(path: str, checksum: Optional[str]) -> bool:
+    """저장된 파일이 기록된 체크섬과 일치하는지 확인합니다. 체크섬이 없던 과거 백업은 통과시킵니다."""
+    return not checksum or file_checksum(path) == checksum
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Range 헤더(단일 bytes 범위)를 (시작, 끝) 포함 범위로 바꿉니다.
+
+    헤더가 없거나 지원하지 않는 형식(여러 범위 등)이면 None을 돌려 전체 파일을 보내게 하고,
+    파일 밖의 범위면 ValueError를 냅니다 (416 응답).
+    """
+    if not header:
+        return None
+    match = _RANGE.match(header.strip())
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    first, last = match.groups()
+    if first == '':
+        # bytes=-N: 마지막 N바이트
+        length = int(last)
+        if length == 0:
+            raise ValueError("Unsatisfiable range")
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("Unsatisfiable range")
+    return start, end
+
+
+def iter_file_range(path: str, start: int, end: int, chunk_size: int = 1024 * 1024) -> Iterator[bytes]:
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                return
+            remaining -= len(chunk)
+            yield chunk
+
+
+def remove_stored(path: Optional[str]) -> bool:
+    if path and os.path.exists(path):
+        os.remove(path)
+        return True
+    return False
+
+
+def find_incremental_parent(stored_only: bool = False) -> Optional[BackupHistory]:
+    """증분 백업의 부모: 워터마크가 기록된 가장 최근 백업. stored_only면 저장소에 파일이 있는 백업만"""
+    db = SessionLocal()
+    try:
+        query = db.query(BackupHistory).filter(BackupHistory.watermark.isnot(None))
+        if stored_only:
+            query = query.filter(BackupHistory.storage_path.isnot(None))
+        return query.order_by(BackupHistory.created_at.desc()).first()
+    finally:
+        db.close()
+
+
+def record_backup_history(**fields: Any) -> int:
+    """BackupHistory 항목을 저장하고 ID를 반환합니다."""
+    db = SessionLocal()
+    try:
+        history = BackupHistory(**fields)
+        db.add(history)
+        db.commit()
+        return history.id
+    finally:
+        db.close()
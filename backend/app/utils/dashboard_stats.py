@@ -0,0 +1,309 @@
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import pytz
+from sqlalchemy import func, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from ..models import AIInfo, BaseContent, DailySessionSketch, DailyStat, Prompt, Quiz, Term, User
+from .event_codes import EventCode
+from .hyperloglog import HyperLogLog
+from .kst_utils import get_kst_now
+
+# 관리자 대시보드 통계를 메모리에 보관하는 시간 (초). 집계 테이블은 즉시 갱신되므로 짧게 유지
+DASHBOARD_CACHE_SECONDS = int(os.getenv("DASHBOARD_CACHE_SECONDS", "30"))
+
+DASHBOARD_PERIODS = (7, 30)
+# 활성 세션 집계 기간 (일, 주, 월)
+ACTIVE_USER_WINDOWS = {'daily': 1, 'weekly': 7, 'monthly': 30}
+STAT_COLUMNS = ('active_sessions', 'quiz_completions', 'learn_events', 'new_users')
+LEARN_EVENT_CODES = (EventCode.LEARN_AI_INFO, EventCode.LEARN_TERM)
+
+KST = pytz.timezone('Asia/Seoul')
+DAY_NAMES = ['월', '화', '수', '목', '금', '토', '일']
+
+_cache: Dict[Any, Tuple[float, Any]] = {}
+_cache_lock = threading.Lock()
+
+
+def kst_day(created_at: datetime) -> date:
+    """시각의 KST 날짜. timezone 정보가 없으면 KST로 간주합니다."""
+    if created_at.tzinfo is None:
+        return created_at.date()
+    return created_at.astimezone(KST).date()
+
+
+def _increment(db: Session, values: List[Dict[str, Any]]) -> None:
+    stmt = pg_insert(DailyStat).values(sorted(values, key=lambda value: value["day"]))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['day'],
+        set_={column: getattr(DailyStat, column) + stmt.excluded[column] for column in STAT_COLUMNS}
+    )
+    db.execute(stmt)
+
+
+def _merge_sketch(db: Session, day: date, delta: HyperLogLog) -> int:
+    """day의 세션 스케치에 delta를 합치고 추정치가 늘어난 만큼을 반환합니다.
+
+    행을 FOR UPDATE로 잠가 여러 워커가 같은 날의 스케치를 동시에 고쳐도 갱신이 사라지지 않게 합니다.
+    추정치 증가분을 더해 가므로 daily_stats.active_sessions는 항상 스케치의 추정치와 같습니다.
+    """
+    db.execute(
+        pg_insert(DailySessionSketch).values(day=day, registers=HyperLogLog().to_bytes()).on_conflict_do_nothing()
+    )
+    stored = db.execute(
+        select(DailySessionSketch.registers).where(DailySessionSketch.day == day).with_for_update()
+    ).scalar_one()
+    sketch = HyperLogLog.from_bytes(stored)
+    before = HyperLogLog(registers=bytes(sketch.registers))
+    sketch.merge(delta)
+    if sketch.registers == before.registers:
+        return 0
+    db.execute(
+        update(DailySessionSketch).where(DailySessionSketch.day == day).values(registers=sketch.to_bytes())
+    )
+    return sketch.count() - before.count()
+
+
+def apply_daily_stats(db: Session, rows: Iterable[Dict[str, Any]]) -> None:
+    """기록된 로그 행들을 일별 집계에 더합니다. 호출자의 트랜잭션 안에서 실행됩니다.
+
+    활성 세션 수는 그날의 HyperLogLog 스케치에 세션 ID를 더해 추정합니다.
+    """
+    quizzes = Counter()
+    learns = Counter()
+    sessions: Dict[date, HyperLogLog] = {}
+    for row in rows:
+        created_at = row.get("created_at")
+        if created_at is None:
+            continue
+        day = kst_day(created_at)
+        code = row.get("event_code")
+        if code == EventCode.QUIZ_COMPLETED:
+            quizzes[day] += row.get("event_count") or 1
+        elif code in LEARN_EVENT_CODES:
+            learns[day] += row.get("event_count") or 1
+        session_id = row.get("session_id")
+        if session_id:
+            sessions.setdefault(day, HyperLogLog()).add(session_id)
+
+    # 교착을 피하도록 날짜 순서로 잠금
+    new_sessions = Counter({day: _merge_sketch(db, day, sessions[day]) for day in sorted(sessions)})
+
+    days = set(quizzes) | set(learns) | {day for day, count in new_sessions.items() if count}
+    if not days:
+        return
+    _increment(db, [
+        {
+            "day": day,
+            "active_sessions": new_sessions[day],
+            "quiz_completions": quizzes[day],
+            "learn_events": learns[day],
+            "new_users": 0
+        }
+        for day in days
+    ])
+
+
+def record_new_user(db: Session, created_at: Optional[datetime] = None) -> None:
+    """가입한 사용자를 일별 집계에 더합니다. 호출자의 트랜잭션 안에서 실행됩니다."""
+    _increment(db, [{
+        "day": kst_day(created_at or get_kst_now()),
+        "active_sessions": 0,
+        "quiz_completions": 0,
+        "learn_events": 0,
+        "new_users": 1
+    }])
+
+
+def rebuild_daily_stats(db: Session) -> int:
+    """activity_logs와 users로부터 일별 집계와 세션 스케치를 다시 만듭니다."""
+    db.query(DailySessionSketch).delete()
+    db.query(DailyStat).delete()
+
+    sketches: Dict[date, HyperLogLog] = defaultdict(HyperLogLog)
+    sessions = db.connection().execution_options(stream_results=True, yield_per=10000).execute(text("""
+        SELECT DISTINCT (created_at AT TIME ZONE 'Asia/Seoul')::date, session_id
+        FROM activity_logs
+        WHERE session_id IS NOT NULL AND created_at IS NOT NULL
+    """))
+    for day, session_id in sessions:
+        sketches[day].add(session_id)
+
+    db.execute(text("""
+        INSERT INTO daily_stats (day, active_sessions, quiz_completions, learn_events, new_users)
+        SELECT day, 0, SUM(quiz_completions), SUM(learn_events), SUM(new_users)
+        FROM (
+            SELECT (created_at AT TIME ZONE 'Asia/Seoul')::date AS day,
+                   SUM(CASE WHEN event_code = :quiz THEN COALESCE(event_count, 1) ELSE 0 END) AS quiz_completions,
+                   SUM(CASE WHEN event_code = ANY(:learn) THEN COALESCE(event_count, 1) ELSE 0 END) AS learn_events,
+                   0 AS new_users
+            FROM activity_logs
+            WHERE created_at IS NOT NULL AND (event_code = :quiz OR event_code = ANY(:learn))
+            GROUP BY 1
+            UNION ALL
+            SELECT (created_at AT TIME ZONE 'Asia/Seoul')::date, 0, 0, COUNT(*)
+            FROM users
+            WHERE created_at IS NOT NULL
+            GROUP BY 1
+        ) counts
+        GROUP BY day
+    """), {
+        "quiz": EventCode.QUIZ_COMPLETED.value,
+        "learn": [code.value for code in LEARN_EVENT_CODES]
+    })
+    if sketches:
+        db.execute(pg_insert(DailySessionSketch).values([
+            {"day": day, "registers": sketch.to_bytes()} for day, sketch in sketches.items()
+        ]))
+        estimates = [
+            {"day": day, "active_sessions": sketch.count(), "quiz_completions": 0, "learn_events": 0, "new_users": 0}
+            for day, sketch in sketches.items()
+        ]
+        _increment(db, estimates)
+
+    rows = db.query(DailyStat).count()
+    db.commit()
+    invalidate_dashboard_cache()
+    return rows
+
+
+def get_daily_stats(db: Session, days: int) -> List[Dict[str, Any]]:
+    """최근 days일(오늘 포함)의 일별 집계를 한 번의 쿼리로 읽습니다. 기록이 없는 날은 0으로 채웁니다."""
+    today = get_kst_now().date()
+    start = today - timedelta(days=days - 1)
+    rows = {row.day: row for row in db.query(DailyStat).filter(DailyStat.day >= start, DailyStat.day <= today)}
+
+    result = []
+    for i in range(days):
+        day = start + timedelta(days=i)
+        row = rows.get(day)
+        result.append({
+            "date": day.isoformat(),
+            **{column: int(getattr(row, column) or 0) if row else 0 for column in STAT_COLUMNS}
+        })
+    return result
+
+
+def merged_session_sketch(db: Session, days: int) -> HyperLogLog:
+    """최근 days일(오늘 포함)의 세션 스케치를 합친 스케치"""
+    start = get_kst_now().date() - timedelta(days=days - 1)
+    merged = HyperLogLog()
+    for (registers,) in db.query(DailySessionSketch.registers).filter(DailySessionSketch.day >= start):
+        merged.merge(HyperLogLog.from_bytes(registers))
+    return merged
+
+
+def count_active_sessions(db: Session, days: int) -> int:
+    """최근 days일(오늘 포함) 동안 활동한 서로 다른 세션 수의 추정치 (상대 표준 오차 HyperLogLog.error_rate())"""
+    return merged_session_sketch(db, days).count()
+
+
+def get_active_users(db: Session) -> Dict[str, Any]:
+    """일/주/월 활성 세션 추정치. 월 단위 스케치를 한 번 읽어 기간별로 합칩니다."""
+    today = get_kst_now().date()
+    longest = max(ACTIVE_USER_WINDOWS.values())
+    sketches = {
+        day: HyperLogLog.from_bytes(registers)
+        for day, registers in db.query(DailySessionSketch.day, DailySessionSketch.registers).filter(
+            DailySessionSketch.day >= today - timedelta(days=longest - 1),
+            DailySessionSketch.day <= today
+        )
+    }
+
+    result: Dict[str, Any] = {}
+    merged = HyperLogLog()
+    covered = 0
+    # 짧은 기간부터 날짜를 넓혀 가며 누적 병합
+    for name, days in sorted(ACTIVE_USER_WINDOWS.items(), key=lambda item: item[1]):
+        while covered < days:
+            sketch = sketches.get(today - timedelta(days=covered))
+            if sketch is not None:
+                merged.merge(sketch)
+            covered += 1
+        result[name] = merged.count()
+    result["error_rate"] = round(HyperLogLog.error_rate(), 4)
+    return result
+
+
+def get_popular_topics(db: Session, limit: int = 5) -> List[Dict[str, Any]]:
+    """퀴즈 주제별 개수 상위 limit개 (GROUP BY 한 번)"""
+    count = func.count(Quiz.id)
+    rows = db.query(Quiz.topic, count).filter(
+        Quiz.topic.isnot(None),
+        Quiz.topic != ""
+    ).group_by(Quiz.topic).order_by(count.desc(), Quiz.topic).limit(limit).all()
+    return [{"name": topic, "count": topic_count} for topic, topic_count in rows]
+
+
+def _cached(key: Any, compute: Callable[[], Any]) -> Any:
+    now = time.time()
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry and now - entry[0] < DASHBOARD_CACHE_SECONDS:
+            return entry[1]
+    value = compute()
+    with _cache_lock:
+        _cache[key] = (now, value)
+    return value
+
+
+def invalidate_dashboard_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
+
+
+def get_dashboard_stats(db: Session, days: int = 7) -> Dict[str, Any]:
+    """관리자 대시보드의 집계 통계. DASHBOARD_CACHE_SECONDS 동안 캐시합니다."""
+
+    def compute() -> Dict[str, Any]:
+        total_quizzes = db.query(Quiz).count()
+        total_content = (
+            db.query(AIInfo).count()
+            + db.query(Prompt).count()
+            + db.query(BaseContent).count()
+            + db.query(Term).count()
+        )
+
+        popular_topics = get_popular_topics(db)
+        if not popular_topics:
+            # 퀴즈 주제가 없으면 기본 주제들로 구성
+            popular_topics = [
+                {"name": "AI 기초", "count": max(total_quizzes // 3, 1)},
+                {"name": "머신러닝", "count": max(total_quizzes // 4, 1)},
+                {"name": "딥러닝", "count": max(total_quizzes // 5, 1)},
+                {"name": "자연어처리", "count": max(total_quizzes // 6, 1)},
+                {"name": "컴퓨터비전", "count": max(total_quizzes // 7, 1)}
+            ]
+
+        daily = get_daily_stats(db, days)
+        active = get_active_users(db)
+        return {
+            "totalUsers": db.query(User).count(),
+            "activeUsers": active["weekly"],
+            "activeUsersDaily": active["daily"],
+            "activeUsersMonthly": active["monthly"],
+            # 활성 사용자 수는 HyperLogLog 추정치 (상대 표준 오차)
+            "activeUsersErrorRate": active["error_rate"],
+            "totalQuizzes": total_quizzes,
+            "totalContent": total_content,
+            "popularTopics": popular_topics,
+            "weeklyProgress": [
+                {
+                    "day": DAY_NAMES[date.fromisoformat(row["date"]).weekday()],
+                    "date": row["date"],
+                    "users": row["active_sessions"],
+                    "quizzes": row["quiz_completions"],
+                    "learn": row["learn_events"],
+                    "newUsers": row["new_users"]
+                }
+                for row in daily
+            ]
+        }
+
+    return _cached(("dashboard", days), compute)
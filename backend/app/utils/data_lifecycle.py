@@ -0,0 +1,176 @@
+import os
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from ..models import ActivityLogRollup
+from .backup_jobs import JobCancelled
+from .leaderboard import rebuild_leaderboard
+from .progress_cache import progress_cache
+
+# 정리(purge) 한 번에 삭제하는 행 수. 배치마다 커밋하므로 잠금과 WAL이 짧게 유지됨
+PURGE_BATCH_ROWS = int(os.getenv("PURGE_BATCH_ROWS", "5000"))
+# 익명 세션 정리 시 한 번에 삭제하는 세션 수
+PURGE_SESSION_BATCH = int(os.getenv("PURGE_SESSION_BATCH", "200"))
+# 배치 사이 대기 시간 (초). 운영 중인 요청에 I/O를 양보
+PURGE_BATCH_SLEEP = float(os.getenv("PURGE_BATCH_SLEEP", "0.1"))
+# TRUNCATE가 테이블 잠금을 기다리는 최대 시간
+TRUNCATE_LOCK_TIMEOUT = os.getenv("TRUNCATE_LOCK_TIMEOUT", "10s")
+
+# 전체 데이터 삭제 대상 (관리자 계정은 호출자가 다시 만듦)
+CLEAR_ALL_TABLES = (
+    'activity_logs', 'activity_log_rollups', 'daily_stats', 'daily_session_sketches',
+    'user_progress', 'leaderboard', 'leaderboard_value_counts', 'backup_history',
+    'ai_info', 'quiz', 'prompt', 'base_content', 'term', 'users'
+)
+LOG_TABLES = ('activity_logs', 'activity_log_rollups')
+
+PURGE_TARGETS = ('activity_logs', 'anonymous_progress', 'quiz_attempts')
+
+# 익명 세션: 로그인 사용자는 사용자명을 세션 ID로 쓰므로 users에 없는 세션 ID
+_ANONYMOUS = "NOT EXISTS (SELECT 1 FROM users u WHERE u.username = {alias}.session_id)"
+
+
+def truncate_tables(db: Session, tables: Iterable[str]) -> None:
+    """테이블들을 TRUNCATE ... RESTART IDENTITY로 비웁니다. 호출자가 커밋합니다.
+
+    행 단위 DELETE와 달리 테이블 크기에 관계없이 즉시 끝나고 죽은 튜플을 남기지 않으며 id 시퀀스도 처음부터 시작합니다.
+    """
+    db.execute(text(f"SET LOCAL lock_timeout = '{TRUNCATE_LOCK_TIMEOUT}'"))
+    db.execute(text(f"TRUNCATE {', '.join(tables)} RESTART IDENTITY"))
+
+
+def _delete_batch(db: Session, sql: str, params: Dict[str, Any]) -> int:
+    deleted = db.execute(text(sql), params).rowcount
+    db.commit()
+    return deleted
+
+
+def _purge_activity_logs(db: Session, cutoff: datetime, batch_size: int) -> Iterable[int]:
+    while True:
+        deleted = _delete_batch(db, """
+            DELETE FROM activity_logs
+            WHERE (id, created_at) IN (
+                SELECT id, created_at FROM activity_logs
+                WHERE created_at < :cutoff
+                ORDER BY created_at
+                LIMIT :batch
+            )
+        """, {"cutoff": cutoff, "batch": batch_size})
+        yield deleted
+        if deleted < batch_size:
+            break
+    # 삭제된 기간의 시간별 로그 집계도 정리 (cutoff가 속한 시간은 남은 로그가 있으므로 유지)
+    db.query(ActivityLogRollup).filter(
+        ActivityLogRollup.bucket < cutoff.replace(minute=0, second=0, microsecond=0)
+    ).delete(synchronize_session=False)
+    db.commit()
+
+
+def _purge_anonymous_progress(db: Session, cutoff: datetime, batch_size: int) -> Iterable[int]:
+    # 정리 대상 세션 목록을 먼저 구하고 세션 단위로 나눠 삭제 (세션의 일부 행만 지워지는 일이 없도록)
+    sessions: List[str] = [row[0] for row in db.execute(text(f"""
+        SELECT p.session_id FROM user_progress p
+        WHERE p.session_id IS NOT NULL AND {_ANONYMOUS.format(alias='p')}
+        GROUP BY p.session_id
+        HAVING MAX(COALESCE(p.updated_at, p.created_at)) < :cutoff
+    """), {"cutoff": cutoff})]
+    db.commit()
+
+    for start in range(0, len(sessions), PURGE_SESSION_BATCH):
+        # 목록을 구한 뒤 다시 활동했거나 가입한 세션은 건너뜀
+        yield _delete_batch(db, f"""
+            DELETE FROM user_progress p
+            WHERE p.session_id = ANY(:sessions)
+              AND {_ANONYMOUS.format(alias='p')}
+              AND NOT EXISTS (
+                  SELECT 1 FROM user_progress q
+                  WHERE q.session_id = p.session_id AND COALESCE(q.updated_at, q.created_at) >= :cutoff
+              )
+        """, {"sessions": sessions[start:start + PURGE_SESSION_BATCH], "cutoff": cutoff})
+
+
+def _purge_quiz_attempts(db: Session, cutoff: datetime, batch_size: int) -> Iterable[int]:
+    # updated_at이 NULL인 행(updated_at이 없던 백업에서 복원된 행 등)은 생성 시각으로 판단
+    while True:
+        deleted = _delete_batch(db, """
+            DELETE FROM user_progress
+            WHERE id IN (
+                SELECT id FROM user_progress
+                WHERE date LIKE '\\_\\_quiz\\_\\_%' AND COALESCE(updated_at, created_at) < :cutoff
+                ORDER BY id
+                LIMIT :batch
+            )
+        """, {"cutoff": cutoff, "batch": batch_size})
+        yield deleted
+        if deleted < batch_size:
+            break
+
+
+_PURGES = {
+    'activity_logs': ('activity_logs', _purge_activity_logs),
+    'anonymous_progress': ('user_progress', _purge_anonymous_progress),
+    'quiz_attempts': ('user_progress', _purge_quiz_attempts),
+}
+
+
+def run_purge(
+    target: str,
+    cutoff: datetime,
+    batch_size: int = PURGE_BATCH_ROWS,
+    sleep_seconds: float = PURGE_BATCH_SLEEP,
+    on_progress: Optional[Callable[[str, int], None]] = None,
+    should_cancel: Optional[Callable[[], bool]] = None
+) -> Dict[str, Any]:
+    """cutoff보다 오래된 데이터를 작은 배치로 나눠 삭제하고 마지막에 ANALYZE 합니다.
+
+    target: 'activity_logs'(활동 로그), 'anonymous_progress'(cutoff 이후 활동이 없는 익명 세션의 학습 기록),
+    'quiz_attempts'(퀴즈 응시 기록. 누적 퀴즈 점수가 남은 기록 기준으로 바뀜)
+    배치마다 커밋하므로 중단되어도 삭제된 만큼은 유지되며, 같은 cutoff로 다시 실행하면 남은 부분부터 이어집니다.
+    """
+    if target not in _PURGES:
+        raise ValueError(f"Unknown purge target: {target}")
+    table_name, purge = _PURGES[target]
+
+    started = time.time()
+    deleted = 0
+    batches = 0
+    db = SessionLocal()
+    try:
+        for count in purge(db, cutoff, batch_size):
+            deleted += count
+            batches += 1
+            if on_progress:
+                on_progress(table_name, count)
+            if should_cancel and should_cancel():
+                raise JobCancelled("Purge cancelled")
+            if count and sleep_seconds > 0:
+                time.sleep(sleep_seconds)
+
+        if table_name == 'user_progress' and deleted:
+            # 학습 기록이 바뀌었으므로 리더보드와 진행상황 캐시를 다시 맞춤
+            progress_cache.clear()
+            rebuild_leaderboard(db)
+
+        db.execute(text(f"ANALYZE {table_name}"))
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    seconds = round(time.time() - started, 3)
+    print(f"Purged {deleted} rows from {table_name} ({target}, before {cutoff.isoformat()}) in {batches} batches, {seconds}s")
+    return {
+        "target": target,
+        "table": table_name,
+        "cutoff": cutoff.isoformat(),
+        "deleted": deleted,
+        "batches": batches,
+        "seconds": seconds
+    }
@@ -0,0 +1,82 @@
+import enum
+import re
+from typing import Any, Dict, Optional, Tuple
+
+
+class EventCode(str, enum.Enum):
+    """활동 로그의 안정적인 이벤트 코드 (action은 화면 표시용 문자열로 유지)"""
+    USER_REGISTERED = "user.registered"
+    USER_LOGIN = "user.login"
+    LEARN_AI_INFO = "learn.ai_info"
+    LEARN_TERM = "learn.term"
+    QUIZ_COMPLETED = "quiz.completed"
+    BACKUP_CREATED = "system.backup_created"
+    BACKUP_FAILED = "system.backup_failed"
+    RESTORE_COMPLETED = "system.restore_completed"
+    DATA_CLEARED = "system.data_cleared"
+    DATA_PURGED = "system.data_purged"
+    TABLES_INITIALIZED = "system.tables_initialized"
+    LOGS_EXPORTED = "logs.exported"
+    LOGS_CLEARED = "logs.cleared"
+    LOG_PARTITIONS_DROPPED = "logs.partitions_dropped"
+    OTHER = "other"
+
+
+# 기존 action 문자열 → 이벤트 코드 (코드 없이 기록된 로그와 과거 로그 변환용)
+ACTION_EVENT_CODES = {
+    "회원가입": EventCode.USER_REGISTERED,
+    "로그인": EventCode.USER_LOGIN,
+    "AI 정보 학습": EventCode.LEARN_AI_INFO,
+    "용어 학습": EventCode.LEARN_TERM,
+    "퀴즈 완료": EventCode.QUIZ_COMPLETED,
+    "시스템 백업 생성": EventCode.BACKUP_CREATED,
+    "자동 백업 실패": EventCode.BACKUP_FAILED,
+    "시스템 복원 완료": EventCode.RESTORE_COMPLETED,
+    "전체 데이터 삭제": EventCode.DATA_CLEARED,
+    "오래된 데이터 정리": EventCode.DATA_PURGED,
+    "데이터베이스 테이블 초기화": EventCode.TABLES_INITIALIZED,
+    "로그 내보내기": EventCode.LOGS_EXPORTED,
+    "시스템 로그 삭제": EventCode.LOGS_CLEARED,
+    "로그 파티션 삭제": EventCode.LOG_PARTITIONS_DROPPED,
+}
+
+# 과거 details 문자열에서 속성을 추출하는 패턴
+_DETAIL_PATTERNS = {
+    EventCode.USER_REGISTERED: re.compile(r"역할: (?P<role>\w+)"),
+    EventCode.USER_LOGIN: re.compile(r"역할: (?P<role>\w+)"),
+    EventCode.LEARN_AI_INFO: re.compile(r"(?P<date>\d{4}-\d{2}-\d{2}) 날짜의 AI 정보 (?P<info_number>\d+)번"),
+    EventCode.LEARN_TERM: re.compile(r"'(?P<term>.*)' 용어를 학습했습니다\. \(날짜: (?P<date>[^,]+), 정보: (?P<info_number>\d+)\)"),
+    EventCode.QUIZ_COMPLETED: re.compile(r"점수: (?P<score>\d+)/(?P<total_questions>\d+) \((?P<percent>\d+)%\)"),
+    EventCode.BACKUP_CREATED: re.compile(r"파일명: (?P<filename>.+), 크기: (?P<size_bytes>\d+) bytes"),
+    EventCode.RESTORE_COMPLETED: re.compile(r"파일: (?P<filename>.+), 복원된 테이블: (?P<tables>.*)$"),
+    EventCode.LOGS_CLEARED: re.compile(r"총 (?P<deleted>\d+)개의 로그"),
+}
+_INT_ATTRIBUTES = ('info_number', 'score', 'total_questions', 'percent', 'size_bytes', 'deleted')
+# 분 단위 집계 행의 details: "1분간 N건 집계 (마지막: ...)"
+_AGGREGATED_DETAILS = re.compile(r"^1분간 \d+건 집계 \(마지막: (?P<details>.*)\)$", re.S)
+
+
+def event_code_for_action(action: Optional[str]) -> EventCode:
+    return ACTION_EVENT_CODES.get(action or '', EventCode.OTHER)
+
+
+def parse_event(action: Optional[str], details: Optional[str]) -> Tuple[EventCode, Dict[str, Any]]:
+    """과거 로그의 action/details 문자열로부터 (이벤트 코드, 속성)을 만듭니다."""
+    code = event_code_for_action(action)
+    attributes: Dict[str, Any] = {}
+    text = details or ''
+    aggregated = _AGGREGATED_DETAILS.match(text)
+    if aggregated:
+        text = aggregated.group('details')
+
+    pattern = _DETAIL_PATTERNS.get(code)
+    match = pattern.search(text) if pattern else None
+    if match:
+        for key, value in match.groupdict().items():
+            if key in _INT_ATTRIBUTES:
+                attributes[key] = int(value)
+            elif key == 'tables':
+                attributes[key] = [table for table in value.split(', ') if table]
+            else:
+                attributes[key] = value
+    return code, attributes
@@ -0,0 +1,78 @@
+import hashlib
+import math
+import zlib
+from typing import Iterable, Optional
+
+# 레지스터 수 m = 2^p. 표준 오차는 약 1.04 / sqrt(m) (p=14: 약 0.81%, 저장 크기 16KB, 압축 시 더 작음)
+HLL_PRECISION = 14
+
+
+class HyperLogLog:
+    """서로 다른 값의 개수를 고정 메모리로 추정하는 HyperLogLog 스케치
+
+    레지스터 하나를 1바이트로 두고 전체를 정수 하나로 다뤄서, 두 스케치의 병합(레지스터별 최댓값)을
+    파이썬 루프 없이 정수 연산 몇 번으로 계산합니다.
+    추정 오차는 약 1.04 / sqrt(2^precision)이며, 약 95%의 경우 그 두 배 안에 듭니다.
+    """
+
+    def __init__(self, precision: int = HLL_PRECISION, registers: Optional[bytes] = None):
+        self.precision = precision
+        self.m = 1 << precision
+        if registers is not None and len(registers) != self.m:
+            raise ValueError(f"Expected {self.m} registers, got {len(registers)}")
+        self.registers = bytearray(registers) if registers is not None else bytearray(self.m)
+
+    @staticmethod
+    def error_rate(precision: int = HLL_PRECISION) -> float:
+        """추정치의 상대 표준 오차"""
+        return 1.04 / math.sqrt(1 << precision)
+
+    def add(self, value: str) -> None:
+        hashed = int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+        index = hashed >> (64 - self.precision)
+        rest = hashed & ((1 << (64 - self.precision)) - 1)
+        # 나머지 비트에서 처음 1이 나오는 위치 (모두 0이면 최댓값)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, values: Iterable[str]) -> None:
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        """다른 스케치의 레지스터별 최댓값을 취합니다 (합집합)."""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge sketches with different precision")
+        a = int.from_bytes(self.registers, 'big')
+        b = int.from_bytes(other.registers, 'big')
+        high = int.from_bytes(b'\x80' * self.m, 'big')
+        # 레지스터 값은 64 이하이므로 바이트마다 최상위 비트를 빌림 방지용으로 쓰고, a >= b인 바이트를 골라냄
+        greater = (((a | high) - b) & high) >> 7
+        mask = greater * 0xFF
+        merged = (a & mask) | (b & ~mask)
+        self.registers = bytearray(merged.to_bytes(self.m, 'big'))
+
+    def count(self) -> int:
+        registers = bytes(self.registers)
+        total = 0.0
+        # 레지스터 값(rank)의 종류가 적으므로 값별 개수를 bytes.count로 셈
+        for rank in range(64 - self.precision + 2):
+            occurrences = registers.count(rank)
+            if occurrences:
+                total += occurrences * 2.0 ** -rank
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        estimate = alpha * self.m * self.m / total
+        zeros = registers.count(0)
+        if estimate <= 2.5 * self.m and zeros:
+            # 값이 적을 때는 빈 레지스터 비율로 세는 편이 정확함
+            estimate = self.m * math.log(self.m / zeros)
+        return int(round(estimate))
+
+    def to_bytes(self) -> bytes:
+        """저장용 직렬화. 값이 적은 날은 대부분 0이라 압축이 잘 됩니다."""
+        return zlib.compress(bytes(self.registers))
+
+    @classmethod
+    def from_bytes(cls, data: bytes, precision: int = HLL_PRECISION) -> "HyperLogLog":
+        return cls(precision, zlib.decompress(data))
@@ -24,4 +24,9 @@ def get_kst_date_string_for_period(days_ago: int) -> str:
 
 def is_today(date_string: str) -> bool:
     """주어진 날짜 문자열이 오늘인지 확인합니다."""
-    return date_string == get_kst_date_string() 
\ No newline at end of file
+    return date_string == get_kst_date_string() 
+
+def parse_kst_date(date_string: str) -> datetime:
+    """YYYY-MM-DD 문자열을 해당 날짜 KST 자정(timezone-aware)으로 변환합니다."""
+    kst = pytz.timezone('Asia/Seoul')
+    return kst.localize(datetime.strptime(date_string, '%Y-%m-%d'))
@@ -0,0 +1,282 @@
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, or_, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from ..models import LeaderboardEntry, LeaderboardValueCount, UserProgress
+
+# 리더보드 지표 (API 이름 -> 컬럼명)
+LEADERBOARD_METRICS = {
+    'total_learned': 'total_learned',
+    'total_terms_learned': 'total_terms_learned',
+    'streak_days': 'streak_days',
+    'cumulative_quiz_score': 'cumulative_quiz_score',
+}
+
+# leaderboard_value_counts에서 전체 세션 수를 담는 행의 키
+SESSIONS_KEY = '__sessions__'
+
+
+class Leaderboard:
+    """leaderboard 테이블과 지표 값별 세션 수(leaderboard_value_counts)로 순위를 계산합니다.
+
+    순위는 "조회한 값보다 큰 값들의 세션 수 합 + 1"이므로 세션 수가 아니라 서로 다른 값의 수에 비례하고
+    (점수는 0~100, 학습 수/연속 학습일도 값의 종류가 적음), 전체 세션 수는 따로 유지되는 행에서 읽습니다.
+    갱신은 세션 행을 잠근 트랜잭션 안에서 값별 세션 수와 함께 바뀌므로 어느 워커에서든 커밋 즉시 반영됩니다.
+    """
+
+    def _count_greater(self, db: Session, metric: str, value: int) -> int:
+        return db.query(func.coalesce(func.sum(LeaderboardValueCount.sessions), 0)).filter(
+            LeaderboardValueCount.metric == metric,
+            LeaderboardValueCount.value > value
+        ).scalar() or 0
+
+    def _total_sessions(self, db: Session) -> int:
+        return db.query(LeaderboardValueCount.sessions).filter(
+            LeaderboardValueCount.metric == SESSIONS_KEY,
+            LeaderboardValueCount.value == 0
+        ).scalar() or 0
+
+    def record(self, db: Session, session_id: str, **metrics: int) -> None:
+        """세션의 지표를 갱신합니다. 전달된 지표만 바뀌고 나머지는 유지됩니다."""
+        self._upsert(db, session_id, lambda entry: metrics)
+
+    def record_quiz(self, db: Session, session_id: str, correct: int, total: int) -> None:
+        """퀴즈 결과를 누적하고 누적 퀴즈 점수를 다시 계산합니다."""
+        def changes(entry: LeaderboardEntry) -> Dict[str, int]:
+            quiz_correct = (entry.quiz_correct or 0) + correct
+            quiz_total = (entry.quiz_total or 0) + total
+            return {
+                'quiz_correct': quiz_correct,
+                'quiz_total': quiz_total,
+                'cumulative_quiz_score': int((quiz_correct / quiz_total) * 100) if quiz_total > 0 else 0
+            }
+        self._upsert(db, session_id, changes)
+
+    def _upsert(self, db: Session, session_id: str, changes) -> None:
+        """세션 행을 만들거나(동시에 만들어도 하나만 생성) FOR UPDATE로 잠근 뒤 갱신하므로 동시 갱신이 유실되지 않습니다."""
+        try:
+            created = db.execute(
+                pg_insert(LeaderboardEntry).values(
+                    session_id=session_id, total_learned=0, total_terms_learned=0, streak_days=0,
+                    quiz_correct=0, quiz_total=0, cumulative_quiz_score=0
+                ).on_conflict_do_nothing(index_elements=['session_id'])
+            ).rowcount > 0
+            entry = db.query(LeaderboardEntry).filter(
+                LeaderboardEntry.session_id == session_id
+            ).with_for_update().one()
+
+            old = None if created else _entry_metrics(entry)
+            for key, value in changes(entry).items():
+                setattr(entry, key, value)
+            new = _entry_metrics(entry)
+
+            deltas: Dict[Tuple[str, int], int] = {}
+            if created:
+                deltas[(SESSIONS_KEY, 0)] = 1
+            for metric, value in new.items():
+                if old is not None:
+                    if old[metric] == value:
+                        continue
+                    deltas[(metric, old[metric])] = deltas.get((metric, old[metric]), 0) - 1
+                deltas[(metric, value)] = deltas.get((metric, value), 0) + 1
+            _apply_value_counts(db, deltas)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"Failed to update leaderboard: {str(e)}")
+            raise
+
+    def get_rank(self, db: Session, session_id: str, metric: str) -> Optional[Dict[str, Any]]:
+        entry = db.query(LeaderboardEntry).filter(LeaderboardEntry.session_id == session_id).first()
+        if entry is None:
+            return None
+        value = getattr(entry, LEADERBOARD_METRICS[metric]) or 0
+        return {
+            "session_id": session_id,
+            "metric": metric,
+            "value": value,
+            "rank": self._count_greater(db, metric, value) + 1,
+            "total_sessions": self._total_sessions(db)
+        }
+
+    def get_top(
+        self,
+        db: Session,
+        metric: str,
+        page_size: int = 20,
+        after: Optional[Tuple[int, str]] = None
+    ) -> Dict[str, Any]:
+        """지표 순(동점은 session_id 순)으로 page_size개를 반환합니다.
+
+        after는 이전 페이지 마지막 항목의 (값, session_id)로, OFFSET 없이 인덱스에서 바로 다음 항목부터 읽습니다.
+        응답의 next_cursor를 다음 요청의 cursor로 넘기면 되고, 마지막 페이지면 None입니다.
+        """
+        column = getattr(LeaderboardEntry, LEADERBOARD_METRICS[metric])
+        query = db.query(LeaderboardEntry)
+        if after is not None:
+            value, session_id = after
+            query = query.filter(
+                column <= value,
+                or_(column < value, LeaderboardEntry.session_id > session_id)
+            )
+        entries = query.order_by(column.desc(), LeaderboardEntry.session_id).limit(page_size).all()
+
+        # 동점은 같은 순위. 페이지 안의 서로 다른 값마다 한 번씩 계산
+        ranks: Dict[int, int] = {}
+        rankings = []
+        for entry in entries:
+            value = getattr(entry, LEADERBOARD_METRICS[metric]) or 0
+            if value not in ranks:
+                ranks[value] = self._count_greater(db, metric, value) + 1
+            rankings.append({
+                "rank": ranks[value],
+                "session_id": entry.session_id,
+                "value": value,
+                **_entry_metrics(entry)
+            })
+
+        next_cursor = None
+        if len(entries) == page_size:
+            next_cursor = f"{rankings[-1]['value']}:{rankings[-1]['session_id']}"
+
+        return {
+            "metric": metric,
+            "page_size": page_size,
+            "total_sessions": self._total_sessions(db),
+            "rankings": rankings,
+            "next_cursor": next_cursor
+        }
+
+
+def parse_cursor(cursor: str) -> Tuple[int, str]:
+    """next_cursor("값:session_id")를 (값, session_id)로 바꿉니다. 형식이 틀리면 ValueError"""
+    value, separator, session_id = cursor.partition(':')
+    if not separator or not session_id:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return int(value), session_id
+
+
+def _apply_value_counts(db: Session, deltas: Dict[Tuple[str, int], int]) -> None:
+    """값별 세션 수에 증감을 더합니다. 교착을 피하려고 항상 (지표, 값) 순서로 갱신합니다."""
+    for (metric, value), delta in sorted(deltas.items()):
+        if delta == 0:
+            continue
+        statement = pg_insert(LeaderboardValueCount).values(metric=metric, value=value, sessions=delta)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=['metric', 'value'],
+            set_={'sessions': LeaderboardValueCount.sessions + statement.excluded.sessions}
+        ))
+
+
+def rebuild_value_counts(db: Session) -> None:
+    """leaderboard 테이블로부터 값별 세션 수를 다시 만듭니다. 호출자가 커밋합니다.
+
+    집계하는 동안 다른 갱신이 끼어들지 않도록 leaderboard를 SHARE 모드로 잠급니다.
+    """
+    db.execute(text("LOCK TABLE leaderboard IN SHARE MODE"))
+    db.query(LeaderboardValueCount).delete(synchronize_session=False)
+    for metric, column in LEADERBOARD_METRICS.items():
+        # 컬럼명은 LEADERBOARD_METRICS의 고정 값
+        db.execute(text(f"""
+            INSERT INTO leaderboard_value_counts (metric, value, sessions)
+            SELECT :metric, {column}, COUNT(*) FROM leaderboard GROUP BY {column}
+        """), {"metric": metric})
+    db.execute(text("""
+        INSERT INTO leaderboard_value_counts (metric, value, sessions)
+        SELECT :metric, 0, COUNT(*) FROM leaderboard
+    """), {"metric": SESSIONS_KEY})
+
+
+def ensure_value_counts(db: Session) -> bool:
+    """값별 세션 수가 비어 있으면(테이블이 새로 생긴 경우) leaderboard로부터 채웁니다. 채웠으면 True"""
+    if db.query(LeaderboardValueCount).first() is not None:
+        return False
+    rebuild_value_counts(db)
+    db.commit()
+    return True
+
+
+def _entry_metrics(entry: LeaderboardEntry) -> Dict[str, int]:
+    return {metric: getattr(entry, column) or 0 for metric, column in LEADERBOARD_METRICS.items()}
+
+
+def _streak_days(learned_dates: List[str]) -> int:
+    """마지막 학습일부터 거꾸로 이어지는 연속 학습일 수 (update_user_statistics와 동일한 규칙)"""
+    if not learned_dates:
+        return 0
+    dates = set(learned_dates)
+    current = max(learned_dates)
+    streak = 0
+    while current in dates:
+        streak += 1
+        current = (datetime.strptime(current, '%Y-%m-%d') - timedelta(days=1)).strftime('%Y-%m-%d')
+    return streak
+
+
+def rebuild_leaderboard(db: Session, batch_size: int = 1000) -> int:
+    """user_progress 전체를 세션 순으로 한 번 훑어 leaderboard 테이블을 다시 만듭니다."""
+    db.query(LeaderboardEntry).delete()
+
+    rows = db.query(
+        UserProgress.session_id, UserProgress.date, UserProgress.learned_info, UserProgress.stats
+    ).filter(UserProgress.session_id.isnot(None)).order_by(UserProgress.session_id).yield_per(batch_size)
+
+    pending = []
+    rebuilt = 0
+    current_session = None
+    acc = None
+
+    def flush_session():
+        if current_session is None:
+            return
+        quiz_total = acc['quiz_total']
+        pending.append({
+            'session_id': current_session,
+            'total_learned': acc['total_learned'],
+            'total_terms_learned': len(acc['terms']),
+            'streak_days': _streak_days(acc['dates']),
+            'quiz_correct': acc['quiz_correct'],
+            'quiz_total': quiz_total,
+            'cumulative_quiz_score': int((acc['quiz_correct'] / quiz_total) * 100) if quiz_total > 0 else 0
+        })
+
+    for session_id, date, learned_info, stats in rows:
+        if session_id != current_session:
+            flush_session()
+            current_session = session_id
+            acc = {'total_learned': 0, 'terms': set(), 'dates': [], 'quiz_correct': 0, 'quiz_total': 0}
+            if len(pending) >= batch_size:
+                # 서버측 커서가 열려 있으므로 커밋하지 않고 같은 트랜잭션에서 적재
+                db.bulk_insert_mappings(LeaderboardEntry, pending)
+                rebuilt += len(pending)
+                pending.clear()
+
+        date = date or ''
+        try:
+            if date.startswith('__terms__') and learned_info:
+                acc['terms'].update(json.loads(learned_info))
+            elif date.startswith('__quiz__') and stats:
+                quiz_data = json.loads(stats)
+                acc['quiz_correct'] += quiz_data.get('correct', 0)
+                acc['quiz_total'] += quiz_data.get('total', 0)
+            elif not date.startswith('__') and learned_info:
+                acc['total_learned'] += len(json.loads(learned_info))
+                acc['dates'].append(date)
+        except json.JSONDecodeError:
+            continue
+
+    flush_session()
+    if pending:
+        db.bulk_insert_mappings(LeaderboardEntry, pending)
+        rebuilt += len(pending)
+    rebuild_value_counts(db)
+    db.commit()
+    return rebuilt
+
+
+# 프로세스 전역 리더보드 인스턴스
+leaderboard = Leaderboard()
@@ -0,0 +1,140 @@
+import asyncio
+import os
+import threading
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# 클라이언트별 최대 대기 이벤트 수 (초과 시 오래된 이벤트부터 버림)
+LOG_STREAM_CLIENT_BUFFER = int(os.getenv("LOG_STREAM_CLIENT_BUFFER", "500"))
+
+
+def _code_value(code: Any) -> Optional[str]:
+    return code.value if isinstance(code, Enum) else code
+
+
+def log_row_to_event(row: Dict[str, Any]) -> Dict[str, Any]:
+    """기록된 로그 행을 목록 조회 API와 같은 형태로 변환합니다."""
+    created_at = row.get("created_at")
+    return {
+        "id": str(row["id"]) if row.get("id") is not None else None,
+        "timestamp": created_at.isoformat() if isinstance(created_at, datetime) else created_at,
+        "type": row.get("log_type"),
+        "level": row.get("log_level"),
+        "user": row.get("username"),
+        "action": row.get("action"),
+        "details": row.get("details"),
+        "ip": row.get("ip_address"),
+        "user_agent": row.get("user_agent"),
+        "count": row.get("event_count") or 1,
+        "event_code": _code_value(row.get("event_code")),
+        "attributes": row.get("attributes")
+    }
+
+
+def make_log_matcher(
+    log_type: Optional[str] = None,
+    log_level: Optional[str] = None,
+    username: Optional[str] = None,
+    action: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    q: Optional[str] = None,
+    event_code: Optional[str] = None
+) -> Callable[[Dict[str, Any]], bool]:
+    """apply_log_filters와 같은 조건을 메모리의 로그 행에 적용하는 함수를 만듭니다."""
+    def contains(value: Optional[str], needle: str) -> bool:
+        return needle.lower() in (value or '').lower()
+
+    def matches(row: Dict[str, Any]) -> bool:
+        if log_type and row.get("log_type") != log_type:
+            return False
+        if log_level and row.get("log_level") != log_level:
+            return False
+        if event_code and _code_value(row.get("event_code")) != _code_value(event_code):
+            return False
+        if username and not contains(row.get("username"), username):
+            return False
+        if action and not contains(row.get("action"), action):
+            return False
+        if q and not any(contains(row.get(field), q) for field in ("username", "action", "details")):
+            return False
+        created_at = row.get("created_at")
+        if start and created_at and created_at < start:
+            return False
+        if end and created_at and created_at >= end:
+            return False
+        return True
+
+    return matches
+
+
+class LogSubscription:
+    """SSE 클라이언트 하나의 이벤트 버퍼"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, matcher: Callable[[Dict[str, Any]], bool], maxsize: int):
+        self.loop = loop
+        self.matcher = matcher
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def _offer(self, events: List[Dict[str, Any]]) -> None:
+        # 이벤트 루프 스레드에서 실행됨
+        for event in events:
+            if self.queue.full():
+                self.queue.get_nowait()
+                self.dropped += 1
+            self.queue.put_nowait(event)
+
+
+class LogBroadcaster:
+    """로그 기록기가 커밋한 행을 연결된 관리자들에게 전달하는 프로세스 내 브로드캐스터
+
+    워커 프로세스마다 독립적이므로, 여러 워커로 실행하면 각 클라이언트는 자신이 연결된
+    워커가 기록한 로그만 받습니다.
+    """
+
+    def __init__(self, client_buffer: int = LOG_STREAM_CLIENT_BUFFER):
+        self.client_buffer = client_buffer
+        self._subscriptions: List[LogSubscription] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, matcher: Callable[[Dict[str, Any]], bool]) -> LogSubscription:
+        subscription = LogSubscription(asyncio.get_running_loop(), matcher, self.client_buffer)
+        with self._lock:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: LogSubscription) -> None:
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    def publish(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """기록 스레드에서 호출됩니다. 구독자가 없으면 아무 일도 하지 않습니다."""
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        if not subscriptions:
+            return
+        rows = list(rows)
+        for subscription in subscriptions:
+            events = [log_row_to_event(row) for row in rows if subscription.matcher(row)]
+            if not events:
+                continue
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._offer, events)
+            except RuntimeError:
+                # 이벤트 루프가 이미 닫힘
+                self.unsubscribe(subscription)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "subscribers": len(self._subscriptions),
+                "client_buffer": self.client_buffer,
+                "dropped": sum(s.dropped for s in self._subscriptions)
+            }
+
+
+# 프로세스 전역 브로드캐스터
+log_broadcaster = LogBroadcaster()
@@ -0,0 +1,143 @@
+import csv
+import importlib.util
+import io
+import json
+import zlib
+from typing import Any, Dict, Iterable, Iterator, List
+
+# 내보내기 컬럼 순서
+EXPORT_COLUMNS = [
+    'id', 'created_at', 'log_type', 'log_level', 'user_id', 'username',
+    'action', 'details', 'ip_address', 'user_agent', 'session_id', 'event_count',
+    'event_code', 'attributes'
+]
+
+EXPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+
+def _export_value(log, column: str) -> Any:
+    value = getattr(log, column)
+    if value is None:
+        return None
+    if column == 'created_at':
+        return value.isoformat()
+    if column == 'event_code':
+        return value.value
+    if column == 'attributes':
+        # CSV/Parquet에서도 한 칸에 들어가도록 JSON 문자열로 내보냄
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def log_to_dict(log) -> Dict[str, Any]:
+    return {column: _export_value(log, column) for column in EXPORT_COLUMNS}
+
+
+def iter_ndjson(rows: Iterable[Dict[str, Any]], chunk_rows: int = 1000) -> Iterator[bytes]:
+    buffer: List[str] = []
+    for row in rows:
+        buffer.append(json.dumps(row, ensure_ascii=False))
+        if len(buffer) >= chunk_rows:
+            yield ('\n'.join(buffer) + '\n').encode('utf-8')
+            buffer = []
+    if buffer:
+        yield ('\n'.join(buffer) + '\n').encode('utf-8')
+
+
+def iter_csv(rows: Iterable[Dict[str, Any]], chunk_rows: int = 1000) -> Iterator[bytes]:
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=EXPORT_COLUMNS)
+    # 엑셀에서 한글이 깨지지 않도록 BOM 포함
+    out.write('\ufeff')
+    writer.writeheader()
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+        if count >= chunk_rows:
+            yield out.getvalue().encode('utf-8')
+            out.seek(0)
+            out.truncate(0)
+            count = 0
+    if out.tell():
+        yield out.getvalue().encode('utf-8')
+
+
+class _ChunkSink(io.RawIOBase):
+    """ParquetWriter가 쓴 바이트를 모아 두었다가 꺼내 가는 출력 대상"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_parquet(rows: Iterable[Dict[str, Any]], chunk_rows: int = 10000) -> Iterator[bytes]:
+    """chunk_rows 행마다 row group 하나를 써서 내보냅니다. pyarrow가 필요합니다."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ('id', pa.int64()),
+        ('created_at', pa.string()),
+        ('log_type', pa.string()),
+        ('log_level', pa.string()),
+        ('user_id', pa.int64()),
+        ('username', pa.string()),
+        ('action', pa.string()),
+        ('details', pa.string()),
+        ('ip_address', pa.string()),
+        ('user_agent', pa.string()),
+        ('session_id', pa.string()),
+        ('event_count', pa.int64()),
+        ('event_code', pa.string()),
+        ('attributes', pa.string()),
+    ])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression='snappy')
+
+    buffer: List[Dict[str, Any]] = []
+    for row in rows:
+        buffer.append(row)
+        if len(buffer) >= chunk_rows:
+            writer.write_table(pa.Table.from_pylist(buffer, schema=schema))
+            buffer = []
+            yield sink.drain()
+    if buffer:
+        writer.write_table(pa.Table.from_pylist(buffer, schema=schema))
+    writer.close()
+    yield sink.drain()
+
+
+def parquet_available() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def gzip_stream(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """바이트 청크를 gzip 형식으로 즉석 압축합니다."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
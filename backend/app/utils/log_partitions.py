@@ -0,0 +1,191 @@
+import os
+import re
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import pytz
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from ..models import ActivityLogRollup
+from .kst_utils import get_kst_now
+
+# 미리 만들어 둘 미래 파티션 개월 수
+LOG_PARTITION_MONTHS_AHEAD = int(os.getenv("LOG_PARTITION_MONTHS_AHEAD", "3"))
+# 보존 개월 수 (현재 달 제외). 0이면 삭제하지 않음
+LOG_RETENTION_MONTHS = int(os.getenv("LOG_RETENTION_MONTHS", "0"))
+# 파티션 유지보수 주기 (초)
+LOG_PARTITION_MAINTENANCE_INTERVAL = int(os.getenv("LOG_PARTITION_MAINTENANCE_INTERVAL", str(6 * 3600)))
+
+# 여러 워커가 동시에 파티션을 만들지 않도록 하는 advisory lock 키
+PARTITION_LOCK_KEY = 7320001
+
+PARENT_TABLE = "activity_logs"
+DEFAULT_PARTITION = "activity_logs_default"
+_PARTITION_NAME = re.compile(r"^activity_logs_y(\d{4})m(\d{2})$")
+
+KST = pytz.timezone('Asia/Seoul')
+
+
+def month_start(year: int, month: int) -> datetime:
+    """해당 월 1일 KST 자정"""
+    return KST.localize(datetime(year, month, 1))
+
+
+def add_months(dt: datetime, months: int) -> datetime:
+    years, month_index = divmod(dt.month - 1 + months, 12)
+    return month_start(dt.year + years, month_index + 1)
+
+
+def partition_name(start: datetime) -> str:
+    return f"activity_logs_y{start.year}m{start.month:02d}"
+
+
+def is_partitioned(db: Session) -> bool:
+    result = db.execute(text("""
+        SELECT EXISTS (
+            SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)
+        )
+    """), {"table": PARENT_TABLE}).scalar()
+    return bool(result)
+
+
+def create_month_partition(db: Session, start: datetime) -> bool:
+    """start가 속한 달의 파티션을 만듭니다. 이미 있으면 False를 반환합니다."""
+    name = partition_name(start)
+    exists = db.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}).scalar()
+    if exists:
+        return False
+    end = add_months(start, 1)
+    db.execute(text(
+        f"CREATE TABLE {name} PARTITION OF {PARENT_TABLE} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    ))
+    return True
+
+
+def ensure_default_partition(db: Session) -> None:
+    """범위 밖(또는 created_at이 NULL인) 행을 받는 기본 파티션"""
+    db.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT"))
+
+
+def list_partitions(db: Session) -> List[Dict[str, Any]]:
+    rows = db.execute(text("""
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), c.reltuples::bigint,
+               pg_total_relation_size(c.oid)
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(:table)
+        ORDER BY c.relname
+    """), {"table": PARENT_TABLE}).fetchall()
+
+    partitions = []
+    for name, bound, estimated_rows, size_bytes in rows:
+        match = _PARTITION_NAME.match(name)
+        partitions.append({
+            "name": name,
+            "bound": bound,
+            "month": f"{match.group(1)}-{match.group(2)}" if match else None,
+            "estimated_rows": max(int(estimated_rows or 0), 0),
+            "size_bytes": int(size_bytes or 0)
+        })
+    return partitions
+
+
+def drop_expired_partitions(db: Session, retention_months: int) -> List[str]:
+    """보존 기간이 지난 월 파티션을 분리 후 삭제합니다 (행 단위 DELETE 없음)."""
+    if retention_months <= 0:
+        return []
+    now = get_kst_now()
+    cutoff = add_months(month_start(now.year, now.month), -retention_months)
+
+    dropped = []
+    for partition in list_partitions(db):
+        match = _PARTITION_NAME.match(partition["name"])
+        if not match:
+            continue
+        end = add_months(month_start(int(match.group(1)), int(match.group(2))), 1)
+        if end <= cutoff:
+            db.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {partition['name']}"))
+            db.execute(text(f"DROP TABLE {partition['name']}"))
+            dropped.append(partition["name"])
+
+    if dropped:
+        # 삭제된 기간의 로그 통계 집계도 함께 정리
+        db.query(ActivityLogRollup).filter(ActivityLogRollup.bucket < cutoff).delete(synchronize_session=False)
+    return dropped
+
+
+def maintain_partitions(
+    db: Session,
+    months_ahead: int = LOG_PARTITION_MONTHS_AHEAD,
+    retention_months: int = LOG_RETENTION_MONTHS
+) -> Dict[str, Any]:
+    """이번 달부터 months_ahead 개월 뒤까지 파티션을 만들고 보존 정책을 적용합니다."""
+    if not is_partitioned(db):
+        return {
+            "partitioned": False,
+            "message": "activity_logs is not partitioned. Run partition_activity_logs.py to migrate."
+        }
+
+    try:
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PARTITION_LOCK_KEY})
+        now = get_kst_now()
+        current = month_start(now.year, now.month)
+
+        created = []
+        for offset in range(months_ahead + 1):
+            start = add_months(current, offset)
+            if create_month_partition(db, start):
+                created.append(partition_name(start))
+        ensure_default_partition(db)
+
+        dropped = drop_expired_partitions(db, retention_months)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return {
+        "partitioned": True,
+        "created": created,
+        "dropped": dropped,
+        "retention_months": retention_months
+    }
+
+
+class PartitionMaintenance:
+    """주기적으로 파티션 유지보수를 실행하는 백그라운드 스레드"""
+
+    def __init__(self, interval: int = LOG_PARTITION_MAINTENANCE_INTERVAL):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_result: Optional[Dict[str, Any]] = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            db = SessionLocal()
+            try:
+                self.last_result = maintain_partitions(db)
+            except Exception as e:
+                print(f"Failed to maintain activity_logs partitions: {str(e)}")
+            finally:
+                db.close()
+            self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="log-partition-maintenance", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+# 프로세스 전역 파티션 유지보수 스레드
+partition_maintenance = PartitionMaintenance()
@@ -0,0 +1,104 @@
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import func, case, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from ..models import ActivityLogRollup
+from .dashboard_stats import apply_daily_stats
+
+LOG_LEVELS = ('error', 'warning', 'info', 'success')
+LOG_TYPES = ('user', 'system', 'security')
+
+
+def _bucket(created_at: datetime) -> datetime:
+    return created_at.replace(minute=0, second=0, microsecond=0)
+
+
+def apply_log_rollup(db: Session, rows: Iterable[Dict[str, Any]]) -> None:
+    """기록된 로그 행들을 시간별 집계와 대시보드 일별 집계에 더합니다. 호출자의 트랜잭션 안에서 실행됩니다."""
+    rows = list(rows)
+    apply_daily_stats(db, rows)
+    counts = Counter()
+    for row in rows:
+        created_at = row.get("created_at")
+        if created_at is None:
+            continue
+        key = (
+            _bucket(created_at),
+            row.get("log_type") or '',
+            row.get("log_level") or '',
+            row.get("action") or ''
+        )
+        counts[key] += row.get("event_count") or 1
+
+    if not counts:
+        return
+
+    values = [
+        {"bucket": bucket, "log_type": log_type, "log_level": log_level, "action": action, "count": count}
+        for (bucket, log_type, log_level, action), count in counts.items()
+    ]
+    stmt = pg_insert(ActivityLogRollup).values(values)
+    stmt = stmt.on_conflict_do_update(
+        constraint='uq_activity_log_rollups_key',
+        set_={"count": ActivityLogRollup.count + stmt.excluded["count"]}
+    )
+    db.execute(stmt)
+
+
+def rebuild_log_rollups(db: Session) -> int:
+    """activity_logs 전체로부터 시간별 집계를 다시 만듭니다."""
+    db.query(ActivityLogRollup).delete()
+    result = db.execute(text("""
+        INSERT INTO activity_log_rollups (bucket, log_type, log_level, action, count)
+        SELECT date_trunc('hour', created_at), COALESCE(log_type, ''), COALESCE(log_level, ''),
+               COALESCE(action, ''), SUM(COALESCE(event_count, 1))
+        FROM activity_logs
+        WHERE created_at IS NOT NULL
+        GROUP BY 1, 2, 3, 4
+    """))
+    db.commit()
+    return result.rowcount
+
+
+def get_rollup_stats(
+    db: Session,
+    today_start: datetime,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """집계 테이블에서 한 번의 쿼리로 로그 통계 (전체/오늘/레벨별/타입별)를 계산합니다."""
+    query = db.query(
+        ActivityLogRollup.log_type,
+        ActivityLogRollup.log_level,
+        func.sum(ActivityLogRollup.count),
+        func.sum(case((ActivityLogRollup.bucket >= today_start, ActivityLogRollup.count), else_=0))
+    )
+    if start is not None:
+        query = query.filter(ActivityLogRollup.bucket >= _bucket(start))
+    if end is not None:
+        query = query.filter(ActivityLogRollup.bucket < end)
+    rows = query.group_by(ActivityLogRollup.log_type, ActivityLogRollup.log_level).all()
+
+    by_level = {level: 0 for level in LOG_LEVELS}
+    by_type = {log_type: 0 for log_type in LOG_TYPES}
+    total_logs = 0
+    today_logs = 0
+    for log_type, log_level, count, today_count in rows:
+        count = int(count or 0)
+        total_logs += count
+        today_logs += int(today_count or 0)
+        if log_level in by_level:
+            by_level[log_level] += count
+        if log_type in by_type:
+            by_type[log_type] += count
+
+    return {
+        "total_logs": total_logs,
+        "today_logs": today_logs,
+        "by_level": by_level,
+        "by_type": by_type
+    }
@@ -0,0 +1,269 @@
+import json
+import os
+import queue
+import random
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import insert
+
+from ..database import SessionLocal
+from ..models import ActivityLog
+from .kst_utils import get_kst_now
+from .log_rollup import apply_log_rollup
+from .log_broadcast import log_broadcaster
+
+# 큐 최대 크기 (이벤트 수)
+LOG_QUEUE_MAX_SIZE = int(os.getenv("LOG_QUEUE_MAX_SIZE", "10000"))
+# 한 번에 기록할 최대 행 수
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "200"))
+# 배치가 차지 않아도 기록하는 주기 (초)
+LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", "1.0"))
+# 큐가 가득 찼을 때 요청 스레드가 기다리는 최대 시간 (초), 초과 시 이벤트 버림
+LOG_ENQUEUE_TIMEOUT = float(os.getenv("LOG_ENQUEUE_TIMEOUT", "0.05"))
+
+# 액션별 기록 정책: 'full' (모두 기록), 'aggregate' (세션·분 단위 집계), 'sample:<비율>' (표본 기록)
+# 예) LOG_ACTION_POLICIES='{"용어 학습": "aggregate", "AI 정보 학습": "sample:0.2"}'
+DEFAULT_ACTION_POLICIES = {
+    "용어 학습": "aggregate",
+    "AI 정보 학습": "aggregate",
+}
+LOG_ACTION_POLICIES = {**DEFAULT_ACTION_POLICIES, **json.loads(os.getenv("LOG_ACTION_POLICIES", "{}"))}
+
+# 정책과 무관하게 항상 모두 기록하는 로그 타입
+FULL_FIDELITY_LOG_TYPES = ('security', 'system', 'error')
+
+_STOP = object()
+
+
+class MinuteAggregator:
+    """집계 대상 이벤트를 (세션, 분, 액션) 단위 카운터 행 하나로 합칩니다. 기록 스레드 전용입니다.
+
+    합친 이벤트들의 attributes가 모두 같으면 그대로 두고, 하나라도 다르면
+    {"aggregated": true, "last": 마지막 이벤트의 attributes}로 바꿔 한 이벤트의 속성이 전체인 것처럼 보이지 않게 합니다.
+    """
+
+    def __init__(self):
+        self._rows: Dict[Tuple, Dict[str, Any]] = {}
+        self._mixed: Set[Tuple] = set()
+
+    def add(self, row: Dict[str, Any]) -> None:
+        minute = row["created_at"].replace(second=0, microsecond=0)
+        key = (
+            row.get("session_id"), row.get("username"), minute, row.get("action"),
+            row.get("event_code"), row.get("log_type"), row.get("log_level")
+        )
+        existing = self._rows.get(key)
+        if existing is None:
+            self._rows[key] = {**row, "created_at": minute, "event_count": row.get("event_count") or 1}
+            return
+        existing["event_count"] += row.get("event_count") or 1
+        existing["details"] = f"1분간 {existing['event_count']}건 집계 (마지막: {row.get('details') or ''})"
+        attributes = row.get("attributes")
+        if key in self._mixed or existing.get("attributes") != attributes:
+            self._mixed.add(key)
+            existing["attributes"] = {"aggregated": True, "last": attributes}
+
+    def pop_closed(self, now=None) -> List[Dict[str, Any]]:
+        """끝난 분의 집계 행을 꺼냅니다. now가 None이면 모두 꺼냅니다."""
+        closed = []
+        for key in list(self._rows):
+            if now is None or key[2] + timedelta(minutes=1) <= now:
+                closed.append(self._rows.pop(key))
+                self._mixed.discard(key)
+        return closed
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+
+def get_action_policy(action: str, log_type: Optional[str]) -> Tuple[str, float]:
+    """(정책, 표본 비율)을 반환합니다."""
+    if log_type in FULL_FIDELITY_LOG_TYPES:
+        return 'full', 1.0
+    policy = LOG_ACTION_POLICIES.get(action, 'full')
+    if policy.startswith('sample:'):
+        try:
+            rate = float(policy.split(':', 1)[1])
+        except ValueError:
+            return 'full', 1.0
+        return ('sample', rate) if 0 < rate < 1 else ('full', 1.0)
+    if policy == 'aggregate':
+        return 'aggregate', 1.0
+    return 'full', 1.0
+
+
+class ActivityLogWriter:
+    """활동 로그를 메모리 큐에 쌓고 백그라운드 스레드에서 다중 행 INSERT로 기록합니다."""
+
+    def __init__(
+        self,
+        max_size: int = LOG_QUEUE_MAX_SIZE,
+        batch_size: int = LOG_BATCH_SIZE,
+        flush_interval: float = LOG_FLUSH_INTERVAL,
+        enqueue_timeout: float = LOG_ENQUEUE_TIMEOUT
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_size)
+        self._aggregator = MinuteAggregator()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._counter_lock = threading.Lock()
+        self._stopping = False
+        self.counters = {
+            "enqueued": 0,
+            "written": 0,
+            "dropped": 0,
+            "overflow_waits": 0,
+            "batches": 0,
+            "failed": 0,
+            "aggregated": 0,
+            "sampled_out": 0
+        }
+
+    def _incr(self, name: str, amount: int = 1) -> None:
+        with self._counter_lock:
+            self.counters[name] += amount
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="activity-log-writer", daemon=True)
+            self._thread.start()
+
+    def enqueue(self, row: Dict[str, Any]) -> bool:
+        """로그 행을 큐에 넣습니다. 큐가 가득 차면 잠시 기다린 뒤 버리고 False를 반환합니다."""
+        if self._stopping:
+            self._incr("dropped")
+            return False
+        if self._thread is None or not self._thread.is_alive():
+            self.start()
+
+        policy, rate = get_action_policy(row.get("action"), row.get("log_type"))
+        if policy == 'sample':
+            if random.random() >= rate:
+                self._incr("sampled_out")
+                return True
+            # 표본 하나가 대표하는 이벤트 수 (집계 통계가 편향되지 않도록)
+            row = {**row, "event_count": round(1 / rate)}
+        elif policy == 'aggregate':
+            row = {**row, "_aggregate": True}
+
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self._incr("overflow_waits")
+            try:
+                self._queue.put(row, timeout=self.enqueue_timeout)
+            except queue.Full:
+                self._incr("dropped")
+                return False
+        self._incr("enqueued")
+        return True
+
+    def _run(self) -> None:
+        batch: List[Dict[str, Any]] = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            timeout = max(deadline - time.monotonic(), 0)
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                self._drain(batch)
+                return
+            if item is not None:
+                self._accept(item, batch)
+
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                batch.extend(self._aggregator.pop_closed(get_kst_now()))
+                self._write(batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+
+    def _accept(self, item: Dict[str, Any], batch: List[Dict[str, Any]]) -> None:
+        if item.pop("_aggregate", False):
+            self._aggregator.add(item)
+            self._incr("aggregated")
+        else:
+            batch.append(item)
+
+    def _drain(self, batch: List[Dict[str, Any]]) -> None:
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                self._accept(item, batch)
+            if len(batch) >= self.batch_size:
+                self._write(batch)
+                batch = []
+        batch.extend(self._aggregator.pop_closed())
+        self._write(batch)
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        if not batch:
+            return
+        # 집계/표본 행과 일반 행의 키를 맞춤 (다중 행 INSERT는 같은 컬럼 집합 필요)
+        for row in batch:
+            row.setdefault("event_count", 1)
+            row.setdefault("event_code", None)
+            row.setdefault("attributes", None)
+        db = SessionLocal()
+        try:
+            ids = db.execute(
+                insert(ActivityLog).returning(ActivityLog.id, sort_by_parameter_order=True), batch
+            ).scalars().all()
+            apply_log_rollup(db, batch)
+            db.commit()
+            self._incr("written", len(batch))
+            self._incr("batches")
+        except Exception as e:
+            db.rollback()
+            self._incr("failed", len(batch))
+            print(f"Failed to write activity log batch ({len(batch)} rows): {str(e)}")
+            return
+        finally:
+            db.close()
+
+        # 실시간 로그 구독자에게 전달
+        try:
+            log_broadcaster.publish({**row, "id": row_id} for row, row_id in zip(batch, ids))
+        except Exception as e:
+            print(f"Failed to broadcast activity logs: {str(e)}")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """새 이벤트를 받지 않고 큐에 남은 로그를 모두 기록한 뒤 종료합니다."""
+        self._stopping = True
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._counter_lock:
+            counters = dict(self.counters)
+        return {
+            **counters,
+            "queue_size": self._queue.qsize(),
+            "pending_aggregates": len(self._aggregator),
+            "action_policies": LOG_ACTION_POLICIES,
+            "queue_capacity": self._queue.maxsize,
+            "batch_size": self.batch_size,
+            "flush_interval": self.flush_interval,
+            "running": self._thread is not None and self._thread.is_alive()
+        }
+
+
+# 프로세스 전역 로그 기록기
+activity_log_writer = ActivityLogWriter()
@@ -0,0 +1,53 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Query, Session
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """(created_at, id) 위치를 불투명한 커서 문자열로 인코딩합니다."""
+    raw = json.dumps({"t": created_at.isoformat(), "i": row_id}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[datetime, int]]:
+    """커서 문자열을 (created_at, id)로 디코딩합니다. 잘못된 커서면 None을 반환합니다."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+        return datetime.fromisoformat(data["t"]), int(data["i"])
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def estimate_query_count(db: Session, query: Query) -> Optional[int]:
+    """EXPLAIN의 플래너 추정 행 수로 쿼리 결과 수를 근사합니다 (실제 실행 없음)."""
+    try:
+        compiled = query.statement.compile(dialect=db.bind.dialect)
+        result = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params)
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception as e:
+        db.rollback()
+        print(f"Failed to estimate query count: {str(e)}")
+        return None
+
+
+def estimate_table_rows(db: Session, table_name: str) -> Optional[int]:
+    """pg_class.reltuples 통계로 테이블 전체 행 수를 근사합니다."""
+    try:
+        value = db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+            {"table": table_name}
+        ).scalar()
+        # 한 번도 ANALYZE 되지 않은 테이블은 -1
+        return int(value) if value is not None and value >= 0 else None
+    except Exception as e:
+        db.rollback()
+        print(f"Failed to estimate table rows: {str(e)}")
+        return None
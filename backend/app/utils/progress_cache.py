@@ -0,0 +1,110 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# 캐시 최대 메모리 (bytes) - 기본 32MB
+PROGRESS_CACHE_MAX_BYTES = int(os.getenv("PROGRESS_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# 항목당 고정 오버헤드 (키, OrderedDict 노드 등 대략치)
+_ENTRY_OVERHEAD = 200
+
+
+class ProgressCache:
+    """세션별 학습 진행상황/통계 계산 결과를 보관하는 메모리 제한 LRU 캐시
+
+    값은 JSON 문자열로 저장하고 조회할 때마다 새로 디코딩하므로, 호출자가 반환값을 수정해도 캐시는 바뀌지 않습니다.
+    메모리 사용량은 저장된 JSON 길이로 계산합니다.
+    """
+
+    def __init__(self, max_bytes: int = PROGRESS_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[str, int]]" = OrderedDict()
+        self._keys_by_session: Dict[str, set] = {}
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, session_id: str, kind: str) -> Optional[Any]:
+        key = (session_id, kind)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            data = entry[0]
+        return json.loads(data)
+
+    def set(self, session_id: str, kind: str, value: Any) -> None:
+        """JSON으로 직렬화할 수 없는 값은 캐시하지 않습니다."""
+        key = (session_id, kind)
+        try:
+            data = json.dumps(value, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return
+        size = len(data.encode('utf-8')) + _ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (data, size)
+            self._keys_by_session.setdefault(session_id, set()).add(kind)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, session_id: str) -> None:
+        """쓰기 발생 시 해당 세션의 모든 캐시 항목을 제거합니다."""
+        with self._lock:
+            kinds = self._keys_by_session.get(session_id)
+            if not kinds:
+                return
+            for kind in list(kinds):
+                self._remove((session_id, kind))
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        """복원/전체 삭제 등 대량 변경 시 캐시 전체를 비웁니다."""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_session.clear()
+            self._bytes = 0
+
+    def _remove(self, key: Tuple[str, str]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= entry[1]
+        session_id, kind = key
+        kinds = self._keys_by_session.get(session_id)
+        if kinds is not None:
+            kinds.discard(kind)
+            if not kinds:
+                del self._keys_by_session[session_id]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "sessions": len(self._keys_by_session),
+                "memory_bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
+
+
+# 프로세스 전역 캐시 인스턴스
+progress_cache = ProgressCache()
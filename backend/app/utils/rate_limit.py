@@ -0,0 +1,72 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import Request
+
+# 앱 앞에 있는 리버스 프록시 수 (Railway 등 프록시 뒤에 배포하면 1).
+# 0이면 X-Forwarded-For를 무시하고 TCP 연결 주소를 씀 (클라이언트가 헤더를 위조할 수 있으므로 기본값은 0)
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "0"))
+
+
+def client_address(request: Request, trusted_hops: int = TRUSTED_PROXY_HOPS) -> Optional[str]:
+    """요청한 클라이언트의 주소. 신뢰하는 프록시가 X-Forwarded-For 끝에 덧붙인 주소를 사용합니다.
+
+    각 프록시는 자신이 받은 연결의 주소를 오른쪽 끝에 추가하므로, 오른쪽에서 trusted_hops번째 값은
+    클라이언트가 위조할 수 없는 주소입니다. 헤더가 없거나 항목이 부족하면 연결 주소를 씁니다.
+    """
+    peer = request.client.host if request.client else None
+    if trusted_hops <= 0:
+        return peer
+    forwarded = [part.strip() for part in request.headers.get("x-forwarded-for", "").split(",") if part.strip()]
+    if len(forwarded) < trusted_hops:
+        return peer
+    return forwarded[-trusted_hops]
+
+
+class TokenBucketLimiter:
+    """클라이언트(키)별 토큰 버킷 제한기. 프로세스(워커) 단위로 동작합니다.
+
+    rate: 초당 보충되는 토큰 수, burst: 버킷 크기.
+    추적하는 키는 max_keys개로 제한하고 가장 오래 쓰이지 않은 키부터 잊습니다.
+    """
+
+    def __init__(self, rate: float, burst: float, max_keys: int = 10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def acquire(self, key: str, cost: float = 1.0) -> Tuple[bool, float]:
+        """cost만큼 토큰을 씁니다. (허용 여부, 다시 시도까지 남은 초)를 반환합니다."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            allowed = cost <= tokens
+            if allowed:
+                tokens -= cost
+            else:
+                self.rejected += 1
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+
+        if allowed:
+            return True, 0.0
+        # 버킷보다 큰 요청은 채워져도 통과할 수 없으므로 가득 찰 때까지의 시간을 알려줌
+        needed = min(cost, self.burst) - tokens
+        return False, needed / self.rate if self.rate > 0 else float('inf')
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "rate": self.rate,
+                "burst": self.burst,
+                "tracked_clients": len(self._buckets),
+                "rejected": self.rejected
+            }
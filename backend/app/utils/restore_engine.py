@@ -0,0 +1,570 @@
+import io
+import json
+import os
+import re
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from ..database import engine
+from .backup_engine import BACKUP_TABLE_MODELS, iter_backup_events
+
+# COPY 한 번(= 커밋 한 번)에 적재하는 행 수
+RESTORE_CHUNK_ROWS = int(os.getenv("RESTORE_CHUNK_ROWS", "5000"))
+
+# true면 섀도 테이블에 적재한 뒤 이름 바꾸기로 교체 (복원 중에도 기존 데이터 조회 가능, 디스크는 두 배 필요)
+# false면 기존 테이블을 비우고 바로 적재
+RESTORE_SWAP = os.getenv("RESTORE_SWAP", "true").lower() == "true"
+# 교체 트랜잭션이 테이블 잠금을 기다리는 최대 시간. 넘으면 교체를 포기하고 섀도 테이블을 지움
+RESTORE_SWAP_LOCK_TIMEOUT = os.getenv("RESTORE_SWAP_LOCK_TIMEOUT", "5s")
+
+# 동시에 두 복원이 같은 섀도 테이블을 쓰지 않도록 하는 advisory lock 키
+RESTORE_LOCK_KEY = 7320003
+
+SHADOW_SUFFIX = "__restore"
+SHADOW_OBJECT_SUFFIX = "__rs"
+OLD_SUFFIX = "__old"
+
+
+class RestoreCancelled(Exception):
+    pass
+
+
+class RestoreInProgress(Exception):
+    pass
+
+
+def _copy_value(value: Any) -> str:
+    """COPY text 형식의 값 하나로 변환합니다."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value, ensure_ascii=False)
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace('\t', '\\t')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+    )
+
+
+def _copy_buffer(rows: Iterable[List[Any]]) -> io.StringIO:
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write('\t'.join(_copy_value(value) for value in row))
+        buffer.write('\n')
+    buffer.seek(0)
+    return buffer
+
+
+def _secondary_indexes(cursor, table_name: str) -> List[Tuple[str, str]]:
+    """기본 키/제약 조건에 속하지 않는 인덱스의 (이름, 정의) 목록"""
+    cursor.execute("""
+        SELECT i.relname, pg_get_indexdef(x.indexrelid)
+        FROM pg_index x
+        JOIN pg_class i ON i.oid = x.indexrelid
+        WHERE x.indrelid = to_regclass(%s)
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = x.indexrelid)
+    """, (table_name,))
+    # 파티션 테이블 인덱스의 정의는 ON ONLY로 나오므로 파티션까지 함께 만들도록 바꿈
+    return [(name, definition.replace(' ON ONLY ', ' ON ')) for name, definition in cursor.fetchall()]
+
+
+def _suffixed(name: str, suffix: str) -> str:
+    """식별자 길이 제한(63바이트) 안에서 접미사를 붙인 이름"""
+    return name[:63 - len(suffix)] + suffix
+
+
+def _table_constraints(cursor, table_name: str) -> List[Tuple[str, str]]:
+    """기본 키/유니크 제약 조건의 (이름, 정의) 목록"""
+    cursor.execute("""
+        SELECT conname, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE conrelid = to_regclass(%s) AND contype IN ('p', 'u')
+        ORDER BY contype, conname
+    """, (table_name,))
+    return cursor.fetchall()
+
+
+def _partitions(cursor, table_name: str) -> List[Tuple[str, str]]:
+    """파티션의 (이름, 범위 정의) 목록. 파티션 테이블이 아니면 빈 목록"""
+    cursor.execute("""
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(%s)
+        ORDER BY c.relname
+    """, (table_name,))
+    return cursor.fetchall()
+
+
+def _shadow_index_definition(definition: str, shadow_index: str, shadow_table: str) -> str:
+    """기존 테이블의 인덱스 정의를 섀도 테이블용 이름과 대상으로 바꿉니다."""
+    match = re.match(r"^(CREATE (?:UNIQUE )?INDEX )\S+ ON (?:ONLY )?\S+( .*)$", definition, re.S)
+    if not match:
+        raise ValueError(f"Unsupported index definition: {definition}")
+    return f"{match.group(1)}{shadow_index} ON {shadow_table}{match.group(2)}"
+
+
+def _reset_sequences(cursor, table_name: str, columns: List[str]) -> None:
+    """적재한 id 값 다음부터 발급되도록 시퀀스를 맞춥니다."""
+    for column in columns:
+        cursor.execute("SELECT pg_get_serial_sequence(%s, %s)", (table_name, column))
+        sequence = cursor.fetchone()[0]
+        if not sequence:
+            continue
+        cursor.execute(
+            f"SELECT setval(%s, COALESCE((SELECT MAX({column}) FROM {table_name}), 0) + 1, false)",
+            (sequence,)
+        )
+
+
+class TableLoader:
+    """테이블 하나를 비우고 COPY로 청크 단위 적재합니다.
+
+    적재 전에 보조 인덱스를 지우고 끝난 뒤 한 번에 다시 만들어 행마다 인덱스를 갱신하는 비용을 없앱니다.
+    청크마다 커밋하므로 긴 트랜잭션 하나가 WAL과 잠금을 오래 잡지 않습니다.
+
+    shadow=True면 target_table은 막 만든 빈 섀도 테이블이며, 기존 테이블의 기본 키/유니크 제약 조건과
+    보조 인덱스를 적재 후 섀도 테이블에 만듭니다. 교체 시 이름을 되돌릴 수 있도록 renames에
+    (종류, 기존 이름, 섀도 이름)을 기록합니다.
+    """
+
+    def __init__(
+        self,
+        raw_connection,
+        table_name: str,
+        backup_columns: List[str],
+        target_table: Optional[str] = None,
+        mode: str = "replace",
+        shadow: bool = False
+    ):
+        self.raw = raw_connection
+        self.table_name = table_name
+        self.target_table = target_table or table_name
+        self.mode = mode
+        self.shadow = shadow
+        table = BACKUP_TABLE_MODELS[table_name].__table__
+        known = {column.name for column in table.columns}
+        self.primary_key = [column.name for column in table.primary_key.columns]
+        # 현재 스키마에 없는 컬럼은 버리고, 백업에 없는 컬럼은 기본값 사용
+        self.positions = [i for i, column in enumerate(backup_columns) if column in known]
+        self.columns = [backup_columns[i] for i in self.positions]
+        self.indexes: List[Tuple[str, str]] = []
+        self.constraints: List[Tuple[str, str]] = []
+        self.renames: List[Tuple[str, str, str]] = []
+        self.rows = 0
+        self.started = time.time()
+
+    def begin(self) -> None:
+        if self.mode == "merge":
+            # 증분 섹션은 기존 행을 유지한 채 임시 테이블을 거쳐 병합
+            with self.raw.cursor() as cursor:
+                cursor.execute(
+                    f"CREATE TEMP TABLE IF NOT EXISTS {self._staging_table} "
+                    f"(LIKE {self.target_table} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+                )
+            self.raw.commit()
+            return
+        if self.shadow:
+            # 빈 섀도 테이블이므로 비울 필요 없이 적재 후 만들 제약 조건/인덱스만 준비
+            with self.raw.cursor() as cursor:
+                for name, definition in _table_constraints(cursor, self.table_name):
+                    shadow_name = _suffixed(name, SHADOW_OBJECT_SUFFIX)
+                    self.constraints.append((shadow_name, definition))
+                    self.renames.append(("constraint", name, shadow_name))
+                for name, definition in _secondary_indexes(cursor, self.table_name):
+                    shadow_name = _suffixed(name, SHADOW_OBJECT_SUFFIX)
+                    self.indexes.append((shadow_name, _shadow_index_definition(definition, shadow_name, self.target_table)))
+                    self.renames.append(("index", name, shadow_name))
+            self.raw.commit()
+            return
+        with self.raw.cursor() as cursor:
+            self.indexes = _secondary_indexes(cursor, self.target_table)
+            cursor.execute(f"TRUNCATE {self.target_table}")
+            for name, _ in self.indexes:
+                cursor.execute(f"DROP INDEX IF EXISTS {name}")
+        self.raw.commit()
+
+    def load(self, rows: List[List[Any]]) -> None:
+        if not rows or not self.columns:
+            return
+        buffer = _copy_buffer([row[i] if i < len(row) else None for i in self.positions] for row in rows)
+        column_list = ', '.join(self.columns)
+        with self.raw.cursor() as cursor:
+            if self.mode == "merge":
+                cursor.copy_expert(f"COPY {self._staging_table} ({column_list}) FROM STDIN", buffer)
+                updates = [column for column in self.columns if column not in self.primary_key]
+                conflict = (
+                    "DO UPDATE SET " + ', '.join(f"{column} = EXCLUDED.{column}" for column in updates)
+                    if updates else "DO NOTHING"
+                )
+                cursor.execute(
+                    f"INSERT INTO {self.target_table} ({column_list}) "
+                    f"SELECT {column_list} FROM {self._staging_table} "
+                    f"ON CONFLICT ({', '.join(self.primary_key)}) {conflict}"
+                )
+            else:
+                cursor.copy_expert(f"COPY {self.target_table} ({column_list}) FROM STDIN", buffer)
+        self.raw.commit()
+        self.rows += len(rows)
+
+    @property
+    def _staging_table(self) -> str:
+        return f"restore_staging_{self.table_name}"
+
+    def finish(self) -> Dict[str, Any]:
+        with self.raw.cursor() as cursor:
+            for name, definition in self.constraints:
+                cursor.execute(f"ALTER TABLE {self.target_table} ADD CONSTRAINT {name} {definition}")
+            for _, definition in self.indexes:
+                cursor.execute(definition)
+            # 섀도 테이블의 시퀀스는 기존 테이블 소유이므로 교체 후에 맞춤
+            if not self.shadow:
+                _reset_sequences(cursor, self.target_table, self.columns)
+        self.raw.commit()
+        # 통계 갱신은 트랜잭션 밖에서도 되지만 같은 연결에서 바로 실행
+        with self.raw.cursor() as cursor:
+            cursor.execute(f"ANALYZE {self.target_table}")
+        self.raw.commit()
+
+        seconds = max(time.time() - self.started, 0.001)
+        return {
+            "rows": self.rows,
+            "seconds": round(seconds, 3),
+            "rows_per_sec": round(self.rows / seconds),
+            "indexes_rebuilt": len(self.indexes) + len(self.constraints),
+            "mode": self.mode
+        }
+
+
+class ShadowRestore:
+    """복원할 테이블마다 섀도 테이블을 만들어 적재하고, 검증 후 한 트랜잭션에서 이름을 바꿔 교체합니다.
+
+    적재하는 동안 기존 테이블은 그대로 조회/기록되며, 교체는 ACCESS EXCLUSIVE 잠금 아래에서
+    이름 변경만 하므로 짧게 끝납니다. 조회하는 쪽은 교체 전 데이터나 교체 후 데이터만 보게 됩니다.
+    적재 중에 기존 테이블에 기록된 행은 교체와 함께 사라집니다 (백업 시점으로 되돌리는 것이므로).
+    """
+
+    def __init__(self, raw_connection):
+        self.raw = raw_connection
+        self.tables: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def shadow_name(table_name: str) -> str:
+        return _suffixed(table_name, SHADOW_SUFFIX)
+
+    def _create_shadow(self, table_name: str) -> List[Tuple[str, str, str]]:
+        shadow = self.shadow_name(table_name)
+        renames: List[Tuple[str, str, str]] = []
+        with self.raw.cursor() as cursor:
+            # 이전에 중단된 복원이 남긴 섀도 테이블 정리 (파티션도 함께 삭제됨)
+            cursor.execute(f"DROP TABLE IF EXISTS {shadow}")
+            cursor.execute("SELECT pg_get_partkeydef(to_regclass(%s))", (table_name,))
+            partition_key = cursor.fetchone()[0]
+            partition_clause = f" PARTITION BY {partition_key}" if partition_key else ""
+            cursor.execute(
+                f"CREATE TABLE {shadow} (LIKE {table_name} INCLUDING DEFAULTS INCLUDING CONSTRAINTS "
+                f"INCLUDING GENERATED INCLUDING IDENTITY){partition_clause}"
+            )
+            # 파티션 테이블(activity_logs)은 기존과 같은 범위의 파티션을 만듦
+            for name, bound in (_partitions(cursor, table_name) if partition_key else []):
+                shadow_partition = _suffixed(name, SHADOW_OBJECT_SUFFIX)
+                cursor.execute(f"CREATE TABLE {shadow_partition} PARTITION OF {shadow} {bound}")
+                renames.append(("partition", name, shadow_partition))
+        self.raw.commit()
+        return renames
+
+    def loader(self, table_name: str, columns: List[str], mode: str) -> TableLoader:
+        shadow = self.shadow_name(table_name)
+        if mode == "merge":
+            if table_name not in self.tables:
+                raise ValueError(f"Incremental section for {table_name} has no full section earlier in this restore")
+            self.tables[table_name]["merged"] = True
+            return TableLoader(self.raw, table_name, columns, target_table=shadow, mode="merge")
+
+        # 체인의 뒤 파일에 다시 나온 전체 섹션은 섀도 테이블을 새로 만들어 교체
+        partitions = self._create_shadow(table_name)
+        self.tables[table_name] = {"rows": 0, "merged": False, "renames": partitions}
+        return TableLoader(self.raw, table_name, columns, target_table=shadow, shadow=True)
+
+    def record(self, loader: TableLoader) -> None:
+        """섹션 적재를 마친 로더의 행 수와 이름 변경 목록을 기록합니다."""
+        info = self.tables[loader.table_name]
+        if loader.mode == "merge":
+            return
+        info["rows"] = loader.rows
+        info["renames"] = info["renames"] + loader.renames
+
+    def validate(self) -> Dict[str, int]:
+        """섀도 테이블의 실제 행 수를 확인합니다. 병합이 없었던 테이블은 적재한 행 수와 같아야 합니다."""
+        counts: Dict[str, int] = {}
+        with self.raw.cursor() as cursor:
+            for table_name, info in self.tables.items():
+                cursor.execute(f"SELECT COUNT(*) FROM {self.shadow_name(table_name)}")
+                count = cursor.fetchone()[0]
+                if count < info["rows"] or (not info["merged"] and count != info["rows"]):
+                    raise ValueError(
+                        f"Shadow table validation failed for {table_name}: loaded {info['rows']} rows, found {count}"
+                    )
+                counts[table_name] = count
+        self.raw.commit()
+        return counts
+
+    def swap(self) -> float:
+        """한 트랜잭션에서 기존 테이블과 섀도 테이블의 이름을 바꿔 교체합니다. 잠금 유지 시간(초)을 반환합니다.
+
+        기존 테이블, 제약 조건, 인덱스, 파티션은 __old 접미사로 옮긴 뒤 섀도 쪽 이름을 원래 이름으로 바꾸고,
+        serial 시퀀스의 소유 컬럼을 새 테이블로 옮겨 기존 테이블을 삭제해도 시퀀스가 남게 합니다.
+        """
+        table_names = sorted(self.tables)
+        with self.raw.cursor() as cursor:
+            sequences: Dict[str, List[Tuple[str, str]]] = {}
+            for table_name in table_names:
+                cursor.execute(f"DROP TABLE IF EXISTS {_suffixed(table_name, OLD_SUFFIX)}")
+                owned = []
+                for column in BACKUP_TABLE_MODELS[table_name].__table__.columns:
+                    cursor.execute("SELECT pg_get_serial_sequence(%s, %s)", (table_name, column.name))
+                    sequence = cursor.fetchone()[0]
+                    if sequence:
+                        owned.append((column.name, sequence))
+                sequences[table_name] = owned
+        self.raw.commit()
+
+        started = time.time()
+        with self.raw.cursor() as cursor:
+            cursor.execute(f"SET LOCAL lock_timeout = '{RESTORE_SWAP_LOCK_TIMEOUT}'")
+            # 교착을 피하도록 항상 같은 순서로 잠금
+            for table_name in table_names:
+                cursor.execute(f"LOCK TABLE {table_name} IN ACCESS EXCLUSIVE MODE")
+            for table_name in table_names:
+                old = _suffixed(table_name, OLD_SUFFIX)
+                renames = self.tables[table_name]["renames"]
+                for kind, name, _ in renames:
+                    if kind == "constraint":
+                        cursor.execute(f"ALTER TABLE {table_name} RENAME CONSTRAINT {name} TO {_suffixed(name, OLD_SUFFIX)}")
+                    elif kind == "index":
+                        cursor.execute(f"ALTER INDEX IF EXISTS {name} RENAME TO {_suffixed(name, OLD_SUFFIX)}")
+                    else:
+                        cursor.execute(f"ALTER TABLE IF EXISTS {name} RENAME TO {_suffixed(name, OLD_SUFFIX)}")
+                cursor.execute(f"ALTER TABLE {table_name} RENAME TO {old}")
+                cursor.execute(f"ALTER TABLE {self.shadow_name(table_name)} RENAME TO {table_name}")
+                for kind, name, shadow_name in renames:
+                    if kind == "constraint":
+                        cursor.execute(f"ALTER TABLE {table_name} RENAME CONSTRAINT {shadow_name} TO {name}")
+                    elif kind == "index":
+                        cursor.execute(f"ALTER INDEX {shadow_name} RENAME TO {name}")
+                    else:
+                        cursor.execute(f"ALTER TABLE {shadow_name} RENAME TO {name}")
+                for column, sequence in sequences[table_name]:
+                    cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table_name}.{column}")
+        self.raw.commit()
+        locked_seconds = time.time() - started
+
+        # 교체 후 정리: 시퀀스를 새 데이터에 맞추고 기존 테이블 삭제
+        for table_name in table_names:
+            with self.raw.cursor() as cursor:
+                _reset_sequences(cursor, table_name, [column for column, _ in sequences[table_name]])
+                cursor.execute(f"DROP TABLE IF EXISTS {_suffixed(table_name, OLD_SUFFIX)}")
+            self.raw.commit()
+        return locked_seconds
+
+    def discard(self) -> None:
+        """실패한 복원의 섀도 테이블을 지웁니다. 기존 테이블은 건드리지 않았으므로 그대로입니다."""
+        try:
+            self.raw.rollback()
+            with self.raw.cursor() as cursor:
+                for table_name in self.tables:
+                    cursor.execute(f"DROP TABLE IF EXISTS {self.shadow_name(table_name)}")
+            self.raw.commit()
+        except Exception as e:
+            self.raw.rollback()
+            print(f"Failed to drop shadow tables: {str(e)}")
+
+
+def _apply_backup(
+    raw,
+    chunks: Iterable[bytes],
+    tables: Optional[List[str]],
+    chunk_rows: int,
+    on_progress: Optional[Callable[[str, int], None]],
+    should_cancel: Optional[Callable[[], bool]],
+    check_info: Optional[Callable[[Dict[str, Any]], None]],
+    on_table_done: Optional[Callable[[str, Dict[str, Any]], None]],
+    shadows: Optional[ShadowRestore]
+) -> Dict[str, Any]:
+    """백업 파일 하나를 읽으면서 테이블마다 적재합니다. shadows가 있으면 섀도 테이블에 적재합니다."""
+    backup_info: Dict[str, Any] = {}
+    results: Dict[str, Dict[str, Any]] = {}
+    loader: Optional[TableLoader] = None
+
+    try:
+        for event in iter_backup_events(chunks, chunk_rows):
+            if should_cancel and should_cancel():
+                raise RestoreCancelled("Restore cancelled")
+
+            kind = event[0]
+            if kind == "info":
+                backup_info = event[1]
+                if check_info:
+                    check_info(backup_info)
+            elif kind == "table":
+                table_name, columns, mode = event[1], event[2], event[3]
+                if table_name in BACKUP_TABLE_MODELS and (tables is None or table_name in tables):
+                    if shadows is not None:
+                        loader = shadows.loader(table_name, columns, mode)
+                    else:
+                        loader = TableLoader(raw, table_name, columns, mode=mode)
+                    loader.begin()
+                else:
+                    loader = None
+            elif kind == "rows" and loader is not None:
+                loader.load(event[1])
+                if on_progress:
+                    on_progress(loader.table_name, len(event[1]))
+            elif kind == "end" and loader is not None:
+                expected = event[2]
+                result = loader.finish()
+                if expected is not None and expected != result["rows"]:
+                    raise ValueError(f"Row count mismatch for {loader.table_name}: expected {expected}, loaded {result['rows']}")
+                if shadows is not None:
+                    shadows.record(loader)
+                results[loader.table_name] = result
+                if on_table_done:
+                    on_table_done(loader.table_name, result)
+                print(f"Restored {loader.table_name}: {result['rows']} rows ({result['rows_per_sec']} rows/s)")
+                loader = None
+    except BaseException:
+        raw.rollback()
+        if loader is not None and not loader.shadow and loader.mode != "merge":
+            # 중단된 테이블의 인덱스는 복구해 둠
+            try:
+                with raw.cursor() as cursor:
+                    for _, definition in loader.indexes:
+                        cursor.execute(definition.replace("CREATE INDEX ", "CREATE INDEX IF NOT EXISTS ", 1)
+                                       .replace("CREATE UNIQUE INDEX ", "CREATE UNIQUE INDEX IF NOT EXISTS ", 1))
+                raw.commit()
+            except Exception as e:
+                raw.rollback()
+                print(f"Failed to recreate indexes for {loader.table_name}: {str(e)}")
+        raise
+
+    return {"backup_info": backup_info, "tables": results}
+
+
+def _restore(
+    files: List[Iterable[bytes]],
+    tables: Optional[List[str]],
+    chunk_rows: int,
+    on_progress: Optional[Callable[[str, int], None]],
+    should_cancel: Optional[Callable[[], bool]],
+    check_info: Callable[[int, Dict[str, Any], List[Dict[str, Any]]], None],
+    on_table_done: Optional[Callable[[str, Dict[str, Any]], None]],
+    swap: bool
+) -> Dict[str, Any]:
+    """백업 파일들을 순서대로 적용합니다. swap이면 모두 섀도 테이블에 적재·검증한 뒤 한 번에 교체합니다."""
+    backup_infos: List[Dict[str, Any]] = []
+    results: Dict[str, Dict[str, Any]] = {}
+
+    raw = engine.raw_connection()
+    try:
+        with raw.cursor() as cursor:
+            cursor.execute("SELECT pg_try_advisory_lock(%s)", (RESTORE_LOCK_KEY,))
+            acquired = cursor.fetchone()[0]
+        raw.commit()
+        if not acquired:
+            raise RestoreInProgress("Another restore is already in progress")
+
+        shadows = ShadowRestore(raw) if swap else None
+        try:
+            for position, chunks in enumerate(files):
+                applied = _apply_backup(
+                    raw, chunks, tables, chunk_rows, on_progress, should_cancel,
+                    lambda info, position=position: check_info(position, info, backup_infos),
+                    on_table_done, shadows
+                )
+                backup_infos.append(applied["backup_info"])
+                for table_name, result in applied["tables"].items():
+                    merged = results.setdefault(table_name, {"rows": 0, "seconds": 0.0, "indexes_rebuilt": 0})
+                    merged["rows"] += result["rows"]
+                    merged["seconds"] = round(merged["seconds"] + result["seconds"], 3)
+                    merged["indexes_rebuilt"] += result["indexes_rebuilt"]
+                    merged["rows_per_sec"] = round(merged["rows"] / max(merged["seconds"], 0.001))
+
+            if shadows is not None and shadows.tables:
+                if should_cancel and should_cancel():
+                    raise RestoreCancelled("Restore cancelled")
+                counts = shadows.validate()
+                locked_seconds = shadows.swap()
+                for table_name, count in counts.items():
+                    results[table_name]["validated_rows"] = count
+                print(f"Swapped in {len(counts)} restored tables (locked {locked_seconds:.3f}s)")
+        except BaseException:
+            if shadows is not None:
+                shadows.discard()
+            raise
+        finally:
+            with raw.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_unlock(%s)", (RESTORE_LOCK_KEY,))
+            raw.commit()
+    finally:
+        raw.close()
+
+    return {"backup_info": backup_infos[-1] if backup_infos else {}, "backup_chain": backup_infos, "tables": results}
+
+
+def restore_from_chunks(
+    chunks: Iterable[bytes],
+    tables: Optional[List[str]] = None,
+    chunk_rows: int = RESTORE_CHUNK_ROWS,
+    on_progress: Optional[Callable[[str, int], None]] = None,
+    should_cancel: Optional[Callable[[], bool]] = None,
+    check_info: Optional[Callable[[Dict[str, Any]], None]] = None,
+    on_table_done: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+    swap: bool = RESTORE_SWAP
+) -> Dict[str, Any]:
+    """백업 파일 청크를 읽으면서 테이블마다 바로 적재합니다.
+
+    tables를 주면 해당 테이블만 복원합니다. 알 수 없는 테이블 섹션은 건너뜁니다.
+    replace 섹션은 테이블을 새로 채우고, 증분 백업의 merge 섹션은 기본 키 기준으로 병합합니다.
+    swap이면 섀도 테이블에 적재하고 행 수를 검증한 뒤 한 번에 교체하므로 실패해도 기존 데이터가 남습니다.
+    check_info는 백업 정보를 읽은 직후, 데이터를 건드리기 전에 호출되며 예외로 복원을 막을 수 있습니다.
+    반환값: {"backup_info": ..., "tables": {이름: {"rows", "seconds", "rows_per_sec", ...}}}
+    """
+    def check(position: int, info: Dict[str, Any], previous: List[Dict[str, Any]]) -> None:
+        if check_info:
+            check_info(info)
+
+    result = _restore([chunks], tables, chunk_rows, on_progress, should_cancel, check, on_table_done, swap)
+    return {"backup_info": result["backup_info"], "tables": result["tables"]}
+
+
+def restore_chain(
+    chain: List[Iterable[bytes]],
+    tables: Optional[List[str]] = None,
+    chunk_rows: int = RESTORE_CHUNK_ROWS,
+    on_progress: Optional[Callable[[str, int], None]] = None,
+    should_cancel: Optional[Callable[[], bool]] = None,
+    on_table_done: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+    swap: bool = RESTORE_SWAP
+) -> Dict[str, Any]:
+    """전체 백업과 그 뒤의 증분 백업들을 순서대로 적용합니다.
+
+    chain[0]은 전체 백업, 이후는 바로 앞 백업을 부모로 하는 증분 백업이어야 합니다.
+    파일을 읽으면서 부모 파일명이 맞지 않으면 해당 파일의 데이터를 적용하기 전에 중단합니다.
+    swap이면 체인 전체를 섀도 테이블에 적용한 뒤 마지막에 한 번만 교체합니다.
+    """
+    def check(position: int, info: Dict[str, Any], previous: List[Dict[str, Any]]) -> None:
+        mode = info.get("mode", "full")
+        if position == 0 and mode != "full":
+            raise ValueError("The first backup in a chain must be a full backup")
+        if position > 0:
+            if mode != "incremental":
+                raise ValueError("Only incremental backups can follow the first backup in a chain")
+            parent = previous[-1].get("filename")
+            if parent and info.get("parent_filename") != parent:
+                raise ValueError(f"Backup chain is broken: expected parent {parent}, got {info.get('parent_filename')}")
+
+    return _restore(chain, tables, chunk_rows, on_progress, should_cancel, check, on_table_done, swap)
@@ -0,0 +1,86 @@
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# 테이블 통계를 메모리에 보관하는 시간 (초)
+TABLE_STATS_CACHE_SECONDS = int(os.getenv("TABLE_STATS_CACHE_SECONDS", "60"))
+
+# 시스템 정보/데이터베이스 상태 화면에 보여주는 테이블
+SYSTEM_TABLES = (
+    'users', 'ai_info', 'user_progress', 'activity_logs',
+    'backup_history', 'quiz', 'prompt', 'base_content', 'term'
+)
+
+_cache: Dict[Tuple[Tuple[str, ...], bool], Tuple[float, Dict[str, Dict[str, Any]]]] = {}
+_cache_lock = threading.Lock()
+
+
+def _collect(db: Session, tables: Tuple[str, ...], exact: bool) -> Dict[str, Dict[str, Any]]:
+    """테이블(파티션 포함)별 행 수와 디스크 크기를 조회합니다. 존재하지 않는 테이블은 빠집니다.
+
+    행 수는 플래너 통계(pg_class.reltuples)를 쓰고, 한 번도 ANALYZE 되지 않은 파티션은
+    통계 수집기가 유지하는 n_live_tup으로 대신합니다. exact면 COUNT(*)로 셉니다.
+    """
+    rows = db.execute(text("""
+        SELECT t.name,
+               COALESCE(SUM(CASE WHEN p.isleaf THEN
+                   CASE WHEN c.reltuples >= 0 THEN c.reltuples ELSE COALESCE(s.n_live_tup, 0) END
+               END), 0)::bigint AS estimated_rows,
+               COALESCE(SUM(pg_table_size(p.relid)), 0)::bigint AS table_bytes,
+               COALESCE(SUM(pg_indexes_size(p.relid)), 0)::bigint AS index_bytes
+        FROM unnest(CAST(:tables AS text[])) AS t(name)
+        JOIN LATERAL pg_partition_tree(to_regclass(t.name)) p ON true
+        JOIN pg_class c ON c.oid = p.relid
+        LEFT JOIN pg_stat_user_tables s ON s.relid = p.relid
+        GROUP BY t.name
+    """), {"tables": list(tables)}).all()
+
+    stats: Dict[str, Dict[str, Any]] = {}
+    for name, estimated_rows, table_bytes, index_bytes in rows:
+        stats[name] = {
+            "rows": int(estimated_rows),
+            "exact": False,
+            "table_bytes": int(table_bytes),
+            "index_bytes": int(index_bytes),
+            "total_bytes": int(table_bytes) + int(index_bytes)
+        }
+
+    if exact:
+        for name in stats:
+            # 테이블 이름은 위 조회에서 실제로 존재함이 확인된 SYSTEM_TABLES 값만 사용
+            stats[name]["rows"] = int(db.execute(text(f"SELECT COUNT(*) FROM {name}")).scalar() or 0)
+            stats[name]["exact"] = True
+    return stats
+
+
+def get_table_stats(db: Session, tables: Iterable[str] = SYSTEM_TABLES, exact: bool = False) -> Dict[str, Dict[str, Any]]:
+    """테이블 통계: {테이블: {"rows", "exact", "table_bytes", "index_bytes", "total_bytes"}}
+
+    관리자 화면을 열 때마다 호출되므로 TABLE_STATS_CACHE_SECONDS 동안 캐시합니다.
+    exact=True 결과는 추정치와 따로 캐시합니다.
+    """
+    tables = tuple(tables)
+    unknown = [table for table in tables if table not in SYSTEM_TABLES]
+    if unknown:
+        raise ValueError(f"Unknown tables: {', '.join(unknown)}")
+
+    key = (tables, exact)
+    now = time.time()
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry and now - entry[0] < TABLE_STATS_CACHE_SECONDS:
+            return entry[1]
+    stats = _collect(db, tables, exact)
+    with _cache_lock:
+        _cache[key] = (now, stats)
+    return stats
+
+
+def invalidate_table_stats() -> None:
+    """대량 삭제/복원 후 캐시된 통계를 버립니다."""
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+activity_logs 이벤트 코드 백필 스크립트
+event_code가 비어 있는 과거 로그의 action/details 문자열을 파싱해 event_code와 attributes를 채웁니다.
+
+- 배치마다 커밋하므로 중단 후 다시 실행하면 남은 행부터 이어서 처리합니다.
+- 알 수 없는 action은 'other' 코드로 채워 다시 처리하지 않습니다.
+
+사용법: python backfill_event_codes.py [--batch-size N]
+"""
+
+import json
+import os
+import sys
+import time
+
+from sqlalchemy import text
+
+# 현재 디렉토리를 추가하여 app 모듈을 찾을 수 있도록 함
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_BATCH_SIZE = 5000
+
+def backfill_event_codes(batch_size: int = DEFAULT_BATCH_SIZE):
+    """event_code가 NULL인 로그를 배치 단위로 채웁니다. 처리한 행 수를 반환합니다."""
+    from app.database import engine
+    from app.utils.event_codes import parse_event
+
+    total = 0
+    started = time.time()
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(text("""
+                SELECT id, created_at, action, details FROM activity_logs
+                WHERE event_code IS NULL
+                ORDER BY created_at, id
+                LIMIT :limit
+            """), {"limit": batch_size}).fetchall()
+            if not rows:
+                break
+
+            params = []
+            for log_id, created_at, action, details in rows:
+                code, attributes = parse_event(action, details)
+                params.append({
+                    "id": log_id,
+                    "created_at": created_at,
+                    "event_code": code.value,
+                    "attributes": json.dumps(attributes, ensure_ascii=False) if attributes else None
+                })
+
+            # created_at 조건으로 해당 파티션만 갱신
+            # (created_at이 NULL인 행은 파티션 전환 전의 단일 테이블에만 있을 수 있음. 파티션 테이블에서는 NOT NULL)
+            dated = [p for p in params if p["created_at"] is not None]
+            undated = [p for p in params if p["created_at"] is None]
+            if dated:
+                conn.execute(text("""
+                    UPDATE activity_logs
+                    SET event_code = :event_code, attributes = CAST(:attributes AS JSONB)
+                    WHERE id = :id AND created_at = :created_at
+                """), dated)
+            if undated:
+                conn.execute(text("""
+                    UPDATE activity_logs
+                    SET event_code = :event_code, attributes = CAST(:attributes AS JSONB)
+                    WHERE id = :id AND created_at IS NULL
+                """), undated)
+
+        total += len(rows)
+        print(f"   - {total}개 처리 ({total / max(time.time() - started, 0.001):.0f} rows/s)")
+
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE activity_logs"))
+    print(f"✅ 이벤트 코드 백필 완료: 총 {total}개")
+    return total
+
+if __name__ == "__main__":
+    batch_size = DEFAULT_BATCH_SIZE
+    if "--batch-size" in sys.argv:
+        batch_size = int(sys.argv[sys.argv.index("--batch-size") + 1])
+    try:
+        backfill_event_codes(batch_size)
+    except Exception as e:
+        print(f"❌ 이벤트 코드 백필 실패: {e}")
+        sys.exit(1)
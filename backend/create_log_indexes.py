@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+activity_logs 조회용 인덱스 생성 스크립트
+운영 중에도 테이블 쓰기를 막지 않도록 CREATE INDEX CONCURRENTLY로 생성합니다.
+
+- (created_at, log_type, log_level): 기간/타입/레벨 필터 + 최신순 정렬
+- (session_id, created_at): 세션별 활동 조회
+- pg_trgm GIN (username, action, details): ILIKE '%...%' 부분 검색
+- (event_code, created_at): 이벤트 코드별 집계
+- GIN (attributes jsonb_path_ops): 속성 포함 검색 (attributes @> '{...}')
+
+파티션 테이블은 CONCURRENTLY를 직접 지원하지 않으므로 부모에 ON ONLY 인덱스를 만든 뒤
+파티션마다 CONCURRENTLY로 만들고 ATTACH 합니다.
+
+사용법: python create_log_indexes.py [--explain]
+"""
+
+import json
+import os
+import sys
+
+from sqlalchemy import text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+# 현재 디렉토리를 추가하여 app 모듈을 찾을 수 있도록 함
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# (인덱스 이름, USING 절 포함 컬럼 정의)
+LOG_INDEXES = [
+    ("ix_activity_logs_created_type_level", "(created_at, log_type, log_level)"),
+    ("ix_activity_logs_session_created", "(session_id, created_at)"),
+    ("ix_activity_logs_username_trgm", "USING gin (username gin_trgm_ops)"),
+    ("ix_activity_logs_action_trgm", "USING gin (action gin_trgm_ops)"),
+    ("ix_activity_logs_details_trgm", "USING gin (details gin_trgm_ops)"),
+    ("ix_activity_logs_event_code_created", "(event_code, created_at)"),
+    ("ix_activity_logs_attributes", "USING gin (attributes jsonb_path_ops)"),
+]
+
+# 인덱스 사용 여부를 확인할 대표 쿼리 (관리자 로그 목록과 같은 형태)
+EXPLAIN_QUERIES = {
+    "ix_activity_logs_created_type_level": """
+        SELECT * FROM activity_logs
+        WHERE created_at >= now() - interval '7 days' AND log_type = 'user' AND log_level = 'error'
+        ORDER BY created_at DESC, id DESC LIMIT 100
+    """,
+    "ix_activity_logs_session_created": """
+        SELECT * FROM activity_logs WHERE session_id = 'session' ORDER BY created_at DESC LIMIT 100
+    """,
+    "ix_activity_logs_username_trgm": "SELECT * FROM activity_logs WHERE username ILIKE '%admin%'",
+    "ix_activity_logs_action_trgm": "SELECT * FROM activity_logs WHERE action ILIKE '%퀴즈%'",
+    "ix_activity_logs_details_trgm": "SELECT * FROM activity_logs WHERE details ILIKE '%용어%'",
+    "ix_activity_logs_event_code_created": """
+        SELECT count(*) FROM activity_logs
+        WHERE event_code = 'quiz.completed' AND created_at >= now() - interval '7 days'
+    """,
+    "ix_activity_logs_attributes": """SELECT * FROM activity_logs WHERE attributes @> '{"date": "2025-01-01"}'""",
+}
+
+def _autocommit_engine():
+    from app.database import engine
+    # CREATE INDEX CONCURRENTLY는 트랜잭션 밖에서 실행해야 함
+    return engine.execution_options(isolation_level="AUTOCOMMIT")
+
+def _partitions(conn):
+    return [row[0] for row in conn.execute(text("""
+        SELECT c.relname FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass('activity_logs')
+        ORDER BY c.relname
+    """))]
+
+def create_log_indexes():
+    """activity_logs 인덱스를 온라인으로 생성합니다. 이미 있는 인덱스는 건너뜁니다."""
+    engine = _autocommit_engine()
+    with engine.connect() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        partitioned = conn.execute(text(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('activity_logs'))"
+        )).scalar()
+
+        for name, definition in LOG_INDEXES:
+            if not partitioned:
+                print(f"🔧 {name} 생성 중...")
+                conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON activity_logs {definition}"))
+                continue
+
+            print(f"🔧 {name} 생성 중 (파티션별)...")
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON ONLY activity_logs {definition}"))
+            for partition in _partitions(conn):
+                # 이미 부모 인덱스에 연결된 파티션 인덱스가 있으면 건너뜀 (create_all로 생성된 경우 등)
+                attached = conn.execute(text("""
+                    SELECT EXISTS (
+                        SELECT 1 FROM pg_inherits i
+                        JOIN pg_index x ON x.indexrelid = i.inhrelid
+                        WHERE i.inhparent = to_regclass(:parent) AND x.indrelid = to_regclass(:partition)
+                    )
+                """), {"parent": name, "partition": partition}).scalar()
+                if attached:
+                    continue
+                child = f"{partition}_{name.replace('ix_activity_logs_', '')}"
+                conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {child} ON {partition} {definition}"))
+                conn.execute(text(f"ALTER INDEX {name} ATTACH PARTITION {child}"))
+
+        conn.execute(text("ANALYZE activity_logs"))
+    print("✅ activity_logs 인덱스 생성 완료")
+
+def index_names(conn, name):
+    """인덱스 이름과, 파티션 테이블이면 그 인덱스에 연결된 파티션 인덱스 이름들"""
+    children = conn.execute(text("""
+        SELECT c.relname FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(:name)
+    """), {"name": name}).scalars().all()
+    return {name, *children}
+
+class Explain(Executable, ClauseElement):
+    """SQLAlchemy 문장을 EXPLAIN (FORMAT JSON)으로 감쌉니다. 바인드 파라미터는 원래 문장과 같은 방식으로 전달됩니다."""
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+def plan_index_names(conn, query):
+    """EXPLAIN (FORMAT JSON) 결과에서 실행 계획이 사용하는 인덱스 이름들을 모읍니다.
+
+    query는 SQL 문자열이나 SQLAlchemy 문장(ORM 쿼리의 .statement 등)입니다.
+    """
+    statement = text(f"EXPLAIN (FORMAT JSON) {query}") if isinstance(query, str) else Explain(query)
+    plan = conn.execute(statement).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    names = set()
+    nodes = [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if "Index Name" in node:
+            names.add(node["Index Name"])
+        nodes.extend(node.get("Plans", []))
+    return names
+
+def explain_log_queries():
+    """대표 조회 쿼리의 실행 계획에 해당 인덱스가 쓰이는지 확인합니다.
+
+    플래너 설정은 바꾸지 않으므로 결과는 현재 데이터 분포에서 플래너가 실제로 고르는 계획입니다.
+    (행이 적은 테이블에서는 순차 스캔이 더 싸서 인덱스를 쓰지 않을 수 있음)
+    """
+    from app.database import engine
+    all_used = True
+    with engine.connect() as conn:
+        for name, query in EXPLAIN_QUERIES.items():
+            used_indexes = plan_index_names(conn, query)
+            used = bool(used_indexes & index_names(conn, name))
+            all_used = all_used and used
+            print(f"{'✅' if used else '❌'} {name}: {'사용됨' if used else '사용되지 않음'}")
+            if not used:
+                print(f"   계획에 사용된 인덱스: {', '.join(sorted(used_indexes)) or '없음'}")
+    return all_used
+
+if __name__ == "__main__":
+    try:
+        create_log_indexes()
+        if "--explain" in sys.argv:
+            sys.exit(0 if explain_log_queries() else 1)
+    except Exception as e:
+        print(f"❌ 인덱스 생성 실패: {e}")
+        sys.exit(1)
@@ -79,6 +79,12 @@ def init_database():
             
             # 변경사항 커밋
             db.commit()
+            
+            # 리더보드 값별 세션 수가 비어 있으면 기존 리더보드로 채움 (순위 계산용)
+            from app.utils.leaderboard import ensure_value_counts
+            if ensure_value_counts(db):
+                print("✅ 리더보드 순위 집계 생성 완료")
+            
             print("✅ 데이터베이스 초기화 완료")
             
             # 테이블 현황 출력
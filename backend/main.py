@@ -4,7 +4,11 @@ from fastapi.responses import JSONResponse
 from datetime import datetime
 import os
 
-from app.api import ai_info, quiz, prompt, base_content, term, auth, logs, system, user_progress
+from app.api import ai_info, quiz, prompt, base_content, term, auth, logs, system, leaderboard, user_progress
+from app.utils.log_writer import activity_log_writer
+from app.utils.log_partitions import partition_maintenance
+from app.utils.backup_jobs import backup_jobs
+from app.utils.backup_scheduler import backup_scheduler
 
 app = FastAPI()
 
@@ -67,6 +71,41 @@ async def log_requests(request, call_next):
     
     return response
 
+@app.on_event("startup")
+def start_log_writer():
+    """활동 로그 백그라운드 기록기 시작"""
+    activity_log_writer.start()
+
+@app.on_event("startup")
+def start_partition_maintenance():
+    """activity_logs 월별 파티션 생성/보존 정책 주기 실행 시작"""
+    partition_maintenance.start()
+
+@app.on_event("startup")
+def start_backup_scheduler():
+    """BACKUP_SCHEDULE(KST cron)에 따른 자동 백업과 보존 정책 실행 시작"""
+    backup_scheduler.start()
+
+@app.on_event("shutdown")
+def stop_backup_scheduler():
+    """자동 백업 스케줄러 종료"""
+    backup_scheduler.stop()
+
+@app.on_event("shutdown")
+def stop_partition_maintenance():
+    """파티션 유지보수 스레드 종료"""
+    partition_maintenance.stop()
+
+@app.on_event("shutdown")
+def stop_backup_jobs():
+    """대기 중인 백업/복원 작업 정리 (실행 중이던 작업은 진행 기록이 끊겨 실패로 표시됨)"""
+    backup_jobs.shutdown()
+
+@app.on_event("shutdown")
+def stop_log_writer():
+    """종료 전 큐에 남은 활동 로그를 모두 기록"""
+    activity_log_writer.stop()
+
 # 전역 예외 처리기
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -86,6 +125,7 @@ async def not_found_handler(request: Request, exc: HTTPException):
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(logs.router, prefix="/api/logs", tags=["Activity Logs"])
 app.include_router(system.router, prefix="/api/system", tags=["System Management"])
+app.include_router(leaderboard.router, prefix="/api/leaderboard", tags=["Leaderboard"])
 app.include_router(user_progress.router, prefix="/api/user-progress", tags=["User Progress"])
 app.include_router(ai_info.router, prefix="/api/ai-info")
 app.include_router(quiz.router, prefix="/api/quiz")
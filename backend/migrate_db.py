@@ -48,6 +48,46 @@ def migrate_database():
                 ADD COLUMN IF NOT EXISTS created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
             """))
             
+            # activity_logs 테이블에 event_count 컬럼 추가 (분 단위 집계 로그)
+            conn.execute(text("""
+                ALTER TABLE activity_logs 
+                ADD COLUMN IF NOT EXISTS event_count INTEGER DEFAULT 1
+            """))
+            
+            # activity_logs 테이블에 이벤트 코드/속성 컬럼 추가 (과거 로그는 backfill_event_codes.py로 채움)
+            conn.execute(text("""
+                ALTER TABLE activity_logs 
+                ADD COLUMN IF NOT EXISTS event_code VARCHAR(64),
+                ADD COLUMN IF NOT EXISTS attributes JSONB
+            """))
+            
+            # user_progress 테이블에 updated_at 컬럼 추가 (증분 백업 워터마크)
+            conn.execute(text("""
+                ALTER TABLE user_progress 
+                ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+            """))
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_user_progress_updated_at ON user_progress (updated_at)
+            """))
+            
+            # backup_history 테이블에 증분 백업 체인 컬럼 추가
+            conn.execute(text("""
+                ALTER TABLE backup_history 
+                ADD COLUMN IF NOT EXISTS backup_mode VARCHAR DEFAULT 'full',
+                ADD COLUMN IF NOT EXISTS parent_id INTEGER,
+                ADD COLUMN IF NOT EXISTS watermark TEXT
+            """))
+            
+            # backup_history 테이블에 서버 저장소 컬럼 추가 (2GB 넘는 백업을 위해 file_size는 BIGINT로)
+            conn.execute(text("""
+                ALTER TABLE backup_history 
+                ALTER COLUMN file_size TYPE BIGINT,
+                ADD COLUMN IF NOT EXISTS raw_size BIGINT,
+                ADD COLUMN IF NOT EXISTS storage_path VARCHAR,
+                ADD COLUMN IF NOT EXISTS compression VARCHAR,
+                ADD COLUMN IF NOT EXISTS checksum VARCHAR(64)
+            """))
+            
             conn.commit()
             print("✅ 데이터베이스 마이그레이션이 성공적으로 완료되었습니다!")
             
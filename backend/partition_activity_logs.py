@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+activity_logs 월별 파티션 마이그레이션 스크립트
+기존 단일 테이블을 created_at 기준 RANGE 파티션 테이블로 전환합니다.
+
+1. 기존 테이블을 activity_logs_legacy로 이름 변경 (짧은 잠금)
+2. 파티션 테이블 activity_logs와 월별 파티션 생성 → 새 로그는 바로 파티션 테이블로 기록
+3. 기존 행을 월 단위로 나누어 복사 (월마다 커밋)
+4. --drop-legacy 옵션을 주면 복사 후 기존 테이블 삭제
+
+파티션 테이블의 created_at은 기본 키에 포함되어 NOT NULL이므로, 기존 테이블에서 created_at이 NULL인 행은
+UNDATED_CREATED_AT(1970-01-01 KST)으로 바꿔 기본 파티션에 복사합니다.
+
+사용법: python partition_activity_logs.py [--drop-legacy]
+"""
+
+import os
+import sys
+
+from sqlalchemy import text
+
+# 현재 디렉토리를 추가하여 app 모듈을 찾을 수 있도록 함
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+LEGACY_TABLE = "activity_logs_legacy"
+# created_at이 NULL인 기존 행에 넣는 고정 시각 (어느 월 파티션에도 속하지 않아 기본 파티션에 들어감)
+UNDATED_CREATED_AT = "1970-01-01 00:00:00+09"
+
+def copy_columns(engine):
+    """복사할 컬럼: 모델의 컬럼 중 기존 테이블에도 있는 것 (migrate_db.py 전의 테이블에는 없는 컬럼이 있을 수 있음)"""
+    from app.models import ActivityLog
+
+    with engine.connect() as conn:
+        legacy_columns = set(conn.execute(text("""
+            SELECT attname FROM pg_attribute
+            WHERE attrelid = to_regclass(:table) AND attnum > 0 AND NOT attisdropped
+        """), {"table": LEGACY_TABLE}).scalars().all())
+    return ", ".join(column.name for column in ActivityLog.__table__.columns if column.name in legacy_columns)
+
+def swap_to_partitioned_table(engine):
+    """기존 테이블을 legacy로 옮기고 파티션 테이블을 만듭니다. 복사할 월 범위를 반환합니다."""
+    from app.models import ActivityLog
+    from app.utils.kst_utils import get_kst_now
+    from app.utils.log_partitions import (
+        month_start, add_months, create_month_partition, ensure_default_partition,
+        LOG_PARTITION_MONTHS_AHEAD
+    )
+    from sqlalchemy.orm import Session
+
+    with Session(engine) as db:
+        db.execute(text("LOCK TABLE activity_logs IN ACCESS EXCLUSIVE MODE"))
+
+        # 기존 테이블과 이름이 겹치는 객체들 이름 변경
+        db.execute(text(f"ALTER TABLE activity_logs RENAME TO {LEGACY_TABLE}"))
+        db.execute(text(f"ALTER TABLE {LEGACY_TABLE} RENAME CONSTRAINT activity_logs_pkey TO {LEGACY_TABLE}_pkey"))
+        # create_log_indexes.py 등으로 만든 ix_activity_logs_* 인덱스도 모델 인덱스와 이름이 겹치므로 함께 이름 변경
+        legacy_indexes = db.execute(text("""
+            SELECT i.relname FROM pg_index x
+            JOIN pg_class i ON i.oid = x.indexrelid
+            WHERE x.indrelid = to_regclass(:table) AND i.relname LIKE 'ix\\_activity\\_logs\\_%'
+        """), {"table": LEGACY_TABLE}).scalars().all()
+        for name in legacy_indexes:
+            legacy_name = name.replace("ix_activity_logs_", f"ix_{LEGACY_TABLE}_", 1)[:63]
+            db.execute(text(f"ALTER INDEX {name} RENAME TO {legacy_name}"))
+        db.execute(text(f"ALTER SEQUENCE IF EXISTS activity_logs_id_seq RENAME TO {LEGACY_TABLE}_id_seq"))
+
+        bounds = db.execute(text(f"SELECT MIN(created_at), MAX(id) FROM {LEGACY_TABLE}")).fetchone()
+        min_created_at, max_id = bounds
+
+        # 모델 정의대로 파티션 테이블 생성
+        ActivityLog.__table__.create(bind=db.connection())
+        if max_id:
+            db.execute(text("SELECT setval('activity_logs_id_seq', :max_id)"), {"max_id": max_id})
+
+        now = get_kst_now()
+        current = month_start(now.year, now.month)
+        if min_created_at:
+            first = month_start(min_created_at.astimezone(current.tzinfo).year, min_created_at.astimezone(current.tzinfo).month)
+        else:
+            first = current
+
+        months = []
+        start = first
+        last = add_months(current, LOG_PARTITION_MONTHS_AHEAD)
+        while start <= last:
+            create_month_partition(db, start)
+            months.append(start)
+            start = add_months(start, 1)
+        ensure_default_partition(db)
+
+        db.commit()
+        print(f"✅ 파티션 테이블 생성 완료 ({len(months)}개 월 파티션)")
+        return [m for m in months if m <= current]
+
+def copy_legacy_rows(engine, months):
+    """기존 행을 월 단위로 복사합니다. 월마다 커밋하므로 중단 후 다시 실행해도 됩니다."""
+    from app.utils.log_partitions import add_months
+
+    columns = copy_columns(engine)
+    total = 0
+    for start in months:
+        end = add_months(start, 1)
+        with engine.begin() as conn:
+            result = conn.execute(text(f"""
+                INSERT INTO activity_logs ({columns})
+                SELECT {columns} FROM {LEGACY_TABLE} l
+                WHERE l.created_at >= :start AND l.created_at < :end
+                  AND NOT EXISTS (
+                      SELECT 1 FROM activity_logs a
+                      WHERE a.id = l.id AND a.created_at >= :start AND a.created_at < :end
+                  )
+            """), {"start": start, "end": end})
+            total += result.rowcount
+            print(f"   - {start.strftime('%Y-%m')}: {result.rowcount}개 복사")
+
+    # created_at이 NULL인 행은 고정 시각으로 바꿔 기본 파티션으로 (created_at은 NOT NULL)
+    undated_columns = ", ".join(
+        "CAST(:undated AS TIMESTAMPTZ)" if column == "created_at" else f"l.{column}"
+        for column in columns.split(", ")
+    )
+    with engine.begin() as conn:
+        result = conn.execute(text(f"""
+            INSERT INTO activity_logs ({columns})
+            SELECT {undated_columns} FROM {LEGACY_TABLE} l
+            WHERE l.created_at IS NULL
+              AND NOT EXISTS (
+                  SELECT 1 FROM activity_logs a
+                  WHERE a.id = l.id AND a.created_at = CAST(:undated AS TIMESTAMPTZ)
+              )
+        """), {"undated": UNDATED_CREATED_AT})
+        total += result.rowcount
+
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE activity_logs"))
+
+    print(f"✅ 기존 로그 복사 완료: 총 {total}개")
+    return total
+
+def migrate_to_partitioned(drop_legacy: bool = False):
+    """activity_logs를 파티션 테이블로 전환합니다. 중단된 경우 다시 실행하면 이어서 복사합니다."""
+    from sqlalchemy.orm import Session
+    from app.database import engine
+    from app.utils.kst_utils import get_kst_now
+    from app.utils.log_partitions import is_partitioned, month_start, add_months
+
+    with Session(engine) as db:
+        if is_partitioned(db):
+            print("ℹ️ activity_logs는 이미 파티션 테이블입니다.")
+            legacy_exists = db.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": LEGACY_TABLE}).scalar()
+            if not legacy_exists:
+                return True
+            # 이전 실행이 복사 중 중단된 경우 이어서 복사
+            min_created_at = db.execute(text(f"SELECT MIN(created_at) FROM {LEGACY_TABLE}")).scalar()
+            now = get_kst_now()
+            current = month_start(now.year, now.month)
+            months = []
+            if min_created_at:
+                start = month_start(min_created_at.astimezone(current.tzinfo).year, min_created_at.astimezone(current.tzinfo).month)
+                while start <= current:
+                    months.append(start)
+                    start = add_months(start, 1)
+        else:
+            months = None
+
+    try:
+        if months is None:
+            print("🏗️ activity_logs 파티션 테이블로 전환 중...")
+            months = swap_to_partitioned_table(engine)
+
+        print("📦 기존 로그 복사 중...")
+        copy_legacy_rows(engine, months)
+
+        if drop_legacy:
+            with engine.begin() as conn:
+                conn.execute(text(f"DROP TABLE {LEGACY_TABLE}"))
+            print(f"🗑️ {LEGACY_TABLE} 삭제 완료")
+        else:
+            print(f"ℹ️ 확인 후 --drop-legacy 옵션으로 {LEGACY_TABLE}을 삭제하세요.")
+        return True
+    except Exception as e:
+        print(f"❌ 파티션 마이그레이션 실패: {e}")
+        return False
+
+if __name__ == "__main__":
+    success = migrate_to_partitioned(drop_legacy="--drop-legacy" in sys.argv)
+    sys.exit(0 if success else 1)
@@ -0,0 +1,149 @@
+"""
+관리자 로그 목록 쿼리가 activity_logs 인덱스를 실제로 쓰는지 EXPLAIN으로 확인하는 테스트
+
+get_logs와 같은 코드(apply_log_filters + log_page_query)로 만든 쿼리를 PostgreSQL 방언으로 컴파일해
+모델로 만든 월별 파티션 테이블에 대해 EXPLAIN 합니다. 플래너 설정(enable_seqscan 등)은 기본값 그대로 둡니다.
+PostgreSQL이 필요하므로 TEST_DATABASE_URL이 없으면 건너뜁니다. 테스트용 스키마는 트랜잭션과 함께 롤백됩니다.
+(public 스키마에 같은 이름의 파티션이 있으면 가려지므로 빈 테스트용 데이터베이스를 쓰세요)
+
+사용법: TEST_DATABASE_URL=postgresql://... python -m pytest tests/test_log_indexes.py
+"""
+
+import os
+import sys
+from datetime import timedelta
+
+import pytest
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+if not TEST_DATABASE_URL:
+    pytest.skip("TEST_DATABASE_URL is not set", allow_module_level=True)
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("fastapi")
+from sqlalchemy import create_engine, text  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# app.database는 import 시점에 DATABASE_URL을 요구함
+os.environ.setdefault("DATABASE_URL", TEST_DATABASE_URL)
+
+from create_log_indexes import LOG_INDEXES, Explain, index_names, plan_index_names  # noqa: E402
+from app.api.logs import apply_log_filters, log_page_query  # noqa: E402
+from app.models import ActivityLog  # noqa: E402
+from app.utils.event_codes import EventCode  # noqa: E402
+from app.utils.kst_utils import get_kst_now  # noqa: E402
+from app.utils.log_partitions import add_months, create_month_partition, ensure_default_partition, month_start  # noqa: E402
+
+SEED_ROWS = 200000
+PAGE_SIZE = 100
+TRIGRAM_INDEXES = ("ix_activity_logs_username_trgm", "ix_activity_logs_action_trgm", "ix_activity_logs_details_trgm")
+
+
+@pytest.fixture(scope="module")
+def conn():
+    engine = create_engine(TEST_DATABASE_URL)
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        trigram = connection.execute(text(
+            "SELECT EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm')"
+        )).scalar()
+        if trigram:
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        connection.execute(text("CREATE SCHEMA log_index_test"))
+        connection.execute(text("SET LOCAL search_path TO log_index_test, public"))
+
+        # 운영과 같은 스키마: 모델의 파티션 테이블과 인덱스, 최근 1년 + 앞으로 석 달의 월 파티션, 기본 파티션
+        ActivityLog.__table__.create(connection)
+        now = get_kst_now()
+        this_month = month_start(now.year, now.month)
+        for offset in range(-12, 4):
+            create_month_partition(connection, add_months(this_month, offset))
+        ensure_default_partition(connection)
+        for name, definition in LOG_INDEXES:
+            if trigram or name not in TRIGRAM_INDEXES:
+                connection.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON activity_logs {definition}"))
+
+        # 1년에 걸친 로그. 필터가 찾는 값(admin 사용자, 퀴즈, 용어, 오류 로그 등)은 드물게 분포
+        connection.execute(text("""
+            INSERT INTO activity_logs
+                (username, action, details, log_type, log_level, session_id, event_code, attributes, created_at)
+            SELECT
+                CASE WHEN i % 997 = 0 THEN 'admin' ELSE 'user' || (i % 5000) END,
+                CASE WHEN i % 100 = 0 THEN '퀴즈 완료' WHEN i % 2 = 0 THEN '로그인' ELSE 'AI 정보 학습' END,
+                CASE WHEN i % 200 = 0 THEN '용어를 학습했습니다' ELSE 'page view ' || (i % 1000) END,
+                (ARRAY['user', 'system', 'security'])[1 + i % 3],
+                CASE WHEN i % 50 = 0 THEN 'error' ELSE (ARRAY['info', 'success', 'warning'])[1 + i % 3] END,
+                'session-' || (i % 20000),
+                CASE WHEN i % 100 = 0 THEN 'quiz.completed' ELSE 'user.login' END,
+                jsonb_build_object('date', to_char(date '2025-01-01' + (i % 365), 'YYYY-MM-DD')),
+                now() - (i % 365) * interval '1 day' - (i % 86400) * interval '1 second'
+            FROM generate_series(1, :rows) AS i
+        """), {"rows": SEED_ROWS})
+        connection.execute(text("ANALYZE activity_logs"))
+        connection.info["trigram"] = trigram
+        try:
+            yield connection
+        finally:
+            transaction.rollback()
+    engine.dispose()
+
+
+def _listing_statement(conn, **filters):
+    """get_logs가 만드는 첫 페이지 쿼리"""
+    db = Session(bind=conn)
+    query = apply_log_filters(db.query(ActivityLog), **filters)
+    return log_page_query(query, PAGE_SIZE).statement
+
+
+def _week_ago():
+    return (get_kst_now() - timedelta(days=7)).strftime('%Y-%m-%d')
+
+
+LISTING_CASES = [
+    ("ix_activity_logs_created_type_level", lambda: dict(log_type='user', log_level='error', start_date=_week_ago())),
+    ("ix_activity_logs_event_code_created", lambda: dict(event_code=EventCode.QUIZ_COMPLETED, start_date=_week_ago())),
+    ("ix_activity_logs_username_trgm", lambda: dict(username='admin')),
+    ("ix_activity_logs_action_trgm", lambda: dict(action='퀴즈')),
+    ("ix_activity_logs_details_trgm", lambda: dict(q='용어')),
+]
+
+
+def _trigram_supported(conn, value):
+    """DB 로케일에 따라 한글 등은 트라이그램이 만들어지지 않아 trgm 인덱스를 쓸 수 없음"""
+    return bool(conn.execute(text("SELECT show_trgm(:value)"), {"value": value}).scalar())
+
+
+@pytest.mark.parametrize("name,filters", LISTING_CASES, ids=[case[0] for case in LISTING_CASES])
+def test_listing_query_uses_index(conn, name, filters):
+    filters = filters()
+    if name in TRIGRAM_INDEXES:
+        if not conn.info["trigram"]:
+            pytest.skip("pg_trgm extension is not available")
+        pattern = filters.get('username') or filters.get('action') or filters.get('q')
+        if not _trigram_supported(conn, pattern):
+            pytest.skip("database locale does not produce trigrams for Korean text")
+
+    used = plan_index_names(conn, _listing_statement(conn, **filters))
+    # 파티션 테이블에서는 각 파티션에 연결된 인덱스가 계획에 나옴
+    assert used & index_names(conn, name), f"{name} not used by the planner; plan used: {sorted(used) or 'no index'}"
+
+
+def test_listing_query_prunes_partitions(conn):
+    today = get_kst_now().strftime('%Y-%m-%d')
+    plan = conn.execute(Explain(_listing_statement(conn, start_date=_week_ago(), end_date=today))).scalar()
+    relations = set()
+    nodes = [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if "Relation Name" in node:
+            relations.add(node["Relation Name"])
+        nodes.extend(node.get("Plans", []))
+    # 최근 1주 조회는 최대 두 달치 월 파티션만 읽어야 함 (기본 파티션과 미래 파티션 제외)
+    assert 0 < len(relations) <= 2, f"unexpected partitions in plan: {sorted(relations)}"
+
+
+def test_planner_settings_are_defaults(conn):
+    # 인덱스 사용을 강제하는 설정 없이 검사하고 있는지 확인
+    assert conn.execute(text("SHOW enable_seqscan")).scalar() == "on"
+    assert conn.execute(text("SHOW enable_bitmapscan")).scalar() == "on"
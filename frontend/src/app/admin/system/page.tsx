@@ -159,8 +159,8 @@ export default function SystemManagementPage() {
     const file = event.target.files?.[0]
     if (!file) return
 
-    if (!file.name.endsWith('.json')) {
-      alert('JSON 파일만 업로드할 수 있습니다.')
+    if (!['.json', '.ndjson', '.ndjson.gz', '.gz', '.ndjson.zst', '.zst'].some(ext => file.name.endsWith(ext))) {
+      alert('백업 파일(.json, .ndjson, .ndjson.gz, .ndjson.zst)만 업로드할 수 있습니다.')
       return
     }
 
@@ -296,7 +296,7 @@ export default function SystemManagementPage() {
                   {isRestoring ? '복원 중...' : '백업 파일 선택'}
                   <input
                     type="file"
-                    accept=".json"
+                    accept=".json,.ndjson,.gz,.zst"
                     onChange={handleFileUpload}
                     className="hidden"
                     disabled={isRestoring}
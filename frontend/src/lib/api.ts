@@ -129,6 +129,8 @@ export const logsAPI = {
     action?: string;
     start_date?: string;
     end_date?: string;
+    cursor?: string;
+    total?: 'estimate' | 'exact' | 'none';
   }) => {
     const queryParams = new URLSearchParams()
     if (params?.skip) queryParams.append('skip', params.skip.toString())
@@ -139,6 +141,8 @@ export const logsAPI = {
     if (params?.action) queryParams.append('action', params.action)
     if (params?.start_date) queryParams.append('start_date', params.start_date)
     if (params?.end_date) queryParams.append('end_date', params.end_date)
+    if (params?.cursor) queryParams.append('cursor', params.cursor)
+    if (params?.total) queryParams.append('total', params.total)
 
     const response = await api.get(`/api/logs?${queryParams.toString()}`)
     return response.data
@@ -163,6 +167,12 @@ export const logsAPI = {
     return response.data
   },
 
+  // 로그 일괄 생성 (버퍼링된 클라이언트 이벤트)
+  createLogBatch: async (events: ClientLogEvent[]) => {
+    const response = await api.post('/api/logs/batch', events)
+    return response.data
+  },
+
   // 모든 로그 삭제
   clearLogs: async () => {
     const response = await api.delete('/api/logs')
@@ -180,6 +190,60 @@ export const logsAPI = {
   }
 }
 
+// 클라이언트 로그 이벤트 버퍼
+export interface ClientLogEvent {
+  action: string;
+  details?: string;
+  log_type?: string;
+  log_level?: string;
+  session_id?: string;
+  username?: string;
+  event_code?: string;
+  attributes?: Record<string, unknown>;
+  timestamp?: string;
+}
+
+const LOG_FLUSH_INTERVAL_MS = 5000
+const LOG_FLUSH_MAX_EVENTS = 50
+let logBuffer: ClientLogEvent[] = []
+let logFlushTimer: ReturnType<typeof setTimeout> | null = null
+
+export const flushClientLogs = async () => {
+  if (logFlushTimer) {
+    clearTimeout(logFlushTimer)
+    logFlushTimer = null
+  }
+  if (logBuffer.length === 0) return
+  const events = logBuffer
+  logBuffer = []
+  try {
+    await logsAPI.createLogBatch(events)
+  } catch (error) {
+    console.error('Failed to flush client logs:', error)
+  }
+}
+
+export const queueClientLog = (event: ClientLogEvent) => {
+  logBuffer.push({ ...event, timestamp: event.timestamp || new Date().toISOString() })
+  if (logBuffer.length >= LOG_FLUSH_MAX_EVENTS) {
+    flushClientLogs()
+  } else if (!logFlushTimer) {
+    logFlushTimer = setTimeout(flushClientLogs, LOG_FLUSH_INTERVAL_MS)
+  }
+}
+
+// 페이지를 떠날 때 남은 이벤트 전송 (인증이 필요 없는 엔드포인트라 sendBeacon 사용 가능)
+if (typeof window !== 'undefined') {
+  window.addEventListener('pagehide', () => {
+    if (logBuffer.length === 0) return
+    // application/json은 교차 출처 beacon에서 막히므로 text/plain으로 보냄 (서버는 본문을 JSON으로 파싱)
+    const body = new Blob([JSON.stringify(logBuffer)], { type: 'text/plain' })
+    if (navigator.sendBeacon && navigator.sendBeacon(`${API_BASE_URL}/api/logs/batch`, body)) {
+      logBuffer = []
+    }
+  })
+}
+
 // 시스템 관리 API - 완전한 DB 기반 구현
 export const systemAPI = {
   // 시스템 정보 조회
@@ -204,7 +268,7 @@ export const systemAPI = {
     
     // 파일명 추출 (Content-Disposition 헤더에서)
     const contentDisposition = response.headers['content-disposition']
-    let filename = 'backup.json'
+    let filename = 'backup.ndjson.gz'
     if (contentDisposition) {
       const filenameMatch = contentDisposition.match(/filename="(.+)"/)
       if (filenameMatch) {
@@ -234,6 +298,59 @@ export const systemAPI = {
     return response.data
   },
 
+  // 서버 저장소에 백업 저장 (다운로드 없이 서버에 보관)
+  saveBackupToServer: async (options?: { mode?: 'full' | 'incremental'; compression?: string; description?: string; background?: boolean }) => {
+    const response = await api.post('/api/system/backup', null, {
+      params: { save_to_server: true, ...options }
+    })
+    return response.data
+  },
+
+  // 서버에 저장된 백업 다운로드
+  downloadStoredBackup: async (backupId: number, filename: string) => {
+    const response = await api.get(`/api/system/backup-history/${backupId}/download`, {
+      responseType: 'blob'
+    })
+    const url = window.URL.createObjectURL(new Blob([response.data]))
+    const link = document.createElement('a')
+    link.href = url
+    link.download = filename
+    document.body.appendChild(link)
+    link.click()
+    document.body.removeChild(link)
+    window.URL.revokeObjectURL(url)
+  },
+
+  // 서버에 저장된 백업으로 복원 (업로드 없이)
+  restoreStoredBackup: async (backupId: number) => {
+    const response = await api.post(`/api/system/backup-history/${backupId}/restore`)
+    return response.data
+  },
+
+  // 백업/복원 작업 상태 조회 (진행 상황: 완료 테이블, 행, 바이트, 예상 남은 시간)
+  getBackupJob: async (jobId: string) => {
+    const response = await api.get(`/api/system/jobs/${jobId}`)
+    return response.data
+  },
+
+  // 백업/복원 작업 취소 요청
+  cancelBackupJob: async (jobId: string) => {
+    const response = await api.post(`/api/system/jobs/${jobId}/cancel`)
+    return response.data
+  },
+
+  // 오래된 데이터 정리 작업 시작 (진행 상황은 getBackupJob으로 조회)
+  purgeOldData: async (
+    target: 'activity_logs' | 'anonymous_progress' | 'quiz_attempts',
+    olderThanDays: number,
+    resumeJob?: string
+  ) => {
+    const response = await api.post('/api/system/purge', null, {
+      params: { target, older_than_days: olderThanDays, resume_job: resumeJob }
+    })
+    return response.data
+  },
+
   // 백업 히스토리 조회
   getBackupHistory: async () => {
     const response = await api.get('/api/system/backup-history')
@@ -265,23 +382,19 @@ export const systemAPI = {
   },
 
   // 관리자 통계 조회
-  getAdminStats: async () => {
-    const response = await api.get('/api/system/admin-stats')
+  getAdminStats: async (days: 7 | 30 = 7) => {
+    const response = await api.get('/api/system/admin-stats', { params: { days } })
     return response.data
   },
 
-  // 실제 활동 로그 생성 (사용자 행동 추적용)
+  // 실제 활동 로그 생성 (사용자 행동 추적용) - 버퍼에 모았다가 일괄 전송
   logUserActivity: async (action: string, details?: string) => {
-    try {
-      await logsAPI.createLog({
-        action,
-        details: details || `사용자가 ${action} 작업을 수행했습니다.`,
-        log_type: 'user',
-        log_level: 'info'
-      })
-    } catch (error) {
-      console.error('Failed to log user activity:', error)
-    }
+    queueClientLog({
+      action,
+      details: details || `사용자가 ${action} 작업을 수행했습니다.`,
+      log_type: 'user',
+      log_level: 'info'
+    })
   }
 }
 
@@ -315,6 +428,8 @@ export const userProgressAPI = {
   updateTermProgress: (sessionId: string, termData: any) => 
     api.post(`/api/user-progress/term-progress/${sessionId}`, termData),
   getStats: (sessionId: string) => api.get(`/api/user-progress/stats/${sessionId}`),
+  getDashboard: (sessionId: string, fields?: string[]) => 
+    api.get(`/api/user-progress/${sessionId}/dashboard`, { params: fields ? { fields: fields.join(',') } : undefined }),
   getPeriodStats: (sessionId: string, startDate: string, endDate: string) => 
     api.get(`/api/user-progress/period-stats/${sessionId}?start_date=${startDate}&end_date=${endDate}`),
   updateStats: (sessionId: string, stats: any) => 